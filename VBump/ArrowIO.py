@@ -0,0 +1,259 @@
+"""Parquet and Feather (Arrow IPC) import/export for vbump datasets.
+
+Requires the optional ``pyarrow`` package (``pip install .[arrow]``). Exports stream the
+proxy HDF5 chunk by chunk: every chunk becomes one Parquet row group or one Feather
+record batch with the columns ``x0 .. z1``, ``D`` (float64) and ``group`` (int32).
+Parquet keeps min/max statistics per row group and column, so readers can skip row
+groups by predicate (e.g. ``group == 3`` or ``x0 > 10``). The schema metadata key
+``vbump`` holds JSON with the overall and per-group bounding boxes (x/y padded by half
+the diameter, as in :func:`VBump.Basic.to_hdf5`) and the row count.
+
+Imports (:func:`arrow_to_hdf5`) accept files from any Arrow producer as long as the
+eight vbump columns are present; ``groups`` skips Parquet row groups whose ``group``
+statistics cannot match.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable, Iterable
+
+from VBump.H5Layout import BBoxAccumulator
+from VBump.Instrument import counter, span
+
+METADATA_KEY = b"vbump"
+PARQUET_SUFFIXES = (".parquet", ".pq")
+FEATHER_SUFFIXES = (".feather", ".arrow", ".ipc")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # type: ignore
+        import pyarrow.ipc  # type: ignore  # noqa: F401
+        import pyarrow.parquet  # type: ignore  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError(
+            "pyarrow is required for Parquet/Feather files. Install it via 'pip install pyarrow'."
+        ) from exc
+    return pyarrow
+
+
+def arrow_format(path: str | os.PathLike[str]) -> str | None:
+    """Return ``'parquet'`` or ``'feather'`` when ``path`` holds one of them, else None."""
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(6)
+    except OSError:
+        return None
+    if magic[:4] == b"PAR1":
+        return "parquet"
+    if magic == b"ARROW1":
+        return "feather"
+    return None
+
+
+def _schema(pa, metadata: dict[str, Any]):
+    from VBump.H5Layout import vbump_dtype
+
+    fields = [pa.field(name, pa.from_numpy_dtype(vbump_dtype()[name])) for name in vbump_dtype().names]
+    return pa.schema(fields, metadata={METADATA_KEY: json.dumps(metadata).encode("utf-8")})
+
+
+def _hdf5_metadata(fin, reader) -> dict[str, Any]:
+    """Collect the bounding boxes the proxy already records as HDF5 attributes."""
+    metadata: dict[str, Any] = {"format_version": 1, "rows": reader.rows}
+    bbox = reader.attrs.get("bounding_box")
+    if bbox is not None:
+        metadata["bounding_box"] = [[float(v) for v in row] for row in bbox]
+    groups: dict[str, Any] = {}
+    if "groups" in fin:
+        for name, node in fin["groups"].items():
+            group_bbox = node.attrs.get("bounding_box")
+            if group_bbox is not None:
+                groups[name] = {"bounding_box": [[float(v) for v in row] for row in group_bbox]}
+    metadata["groups"] = groups
+    return metadata
+
+
+def _batch(pa, schema, data):
+    return pa.record_batch([pa.array(data[name]) for name in schema.names], schema=schema)
+
+
+def hdf5_to_parquet(
+    src_path: str,
+    dst_path: str,
+    *,
+    row_group_size: int = 1_000_000,
+    compression: str = "zstd",
+    check_cancel: Callable[[], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> int:
+    """Stream a vbump HDF5 file into Parquet, one row group per ``row_group_size`` rows."""
+    from VBump.Basic import _require_h5py
+    from VBump.H5Layout import open_vbump
+
+    pa = _require_pyarrow()
+    h5py = _require_h5py()
+    with span("hdf5_to_parquet", dst=str(dst_path)) as sp, h5py.File(src_path, "r") as fin:
+        reader = open_vbump(fin)
+        schema = _schema(pa, _hdf5_metadata(fin, reader))
+        with pa.parquet.ParquetWriter(dst_path, schema, compression=compression, write_statistics=True) as writer:
+            for _start, end, data in reader.iter_chunks(row_group_size):
+                if check_cancel is not None:
+                    check_cancel()
+                with sp.timed("write_s"):
+                    writer.write_batch(_batch(pa, schema, data), row_group_size=row_group_size)
+                counter("rows_written", end)
+                if progress_callback is not None:
+                    progress_callback(end, reader.rows)
+        sp.add("rows", reader.rows)
+        sp.add("bytes_written", os.path.getsize(dst_path))
+    return reader.rows
+
+
+def hdf5_to_feather(
+    src_path: str,
+    dst_path: str,
+    *,
+    chunk_size: int = 1_000_000,
+    compression: str | None = "zstd",
+    check_cancel: Callable[[], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> int:
+    """Stream a vbump HDF5 file into a Feather v2 (Arrow IPC) file, one batch per chunk."""
+    from VBump.Basic import _require_h5py
+    from VBump.H5Layout import open_vbump
+
+    pa = _require_pyarrow()
+    h5py = _require_h5py()
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with span("hdf5_to_feather", dst=str(dst_path)) as sp, h5py.File(src_path, "r") as fin:
+        reader = open_vbump(fin)
+        schema = _schema(pa, _hdf5_metadata(fin, reader))
+        with pa.OSFile(str(dst_path), "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+            for _start, end, data in reader.iter_chunks(chunk_size):
+                if check_cancel is not None:
+                    check_cancel()
+                with sp.timed("write_s"):
+                    writer.write_batch(_batch(pa, schema, data))
+                counter("rows_written", end)
+                if progress_callback is not None:
+                    progress_callback(end, reader.rows)
+        sp.add("rows", reader.rows)
+        sp.add("bytes_written", os.path.getsize(dst_path))
+    return reader.rows
+
+
+def read_metadata(path: str | os.PathLike[str]) -> dict[str, Any]:
+    """Return the ``vbump`` schema metadata of a Parquet/Feather file ({} when absent)."""
+    pa = _require_pyarrow()
+    kind = arrow_format(path)
+    if kind == "parquet":
+        schema = pa.parquet.read_schema(path)
+    elif kind == "feather":
+        with pa.memory_map(str(path), "r") as source:
+            schema = pa.ipc.open_file(source).schema
+    else:
+        raise ValueError(f"'{path}' is not a Parquet or Feather file.")
+    raw = (schema.metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def _parquet_row_groups(parquet_file, groups: set[int] | None) -> list[int]:
+    """Return the row groups whose ``group`` statistics may contain one of ``groups``."""
+    meta = parquet_file.metadata
+    if groups is None:
+        return list(range(meta.num_row_groups))
+    column = parquet_file.schema_arrow.get_field_index("group")
+    selected = []
+    for index in range(meta.num_row_groups):
+        stats = meta.row_group(index).column(column).statistics
+        if stats is None or not stats.has_min_max or any(stats.min <= g <= stats.max for g in groups):
+            selected.append(index)
+    return selected
+
+
+def _iter_batches(pa, path: str, kind: str, chunk_size: int, groups: set[int] | None):
+    from VBump.H5Layout import VBUMP_FIELDS
+
+    if kind == "parquet":
+        parquet_file = pa.parquet.ParquetFile(path)
+        _check_columns(parquet_file.schema_arrow.names, path)
+        row_groups = _parquet_row_groups(parquet_file, groups)
+        total = sum(parquet_file.metadata.row_group(i).num_rows for i in row_groups)
+        yield total
+        if row_groups:
+            yield from parquet_file.iter_batches(batch_size=chunk_size, row_groups=row_groups, columns=list(VBUMP_FIELDS))
+        return
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        _check_columns(reader.schema.names, path)
+        yield sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        for index in range(reader.num_record_batches):
+            yield reader.get_batch(index)
+
+
+def _check_columns(names: Iterable[str], path: str) -> None:
+    from VBump.H5Layout import VBUMP_FIELDS
+
+    missing = [name for name in VBUMP_FIELDS if name not in set(names)]
+    if missing:
+        raise ValueError(f"'{path}' lacks vbump columns: {', '.join(missing)}.")
+
+
+def arrow_to_hdf5(
+    src_path: str,
+    dst_path: str,
+    storage: Any = None,
+    *,
+    groups: Iterable[int] | None = None,
+    chunk_size: int = 1_000_000,
+    check_cancel: Callable[[], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> int:
+    """Convert a Parquet or Feather file into a vbump HDF5 file written with ``storage``.
+
+    ``groups`` keeps only rows of those groups (skipping non-matching Parquet row groups
+    without reading them). Bounding boxes are recomputed while streaming.
+    """
+    from VBump.Basic import _require_h5py, _require_numpy
+    from VBump.H5Layout import create_vbump, vbump_dtype
+    from VBump.Storage import get_profile
+
+    pa = _require_pyarrow()
+    h5py = _require_h5py()
+    np = _require_numpy()
+    kind = arrow_format(src_path)
+    if kind is None:
+        raise ValueError(f"'{src_path}' is not a Parquet or Feather file.")
+    wanted = {int(g) for g in groups} if groups is not None else None
+    profile = get_profile(storage)
+    dtype = vbump_dtype()
+    bboxes = BBoxAccumulator()
+    with span("arrow_to_hdf5", src=str(src_path), format=kind) as sp, h5py.File(dst_path, "w") as fout:
+        batches = _iter_batches(pa, str(src_path), kind, chunk_size, wanted)
+        total = next(batches)
+        writer = create_vbump(fout, dtype, profile, total=total)
+        done = 0
+        for batch in batches:
+            if check_cancel is not None:
+                check_cancel()
+            with sp.timed("read_s"):
+                data = np.empty(batch.num_rows, dtype=dtype)
+                for name in dtype.names:
+                    data[name] = batch.column(name).to_numpy(zero_copy_only=False)
+            done += len(data)
+            if wanted is not None:
+                data = data[np.isin(data["group"], list(wanted))]
+            bboxes.add(data)
+            with sp.timed("write_s"):
+                writer.append(data)
+            if progress_callback is not None:
+                progress_callback(done, total)
+        writer.finish()
+        bboxes.write_attrs(fout, writer.attrs)
+        fout.flush()
+        sp.add("rows", writer.rows)
+        sp.add("bytes_written", fout.id.get_filesize())
+        return writer.rows
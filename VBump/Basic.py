@@ -2,7 +2,14 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from typing import Callable, Iterable, List
-import csv
+import gzip
+import itertools
+import os
+import threading
+
+from VBump.Instrument import counter, span
+from VBump.H5Layout import BBoxAccumulator, create_vbump, open_vbump, vbump_dtype
+from VBump.Storage import DEFAULT_OUTPUT_STORAGE, KEEP, StorageProfile, resolve as resolve_storage
 
 
 def _emit_log(
@@ -18,11 +25,53 @@ def _emit_log(
         print(message, flush=flush)
 
 
+def _emit_progress(
+    callback: Callable[[int, int], None] | None,
+    done: int,
+    total: int,
+) -> None:
+    """Forward ``(done, total)`` row counts to a progress callback when available."""
+    if callback:
+        callback(done, total)
+
+
+class OperationCancelled(RuntimeError):
+    """Raised between chunks when a long running operation has been cancelled."""
+
+
+class CancelToken:
+    """Thread-safe flag that chunked operations poll to support cancellation."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled("Operation cancelled.")
+
+
+def _check_cancel(token: CancelToken | None) -> None:
+    if token is not None:
+        token.raise_if_cancelled()
+
+
 def _require_h5py():
     try:
         import h5py  # type: ignore
     except ImportError as exc:
         raise RuntimeError("h5py is required for HDF5 support. Install it via 'pip install h5py'.") from exc
+    try:
+        # Registers the zstd/blosc filters used by the optional storage profiles.
+        import hdf5plugin  # type: ignore  # noqa: F401
+    except ImportError:
+        pass
     return h5py
 
 
@@ -148,30 +197,132 @@ class VBumpCollection(list[VBump]):
         self.link_h5_filepath = link_h5_filepath
     
 
-def to_csv(filepath, bumps: List[VBump], log_callback: Callable[[str], None] | None = None):
-    with open(filepath, "w", encoding="utf-8", newline="") as f:
-        f.write("# Virtual Bump Configuration file. Unit:mm\n")
-        f.write("# x0, y0, z0, x1, y1, z1, diameter, group\n")
-        writer = csv.writer(f)
-        for bump in bumps:
-            writer.writerow(
-                [
-                    bump.x0,
-                    bump.y0,
-                    bump.z0,
-                    bump.x1,
-                    bump.y1,
-                    bump.z1,
-                    bump.D,
-                    bump.group,
-                ]
-            )
+CSV_HEADER = "# Virtual Bump Configuration file. Unit:mm\n# x0, y0, z0, x1, y1, z1, diameter, group\n"
+CSV_CHUNK_ROWS = 250_000
+CSV_CARDINALITY_SAMPLE = 4096
+CSV_GZIP_LEVEL = 1
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def vbumps_to_array(bumps: Iterable[VBump]):
+    """Pack VBump objects into a structured :func:`VBump.H5Layout.vbump_dtype` array."""
+    np = _require_numpy()
+    if not isinstance(bumps, (list, tuple)):
+        bumps = list(bumps)
+    return np.fromiter(
+        ((b.x0, b.y0, b.z0, b.x1, b.y1, b.z1, b.D, b.group) for b in bumps), dtype=vbump_dtype(), count=len(bumps)
+    )
+
+
+def iter_vbump_arrays(bumps: List[VBump], chunk_rows: int = CSV_CHUNK_ROWS):
+    """Yield ``bumps`` as structured arrays of at most ``chunk_rows`` rows."""
+    for start in range(0, len(bumps), chunk_rows):
+        yield vbumps_to_array(bumps[start : start + chunk_rows])
+
+
+def _open_csv(filepath, mode: str, compress: bool | None = None):
+    """Open a CSV text stream, transparently gzipped for ``*.gz`` paths or ``compress=True``.
+
+    In read mode gzip is detected from the file's magic bytes instead of its suffix.
+    """
+    if "r" in mode:
+        with open(filepath, "rb") as probe:
+            compress = probe.read(2) == GZIP_MAGIC
+    elif compress is None:
+        compress = str(filepath).lower().endswith(".gz")
+    if compress:
+        return gzip.open(filepath, mode + "t", encoding="utf-8", newline="", compresslevel=CSV_GZIP_LEVEL)
+    return open(filepath, mode, encoding="utf-8", newline="")
+
+
+def _format_csv_chunk(data, float_format: str | None = None) -> str:
+    """Format a structured vbump chunk as CSV text in bulk.
+
+    ``float_format`` is a printf-style spec such as ``'%.6f'``; None keeps the ``repr``
+    output of :mod:`csv`. Low-cardinality columns (grid coordinates, z, D, group) are
+    formatted once per distinct value and gathered by index, and a column equal to an
+    already formatted one (``x1 == x0`` for vertical bumps) reuses its strings. The rows
+    are then joined with a single ``%`` operation.
+    """
+    np = _require_numpy()
+    rows = len(data)
+    names = data.dtype.names
+    table = np.empty((rows, len(names)), dtype=object)
+    for index, name in enumerate(names):
+        column = data[name]
+        spec = "%d" if name == "group" else (float_format or "%r")
+        for prev in range(index):
+            if names[prev] != "group" and name != "group" and np.array_equal(data[names[prev]], column):
+                table[:, index] = table[:, prev]
+                break
+        else:
+            if np.unique(column[:CSV_CARDINALITY_SAMPLE]).size * 4 <= min(rows, CSV_CARDINALITY_SAMPLE):
+                values, inverse = np.unique(column, return_inverse=True)
+                table[:, index] = np.array([spec % v for v in values.tolist()], dtype=object)[inverse]
+            else:
+                table[:, index] = [spec % v for v in column.tolist()]
+    row_format = ",".join(["%s"] * len(names)) + "\r\n"
+    return (row_format * rows) % tuple(table.ravel().tolist())
+
+
+def to_csv(
+    filepath,
+    bumps: List[VBump],
+    log_callback: Callable[[str], None] | None = None,
+    *,
+    float_format: str | None = None,
+    compress: bool | None = None,
+):
+    """Write bumps as CSV in bulk-formatted chunks; ``*.gz`` paths (or ``compress=True``) are gzipped."""
+    with span("to_csv", path=str(filepath)) as sp:
+        with _open_csv(filepath, "w", compress) as f:
+            f.write(CSV_HEADER)
+            for data in iter_vbump_arrays(bumps):
+                f.write(_format_csv_chunk(data, float_format))
+        sp.add("rows", len(bumps))
+        sp.add("bytes_written", os.path.getsize(filepath))
     _emit_log(log_callback, f"Successfully saved {len(bumps)} vbumps to '{filepath}'.")
 
 
+def hdf5_to_csv(
+    src_path: str,
+    dst_path: str,
+    *,
+    float_format: str | None = None,
+    compress: bool | None = None,
+    chunk_size: int = CSV_CHUNK_ROWS,
+    check_cancel: Callable[[], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> int:
+    """Stream a vbump HDF5 file to CSV without materializing it.
+
+    Chunks of ``chunk_size`` rows are read with :meth:`VBumpReader.iter_chunks` and
+    formatted by :func:`_format_csv_chunk`, so memory stays bounded by the chunk.
+    Output matches :func:`to_csv`.
+    """
+    h5py = _require_h5py()
+    with span("hdf5_to_csv", dst=str(dst_path)) as sp:
+        with h5py.File(src_path, "r") as fin, _open_csv(dst_path, "w", compress) as f:
+            reader = open_vbump(fin)
+            f.write(CSV_HEADER)
+            for start, end, data in reader.iter_chunks(chunk_size):
+                if check_cancel is not None:
+                    check_cancel()
+                with sp.timed("transform_s"):
+                    text = _format_csv_chunk(data, float_format)
+                with sp.timed("write_s"):
+                    f.write(text)
+                counter("rows_written", end - start)
+                _emit_progress(progress_callback, end, reader.rows)
+            rows = reader.rows
+        sp.add("rows", rows)
+        sp.add("bytes_written", os.path.getsize(dst_path))
+    return rows
+
+
 def load_csv(filepath, log_callback: Callable[[str], None] | None = None) -> List[VBump]:
     ret: List[VBump] = []
-    with open(filepath, "r", encoding="utf-8") as f:
+    with span("load_csv", path=str(filepath)) as sp, _open_csv(filepath, "r") as f:
         for line in f:
             line = line.strip()
             if not line or line.startswith("#"):
@@ -180,48 +331,100 @@ def load_csv(filepath, log_callback: Callable[[str], None] | None = None) -> Lis
                 ret.append(VBump.from_line(line))
             except Exception as e:
                 _emit_log(log_callback, f"Warning: Skipping line due to error: {e}")
+        sp.add("rows", len(ret))
+        sp.add("bytes_read", os.path.getsize(filepath))
     _emit_log(log_callback, f"Successfully loaded {len(ret)} vbumps from '{filepath}'.")
     return ret
 
 
+def _parse_csv_lines(lines: list[str], warnings: list[str]):
+    """Parse data lines into a structured chunk; malformed blocks fall back to per-line parsing."""
+    np = _require_numpy()
+    dtype = vbump_dtype()
+    try:
+        table = np.loadtxt(lines, delimiter=",", ndmin=2, dtype=np.float64)
+        if table.shape[1] < 7:
+            raise ValueError("too few columns")
+    except ValueError:
+        bumps = []
+        for line in lines:
+            try:
+                bumps.append(VBump.from_line(line.strip()))
+            except Exception as e:
+                warnings.append(f"Warning: Skipping line due to error: {e}")
+        return np.fromiter(
+            ((b.x0, b.y0, b.z0, b.x1, b.y1, b.z1, b.D, b.group) for b in bumps), dtype=dtype, count=len(bumps)
+        )
+    data = np.empty(len(table), dtype=dtype)
+    for index, name in enumerate(dtype.names[:7]):
+        data[name] = table[:, index]
+    data["group"] = table[:, 7] if table.shape[1] > 7 else 0
+    return data
+
+
+def iter_csv_chunks(
+    filepath,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    log_callback: Callable[[str], None] | None = None,
+):
+    """Yield structured vbump chunks of up to ``chunk_rows`` rows from a (gzipped) CSV file.
+
+    Blocks are parsed with ``np.loadtxt``; a block with a malformed line is re-parsed
+    line by line and the bad lines are skipped with a warning, as in :func:`load_csv`.
+    """
+    warnings: list[str] = []
+    with _open_csv(filepath, "r") as f:
+        while True:
+            block = list(itertools.islice(f, chunk_rows))
+            if not block:
+                break
+            lines = [line for line in block if line.strip() and not line.lstrip().startswith("#")]
+            if lines:
+                data = _parse_csv_lines(lines, warnings)
+                for message in warnings:
+                    _emit_log(log_callback, message)
+                warnings.clear()
+                if len(data):
+                    yield data
+
+
 def to_hdf5(
     filepath: str,
     bumps: List[VBump],
     *,
-    compression: str | int | None = 'gzip',
+    storage: str | StorageProfile | None = DEFAULT_OUTPUT_STORAGE,
+    compression: str | int | None = KEEP,
     chunk_size: int = 1_000_000,
     progress: bool = True,
     progress_interval: int | None = None,
     log_callback: Callable[[str], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+    cancel_token: CancelToken | None = None,
 ) -> None:
     """Persist vbumps to an HDF5 file chunk-by-chunk and record bounding boxes.
 
     Requires h5py and numpy. Data is streamed into a structured dataset using chunks so that
-    very large bump collections do not require an intermediate NumPy allocation. When bumps
-    are present a `bounding_box` attribute is attached to the dataset with rows `[min, max]`
-    and columns `[x, y, z]`, with x/y extents expanded by half the bump diameter. Bounding
-    boxes are also recorded per group under `groups/<group>` in the HDF5 output so consumers
-    can query spatial extents without filtering the dataset. Progress updates are emitted via
-    ``log_callback`` when supplied.
+    very large bump collections do not require an intermediate NumPy allocation. When bumps are
+    present a `bounding_box` attribute is attached to the dataset with rows `[min, max]` and
+    columns `[x, y, z]`, with x/y extents expanded by half the bump diameter. Bounding boxes are
+    also recorded per group under `groups/<group>` in the HDF5 output so consumers can query
+    spatial extents without filtering the dataset. ``storage`` selects the codec, chunk shape,
+    layout and encoding (see :mod:`VBump.Storage`); an explicit ``compression`` overrides the
+    profile's codec. Compact encodings raise ValueError when a coordinate would move by more
+    than the profile's tolerance. ``chunk_size`` is the write batch size. Progress updates are
+    emitted via ``log_callback`` when supplied, and as ``(written, total)`` row counts via
+    ``progress_callback``. ``cancel_token`` is checked after every chunk; a cancelled write
+    raises :class:`OperationCancelled` and leaves a partial file for the caller to discard.
     """
     if chunk_size <= 0:
         raise ValueError('chunk_size must be positive.')
+    profile = resolve_storage(storage, compression)
     h5py = _require_h5py()
-    np = _require_numpy()
-    dtype = np.dtype([
-        ('x0', np.float64),
-        ('y0', np.float64),
-        ('z0', np.float64),
-        ('x1', np.float64),
-        ('y1', np.float64),
-        ('z1', np.float64),
-        ('D', np.float64),
-        ('group', np.int32),
-    ])
+    dtype = vbump_dtype()
     total = len(bumps)
     if total == 0:
         with h5py.File(filepath, 'w') as handle:
-            handle.create_dataset('vbump', shape=(0,), maxshape=(None,), dtype=dtype)
+            create_vbump(handle, dtype, profile, total=0)
         if progress:
             _emit_log(log_callback, '... 0/0 (0.0%)', flush=True)
         _emit_log(log_callback, f"Successfully saved 0 vbumps to '{filepath}'.")
@@ -236,98 +439,38 @@ def to_hdf5(
     else:
         progress_interval = None
 
-    bbox_min = [float('inf'), float('inf'), float('inf')]
-    bbox_max = [float('-inf'), float('-inf'), float('-inf')]
-    group_bbox: dict[int, tuple[List[float], List[float]]] = {}
-
-    with h5py.File(filepath, 'w') as handle:
-        dset = handle.create_dataset(
-            'vbump',
-            shape=(total,),
-            maxshape=(total,),
-            dtype=dtype,
-            compression=compression,
-            chunks=(chunk_len,),
-        )
-        buffer = np.empty((chunk_len,), dtype=dtype)
-        buf_pos = 0
+    bboxes = BBoxAccumulator()
+
+    with span("to_hdf5", path=str(filepath), storage=profile.name) as sp, h5py.File(filepath, 'w') as handle:
+        group_range = None
+        if profile.encoding != "float64":
+            group_ids = {int(bump.group) for bump in bumps}
+            group_range = (min(group_ids), max(group_ids))
+        dset = create_vbump(handle, dtype, profile, total=total, group_range=group_range)
         written = 0
         last_report = 0
 
-        for bump in bumps:
-            buffer[buf_pos] = (
-                bump.x0,
-                bump.y0,
-                bump.z0,
-                bump.x1,
-                bump.y1,
-                bump.z1,
-                bump.D,
-                bump.group,
-            )
-            half_d = bump.D / 2.0
-            x_min = min(bump.x0, bump.x1) - half_d
-            x_max = max(bump.x0, bump.x1) + half_d
-            y_min = min(bump.y0, bump.y1) - half_d
-            y_max = max(bump.y0, bump.y1) + half_d
-            z_min = min(bump.z0, bump.z1)
-            z_max = max(bump.z0, bump.z1)
-            if x_min < bbox_min[0]:
-                bbox_min[0] = x_min
-            if y_min < bbox_min[1]:
-                bbox_min[1] = y_min
-            if z_min < bbox_min[2]:
-                bbox_min[2] = z_min
-            if x_max > bbox_max[0]:
-                bbox_max[0] = x_max
-            if y_max > bbox_max[1]:
-                bbox_max[1] = y_max
-            if z_max > bbox_max[2]:
-                bbox_max[2] = z_max
-
-            group_entry = group_bbox.get(bump.group)
-            if group_entry is None:
-                group_entry = ([float('inf'), float('inf'), float('inf')], [float('-inf'), float('-inf'), float('-inf')])
-                group_bbox[bump.group] = group_entry
-            g_min, g_max = group_entry
-            if x_min < g_min[0]:
-                g_min[0] = x_min
-            if y_min < g_min[1]:
-                g_min[1] = y_min
-            if z_min < g_min[2]:
-                g_min[2] = z_min
-            if x_max > g_max[0]:
-                g_max[0] = x_max
-            if y_max > g_max[1]:
-                g_max[1] = y_max
-            if z_max > g_max[2]:
-                g_max[2] = z_max
-
-            buf_pos += 1
-            if buf_pos == chunk_len:
-                dset[written:written + buf_pos] = buffer
-                written += buf_pos
-                buf_pos = 0
-                if progress_interval and written - last_report >= progress_interval:
-                    last_report = written
-                    pct = written / total * 100
-                    _emit_log(log_callback, f"... {written}/{total} ({pct:.1f}%)", flush=True)
-
-        if buf_pos:
-            dset[written:written + buf_pos] = buffer[:buf_pos]
-            written += buf_pos
+        for start in range(0, total, chunk_len):
+            buffer = vbumps_to_array(bumps[start : start + chunk_len])
+            with sp.timed("bbox_s"):
+                bboxes.add(buffer)
+            with sp.timed("write_s"):
+                dset.write(written, buffer)
+            written += len(buffer)
+            counter("rows_written", written)
+            _emit_progress(progress_callback, written, total)
+            if written < total:
+                _check_cancel(cancel_token)
             if progress_interval and written - last_report >= progress_interval:
                 last_report = written
                 pct = written / total * 100
                 _emit_log(log_callback, f"... {written}/{total} ({pct:.1f}%)", flush=True)
 
-        if written:
-            bbox_array = np.array([bbox_min, bbox_max], dtype=np.float64)
-            dset.attrs['bounding_box'] = bbox_array
-            groups_root = handle.create_group('groups')
-            for group_id, (g_min, g_max) in sorted(group_bbox.items()):
-                group_node = groups_root.create_group(str(group_id))
-                group_node.attrs['bounding_box'] = np.array([g_min, g_max], dtype=np.float64)
+        dset.finish()
+        bboxes.write_attrs(handle, dset.attrs)
+        handle.flush()
+        sp.add("rows", written)
+        sp.add("bytes_written", handle.id.get_filesize())
 
     if progress_interval and written != last_report:
         pct = written / total * 100
@@ -363,15 +506,22 @@ def load_hdf5(
     *,
     max_rows: int | None = None,
     only_bounding_boxes: bool | None = None,
+    chunk_size: int = 1_000_000,
     log_callback: Callable[[str], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+    cancel_token: CancelToken | None = None,
 ) -> VBumpCollection:
-    """Load vbumps and bounding boxes from an HDF5 file produced by to_hdf5."""
+    """Load vbumps and bounding boxes from an HDF5 file produced by to_hdf5.
+
+    Full loads read the dataset ``chunk_size`` rows at a time, reporting progress and
+    honouring ``cancel_token`` between chunks.
+    """
     h5py = _require_h5py()
-    with h5py.File(filepath, 'r') as handle:
+    with span("load_hdf5", path=str(filepath)) as sp, h5py.File(filepath, 'r') as handle:
         if 'vbump' not in handle:
             raise KeyError("Dataset 'vbump' not found in file.")
-        dataset = handle['vbump']
-        total_rows = int(dataset.shape[0]) if dataset.shape else 0
+        dataset = open_vbump(handle)
+        total_rows = dataset.rows
         dataset_bbox_attr = dataset.attrs.get('bounding_box')
 
         def _normalize_bbox(raw) -> tuple[tuple[float, float, float], tuple[float, float, float]] | None:
@@ -428,20 +578,28 @@ def load_hdf5(
                 markers.extend(_markers_from_bbox(dataset_bbox[0], dataset_bbox[1], 0))
             result.extend(markers)
         else:
-            data = dataset[...]
-            for row in data:
-                result.append(
-                    VBump.from_coords(
-                        float(row['x0']),
-                        float(row['y0']),
-                        float(row['z0']),
-                        float(row['x1']),
-                        float(row['y1']),
-                        float(row['z1']),
-                        float(row['D']),
-                        int(row['group']),
+            for start in range(0, total_rows, chunk_size):
+                _check_cancel(cancel_token)
+                with sp.timed("read_s"):
+                    data = dataset.read(start, start + chunk_size)
+                sp.add("bytes_read", data.nbytes)
+                for row in data:
+                    result.append(
+                        VBump.from_coords(
+                            float(row['x0']),
+                            float(row['y0']),
+                            float(row['z0']),
+                            float(row['x1']),
+                            float(row['y1']),
+                            float(row['z1']),
+                            float(row['D']),
+                            int(row['group']),
+                        )
                     )
-                )
+                _emit_progress(progress_callback, len(result), total_rows)
+                counter("rows_read", len(result))
+        sp.add("rows", len(result))
+        sp.set(bounding_boxes_only=use_bounding_boxes)
         _emit_log(log_callback, f"Successfully loaded {len(result)} vbumps from '{filepath}' (source rows: {total_rows:,}).")
         return result
 
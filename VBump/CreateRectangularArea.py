@@ -3,20 +3,19 @@ from __future__ import annotations
 import math
 from typing import Callable, Tuple
 
-from VBump.Basic import VBump, _require_h5py, _require_numpy
+from VBump.Basic import (
+    CancelToken,
+    VBump,
+    _check_cancel,
+    _emit_log,
+    _emit_progress,
+    _require_h5py,
+    _require_numpy,
+)
 from VBump.ExportWDL import AABB
-
-def _emit_log(
-    callback: Callable[[str], None] | None,
-    message: str,
-    *,
-    flush: bool = False,
-) -> None:
-    """Send progress or completion messages to the provided logger or stdout."""
-    if callback:
-        callback(message)
-    else:
-        print(message, flush=flush)
+from VBump.H5Layout import BBoxAccumulator, create_vbump, vbump_dtype
+from VBump.Instrument import counter, span
+from VBump.Storage import DEFAULT_OUTPUT_STORAGE, KEEP, StorageProfile, resolve as resolve_storage
 
 
 def _rectangular_bounds(
@@ -148,33 +147,30 @@ def create_rectangular_area_XY_by_pitch_to_hdf5(
     height: float,
     *,
     chunk_size: int = 1_000_000,
-    compression: str | int | None = "gzip",
+    storage: str | StorageProfile | None = DEFAULT_OUTPUT_STORAGE,
+    compression: str | int | None = KEEP,
     progress: bool = True,
     progress_interval: int | None = None,
     log_callback: Callable[[str], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+    cancel_token: CancelToken | None = None,
 ) -> int:
     """Stream large pitch-based grids directly into an HDF5 dataset.
 
     Stores a `bounding_box` attribute on the resulting dataset with rows `[min, max]`
     and columns `[x, y, z]`, where x/y extents include the bump radius. The same
     bounding box is mirrored under `groups/<group>/bounding_box` so consumers can
-    access per-group extents without scanning the dataset.
+    access per-group extents without scanning the dataset. ``storage`` selects the codec
+    and chunk shape (:mod:`VBump.Storage`); ``chunk_size`` is the write batch size.
+    ``cancel_token`` is checked after every flushed chunk.
     """
     if chunk_size <= 0:
         raise ValueError("chunk_size must be positive.")
     total_estimate = estimate_rectangular_area_XY_by_pitch_count(p0, p1, x_pitch, y_pitch)
+    profile = resolve_storage(storage, compression)
     h5py = _require_h5py()
     np = _require_numpy()
-    dtype = np.dtype([
-        ("x0", np.float64),
-        ("y0", np.float64),
-        ("z0", np.float64),
-        ("x1", np.float64),
-        ("y1", np.float64),
-        ("z1", np.float64),
-        ("D", np.float64),
-        ("group", np.int32),
-    ])
+    dtype = vbump_dtype()
 
     xmin, ymin, zmin, xmax, ymax, zmax = _rectangular_bounds(p0, p1, z, height)
     z1 = z + height
@@ -184,7 +180,7 @@ def create_rectangular_area_XY_by_pitch_to_hdf5(
 
     if total_estimate == 0:
         with h5py.File(filepath, "w") as handle:
-            handle.create_dataset("vbump", shape=(0,), maxshape=(None,), dtype=dtype)
+            create_vbump(handle, dtype, profile, total=0)
         if progress:
             _emit_log(log_callback, "... 0/0 (0.0%)", flush=True)
         _emit_log(log_callback, f"Streamed 0 vbumps into '{filepath}'.")
@@ -200,24 +196,13 @@ def create_rectangular_area_XY_by_pitch_to_hdf5(
     else:
         progress_interval = None
 
-    with h5py.File(filepath, "w") as handle:
-        dset = handle.create_dataset(
-            "vbump",
-            shape=(0,),
-            maxshape=(None,),
-            dtype=dtype,
-            compression=compression,
-            chunks=(chunk_len,),
-        )
+    with span("grid_to_hdf5", path=str(filepath), storage=profile.name) as sp, h5py.File(filepath, "w") as handle:
+        dset = create_vbump(handle, dtype, profile, total=total_estimate)
         buffer = np.empty((chunk_len,), dtype=dtype)
         buf_pos = 0
         written = 0
         last_report = 0
-        bbox_min = [math.inf, math.inf, math.inf]
-        bbox_max = [-math.inf, -math.inf, -math.inf]
-        z_min = zmin
-        z_max = zmax
-        half_d = diameter / 2
+        bboxes = BBoxAccumulator()
 
         for ix in range(nx):
             x = xmin + ix * x_pitch
@@ -227,10 +212,6 @@ def create_rectangular_area_XY_by_pitch_to_hdf5(
                 y_val = ymin + iy * y_pitch
                 if y_val > ymax + 1e-6:
                     break
-                x_min_candidate = x - half_d
-                x_max_candidate = x + half_d
-                y_min_candidate = y_val - half_d
-                y_max_candidate = y_val + half_d
                 buffer[buf_pos] = (
                     x,
                     y_val,
@@ -241,40 +222,35 @@ def create_rectangular_area_XY_by_pitch_to_hdf5(
                     diameter,
                     group,
                 )
-                if x_min_candidate < bbox_min[0]:
-                    bbox_min[0] = x_min_candidate
-                if y_min_candidate < bbox_min[1]:
-                    bbox_min[1] = y_min_candidate
-                if x_max_candidate > bbox_max[0]:
-                    bbox_max[0] = x_max_candidate
-                if y_max_candidate > bbox_max[1]:
-                    bbox_max[1] = y_max_candidate
                 buf_pos += 1
                 if buf_pos == buffer.shape[0]:
-                    dset.resize((written + buf_pos,))
-                    dset[written:written + buf_pos] = buffer
+                    bboxes.add(buffer)
+                    with sp.timed("write_s"):
+                        dset.write(written, buffer)
                     written += buf_pos
                     buf_pos = 0
+                    counter("rows_written", written)
+                    _emit_progress(progress_callback, written, total_estimate)
+                    _check_cancel(cancel_token)
                     if progress_interval and written - last_report >= progress_interval:
                         last_report = written
                         pct = written / total_estimate * 100
                         _emit_log(log_callback, f"... {written}/{total_estimate} ({pct:.1f}%)", flush=True)
         if buf_pos:
-            dset.resize((written + buf_pos,))
-            dset[written:written + buf_pos] = buffer[:buf_pos]
+            bboxes.add(buffer[:buf_pos])
+            with sp.timed("write_s"):
+                dset.write(written, buffer[:buf_pos])
             written += buf_pos
+            _emit_progress(progress_callback, written, total_estimate)
             if progress_interval and written - last_report >= progress_interval:
                 last_report = written
                 pct = written / total_estimate * 100 if total_estimate else 0.0
                 _emit_log(log_callback, f"... {written}/{total_estimate} ({pct:.1f}%)", flush=True)
-        if written:
-            bbox_min[2] = z_min
-            bbox_max[2] = z_max
-            bbox_array = np.array([bbox_min, bbox_max], dtype=np.float64)
-            dset.attrs["bounding_box"] = bbox_array
-            groups_root = handle.create_group("groups")
-            group_node = groups_root.create_group(str(group))
-            group_node.attrs["bounding_box"] = bbox_array
+        dset.finish()
+        bboxes.write_attrs(handle, dset.attrs)
+        handle.flush()
+        sp.add("rows", written)
+        sp.add("bytes_written", handle.id.get_filesize())
 
     if progress and total_estimate and written != last_report:
         pct = written / total_estimate * 100
@@ -297,10 +273,13 @@ def create_rectangular_area_XY_by_number_to_hdf5(
     height: float,
     *,
     chunk_size: int = 1_000_000,
-    compression: str | int | None = "gzip",
+    storage: str | StorageProfile | None = DEFAULT_OUTPUT_STORAGE,
+    compression: str | int | None = KEEP,
     progress: bool = True,
     progress_interval: int | None = None,
     log_callback: Callable[[str], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+    cancel_token: CancelToken | None = None,
 ) -> int:
     """Stream count-based grids directly into an HDF5 dataset.
 
@@ -319,10 +298,13 @@ def create_rectangular_area_XY_by_number_to_hdf5(
         z,
         height,
         chunk_size=chunk_size,
+        storage=storage,
         compression=compression,
         progress=progress,
         progress_interval=progress_interval,
         log_callback=log_callback,
+        progress_callback=progress_callback,
+        cancel_token=cancel_token,
     )
 
 
@@ -1,5 +1,7 @@
-from typing import Callable, List
-from VBump.Basic import VBump, _emit_log
+from typing import Callable, Dict, List
+from VBump.Basic import VBump, _emit_log, iter_vbump_arrays
+from VBump.H5Layout import BBoxAccumulator
+from VBump.Instrument import span
 
 WDL_TEMPLATE_LINES = """<Header>
 Version      = 1000 
@@ -62,6 +64,8 @@ Item_1 = MAX(175.100006) , MIN(175.009995)
 WDL_EOF = len(WDL_TEMPLATE_LINES)
 
 class AABB:
+    """Centre-line box of a group of vbumps (x/y not padded by the diameter)."""
+
     def __init__(self):
         self.xmin = 99999
         self.ymin = 99999
@@ -88,7 +92,27 @@ class AABB:
         self.D = vbump.D
         self.group = vbump.group
         return self
-    
+
+    @classmethod
+    def from_bbox(cls, bbox: List[float], D: float, group: int) -> "AABB":
+        """Build from ``[xmin, ymin, zmin, xmax, ymax, zmax]``, e.g. an unpadded BBoxAccumulator box."""
+        aabb = cls()
+        aabb.xmin, aabb.ymin, aabb.zmin, aabb.xmax, aabb.ymax, aabb.zmax = bbox
+        aabb.D = D
+        aabb.group = group
+        return aabb
+
+    @classmethod
+    def per_group(cls, vbumps: List[VBump]) -> Dict[int, "AABB"]:
+        """Return ``{group: AABB}`` for ``vbumps``, reduced in bulk chunks."""
+        bboxes = BBoxAccumulator(padded=False)
+        for data in iter_vbump_arrays(vbumps):
+            bboxes.add(data)
+        return {
+            gid: cls.from_bbox(bbox, bboxes.group_d_range[gid][1], gid)
+            for gid, bbox in bboxes.group_bounding_boxes.items()
+        }
+
     def _vertices(self):    
         return [
             (self.xmin, self.ymin, self.zmin),
@@ -142,7 +166,7 @@ def vbump_2_wdl_as_airtrap(filename:str, vbumps:List[VBump], log_callback: Calla
 
     _update_item_type_info(N_airtrap=len(vbumps))
 
-    with open(filename, 'w', encoding='utf-8') as f:
+    with span("wdl_airtrap", path=str(filename)) as sp, open(filename, 'w', encoding='utf-8') as f:
         for i in range(0,_loc('<AirTrapInfo>')+1):
             f.write(WDL_TEMPLATE_LINES[i])
 
@@ -154,6 +178,8 @@ def vbump_2_wdl_as_airtrap(filename:str, vbumps:List[VBump], log_callback: Calla
 
         for i in range(_loc('</AirTrapInfo>'), WDL_EOF):
             f.write(WDL_TEMPLATE_LINES[i])
+        sp.add("rows", len(vbumps))
+        sp.add("bytes_written", f.tell())
     _emit_log(log_callback, f"Successfully exported {len(vbumps)} vbumps to '{filename}'.")
 
 
@@ -161,7 +187,7 @@ def vbump_2_wdl_as_weldline(filename:str, vbumps:List[VBump], log_callback: Call
 
     _update_item_type_info(N_vbumps=len(vbumps))
 
-    with open(filename, 'w', encoding='utf-8') as f:
+    with span("wdl_weldline", path=str(filename)) as sp, open(filename, 'w', encoding='utf-8') as f:
         for i in range(0,_loc('<NodeInfo>')+1):
             f.write(WDL_TEMPLATE_LINES[i])
 
@@ -200,19 +226,14 @@ def vbump_2_wdl_as_weldline(filename:str, vbumps:List[VBump], log_callback: Call
 
         for i in range(_loc('</Item_1>'), WDL_EOF):
             f.write(WDL_TEMPLATE_LINES[i])
+        sp.add("rows", len(vbumps))
+        sp.add("bytes_written", f.tell())
 
     _emit_log(log_callback, f"Successfully exported {len(vbumps)} vbumps to '{filename}'.")
 
 
 def vbump_2_wdl_as_weldline_AABB(filename:str, vbumps:List[VBump], log_callback: Callable[[str], None] | None = None):
     new_vbumps = []
-    group_vbumps = {}
-    for vbump in vbumps:
-        if vbump.group in group_vbumps:
-            group_vbumps[vbump.group].add(vbump)
-        else:
-            group_vbumps[vbump.group] = AABB().add(vbump)
-
-    for _, aabb in group_vbumps.items():
-        new_vbumps += aabb.edges_as_vbumps()    
+    for aabb in AABB.per_group(vbumps).values():
+        new_vbumps += aabb.edges_as_vbumps()
     return vbump_2_wdl_as_weldline(filename, new_vbumps, log_callback=log_callback)
@@ -1,11 +1,230 @@
-from typing import Callable, List
-from VBump.Basic import VBump, load_csv, to_csv, _emit_log
+"""Merge many CSV sources into one CSV or HDF5 file without holding them in memory.
 
-def merge(source_dirs:List[str], target_dir: str, log_callback: Callable[[str], None] | None = None):
-    vbumps = []
-    for src_file in source_dirs:
-        _emit_log(log_callback, f"Loading from '{src_file}'...")
-        vbumps += load_csv(src_file, log_callback=log_callback)
+Sources are parsed concurrently in a process pool. Every worker streams its source into
+a raw spool file next to the target and returns only its partial
+:class:`~VBump.H5Layout.BBoxAccumulator` (row counts and bounding boxes); the parent
+appends spools to the target in input order, one chunk at a time, merges the partial
+boxes and deletes the spools as it goes. At most ``2 * workers`` spools exist at once, so
+memory stays bounded by a few chunks regardless of the number or size of sources.
 
-    to_csv(target_dir, vbumps, log_callback=log_callback)
+Because spools finish one by one, the total row count is not known when the first one
+is appended. HDF5 targets are preallocated from the sources' line counts (a cheap upper
+bound, counted in threads before parsing), so contiguous profiles such as ``scratch``
+stay contiguous and memory-mappable; unused rows are left as slack (see
+:mod:`VBump.H5Layout`). The same bound drives row-level progress when sources are
+streamed in one process.
+"""
 
+from __future__ import annotations
+
+import gzip
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+from VBump.Basic import (
+    CSV_CHUNK_ROWS,
+    CSV_HEADER,
+    GZIP_MAGIC,
+    _emit_log,
+    _emit_progress,
+    _format_csv_chunk,
+    _open_csv,
+    _require_h5py,
+    _require_numpy,
+    iter_csv_chunks,
+)
+from VBump.H5Layout import BBoxAccumulator, create_vbump, vbump_dtype
+from VBump.Instrument import counter, span
+from VBump.Storage import DEFAULT_OUTPUT_STORAGE, StorageProfile, get_profile
+
+HDF5_SUFFIXES = (".h5", ".hdf5")
+_COUNT_BLOCK = 4 << 20
+
+
+def _count_lines(path: str) -> int:
+    """Line count of a (gzipped) CSV source: an upper bound on its data rows."""
+    with open(path, "rb") as probe:
+        compressed = probe.read(2) == GZIP_MAGIC
+    lines = 0
+    last = b"\n"
+    with (gzip.open(path, "rb") if compressed else open(path, "rb")) as stream:
+        while block := stream.read(_COUNT_BLOCK):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return lines + (last != b"\n")
+
+
+def _expected_rows(sources: List[str], workers: int) -> int:
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(_count_lines, sources))
+
+
+def _spool_csv(src_path: str, spool_path: str, chunk_rows: int) -> tuple[BBoxAccumulator, list[str]]:
+    """Worker: parse one CSV into a raw spool of vbump records; return bboxes and warnings."""
+    bboxes = BBoxAccumulator()
+    warnings: list[str] = []
+    with open(spool_path, "wb") as spool:
+        for data in iter_csv_chunks(src_path, chunk_rows, log_callback=warnings.append):
+            data.tofile(spool)
+            bboxes.add(data)
+    return bboxes, warnings
+
+
+def _read_spool(spool_path: str, chunk_rows: int) -> Iterator:
+    np = _require_numpy()
+    dtype = vbump_dtype()
+    rows = os.path.getsize(spool_path) // dtype.itemsize
+    with open(spool_path, "rb") as spool:
+        for start in range(0, rows, chunk_rows):
+            yield np.fromfile(spool, dtype=dtype, count=min(chunk_rows, rows - start))
+
+
+class _CsvSink:
+    def __init__(self, path: str, float_format: str | None) -> None:
+        self._file = _open_csv(path, "w")
+        self._file.write(CSV_HEADER)
+        self._float_format = float_format
+
+    def append(self, data) -> None:
+        self._file.write(_format_csv_chunk(data, self._float_format))
+
+    def finish(self, summary: BBoxAccumulator) -> None:
+        pass
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _Hdf5Sink:
+    def __init__(self, path: str, storage: str | StorageProfile | None, total: int | None) -> None:
+        h5py = _require_h5py()
+        self._file = h5py.File(path, "w")
+        self._writer = create_vbump(self._file, vbump_dtype(), get_profile(storage), total=total)
+
+    def append(self, data) -> None:
+        self._writer.append(data)
+
+    def finish(self, summary: BBoxAccumulator) -> None:
+        self._writer.finish()
+        summary.write_attrs(self._file, self._writer.attrs)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def merge(
+    source_dirs: List[str],
+    target_dir: str,
+    log_callback: Callable[[str], None] | None = None,
+    *,
+    storage: str | StorageProfile | None = DEFAULT_OUTPUT_STORAGE,
+    workers: int | None = None,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    float_format: str | None = None,
+    check_cancel: Callable[[], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> BBoxAccumulator:
+    """Merge CSV files (``source_dirs``, in order) into ``target_dir``.
+
+    ``target_dir`` ending in ``.h5``/``.hdf5`` is written as a vbump HDF5 file with the
+    ``storage`` profile and overall/per-group bounding box attributes; anything else is
+    written as CSV (gzipped for ``*.gz``). ``workers`` defaults to the CPU count; with
+    one worker or one source the sources are streamed directly without spool files.
+    Progress is reported as ``(rows written, expected rows)`` when streaming in one
+    process (``expected rows`` is the sources' line count, reached at the end) and as
+    ``(sources done, sources)`` in parallel. Returns the merged row counts and padded
+    bounding boxes.
+    """
+    sources = [os.fspath(p) for p in source_dirs]
+    target = os.fspath(target_dir)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(sources) or 1))
+    summary = BBoxAccumulator()
+    with span("merge_csv", target=str(target), sources=len(sources), workers=workers) as sp:
+        hdf5 = target.lower().endswith(HDF5_SUFFIXES)
+        expected = None
+        if hdf5 or (workers == 1 and progress_callback is not None):
+            with sp.timed("count_s"):
+                expected = _expected_rows(sources, workers)
+        if hdf5:
+            sink = _Hdf5Sink(target, storage, expected)
+        else:
+            sink = _CsvSink(target, float_format)
+        try:
+            if workers == 1:
+                for src in sources:
+                    _emit_log(log_callback, f"Loading from '{src}'...")
+                    for data in iter_csv_chunks(src, chunk_rows, log_callback=log_callback):
+                        if check_cancel is not None:
+                            check_cancel()
+                        summary.add(data)
+                        with sp.timed("write_s"):
+                            sink.append(data)
+                        counter("rows_written", len(data))
+                        _emit_progress(progress_callback, summary.rows, expected or 0)
+                _emit_progress(progress_callback, expected or 0, expected or 0)
+            else:
+                _merge_parallel(
+                    sources, target, sink, summary, sp, workers, chunk_rows, log_callback, check_cancel, progress_callback
+                )
+            sink.finish(summary)
+        except BaseException:
+            sink.close()
+            Path(target).unlink(missing_ok=True)
+            raise
+        sink.close()
+        sp.add("rows", summary.rows)
+        sp.add("bytes_written", os.path.getsize(target))
+    _emit_log(log_callback, f"Successfully merged {summary.rows} vbumps from {len(sources)} files into '{target}'.")
+    return summary
+
+
+def _merge_parallel(
+    sources, target, sink, summary, sp, workers, chunk_rows, log_callback, check_cancel, progress_callback
+) -> None:
+    spool_dir = tempfile.mkdtemp(prefix=".merge_", dir=os.path.dirname(os.path.abspath(target)))
+    pending: dict[int, tuple] = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            try:
+                _drain_in_order(
+                    pool, pending, sources, spool_dir, sink, summary, sp, workers, chunk_rows,
+                    log_callback, check_cancel, progress_callback,
+                )
+            except BaseException:
+                for _spool, future in pending.values():
+                    future.cancel()
+                raise
+    finally:
+        for name in os.listdir(spool_dir):
+            os.unlink(os.path.join(spool_dir, name))
+        os.rmdir(spool_dir)
+
+
+def _drain_in_order(
+    pool, pending, sources, spool_dir, sink, summary, sp, workers, chunk_rows, log_callback, check_cancel, progress_callback
+) -> None:
+    """Keep ``2 * workers`` sources spooling ahead and append finished spools in input order."""
+    submitted = 0
+    for index, src in enumerate(sources):
+        while submitted < len(sources) and submitted < index + 2 * workers:
+            spool = os.path.join(spool_dir, f"{submitted}.bin")
+            pending[submitted] = (spool, pool.submit(_spool_csv, sources[submitted], spool, chunk_rows))
+            submitted += 1
+        spool, future = pending.pop(index)
+        with sp.timed("read_s"):
+            bboxes, warnings = future.result()
+        _emit_log(log_callback, f"Loading from '{src}'...")
+        for message in warnings:
+            _emit_log(log_callback, message)
+        for data in _read_spool(spool, chunk_rows):
+            if check_cancel is not None:
+                check_cancel()
+            with sp.timed("write_s"):
+                sink.append(data)
+            counter("rows_written", len(data))
+        summary.merge(bboxes)
+        os.unlink(spool)
+        _emit_progress(progress_callback, index + 1, len(sources))
@@ -0,0 +1,1165 @@
+"""Row and columnar layouts of the ``vbump`` node in HDF5 files.
+
+``rows`` (the original layout) stores ``vbump`` as one compound dataset, 60 bytes per
+row. ``columnar`` stores ``vbump`` as an HDF5 group with one 1-D dataset per field
+(``x0 .. z1``, ``D``, ``group``), each chunked and filtered on its own (shuffle + codec
+from the storage profile). Column scans such as ``get_existing_groups`` then read 4 of
+the 60 bytes per row, and byte-shuffled homogeneous columns compress far better than
+interleaved compound rows.
+
+``vertical`` is the columnar layout for bumps with ``x0 == x1``, ``y0 == y1`` and a
+constant ``z0``/``z1`` per group (grids, DXF and IGES imports). It stores only ``x0``,
+``y0``, ``D`` and ``group`` per row plus a small ``group_z`` table of ``(gid, z0, z1)``;
+``x1``, ``y1``, ``z0`` and ``z1`` are rebuilt on read. When a chunk breaks the
+assumption, the writer materializes the derived columns and continues as ``columnar``.
+
+``rows`` nodes written with a contiguous profile (``scratch``) are preallocated to the
+expected row count without chunking or filters, which lets :meth:`VBumpReader.memmap`
+map them straight from the file: reads become zero-copy ``np.memmap`` slices and only
+the touched pages are loaded. Rows beyond the ``rows`` attribute are unused slack; a
+writer that outgrows the preallocation moves the data into a chunked dataset.
+Set ``VBUMP_MMAP=0`` to disable memory mapping.
+
+Readers never look at the layout themselves: :func:`open_vbump` returns a
+:class:`VBumpReader` whose ``read`` yields the same structured arrays for both layouts,
+and :func:`create_vbump` returns a :class:`VBumpWriter` that accepts structured arrays.
+The ``bounding_box`` attribute lives on the ``vbump`` node in both layouts.
+
+In the columnar layouts the ``group`` column may be *constant*: instead of a dataset the
+node carries a ``constant_group`` attribute and readers return that id for every row
+(written by :func:`copy_with_constant_group`).
+
+Bounding boxes are ``[[xmin, ymin, zmin], [xmax, ymax, zmax]]`` with x/y extents padded
+by half the bump diameter (z is not padded): the space the bumps occupy, not the span of
+their centre lines. The overall box sits on the ``vbump`` node and one box per group on
+``groups/<gid>``. Writers that record the complete set through :func:`write_bbox_attrs`
+also set ``bbox_padding = "half_diameter"``; merges then combine these attributes
+(:func:`read_bbox_attrs`) instead of rescanning rows, and rescan only sources without
+the marker.
+
+The same writers record a statistics block (``stats_version``): ``rows``, ``d_range``
+and ``z_range`` on every ``groups/<gid>`` node, and a D histogram over fixed log bins
+(plus exact D value counts when there are few distinct diameters) on the ``vbump`` node.
+:func:`read_stats` returns it, or None for files written without it.
+
+A ``layered`` node holds no rows of its own: it is a copy-on-write delta (row mask,
+per-group overrides or an appended block) over another file's ``vbump`` node, read
+through :class:`VBump.Layers.LayeredReader`; :func:`open_vbump` returns that reader
+transparently.
+
+Either layout can also store an *encoding* (recorded in the ``encoding`` attribute):
+``float32`` keeps coordinates and ``D`` as float32, ``fixed`` keeps them as int32
+multiples of ``fixed_scale`` (mm) after subtracting ``fixed_offset``. ``group`` becomes
+int16 when the writer is told the group range fits. Writers reject chunks whose decoded
+values deviate from the input by more than the profile's ``tolerance``; readers decode
+back to the float64 :func:`vbump_dtype` so callers never see the compact types.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Sequence
+
+if TYPE_CHECKING:
+    from VBump.Storage import StorageProfile
+
+VBUMP_FIELDS: tuple[str, ...] = ("x0", "y0", "z0", "x1", "y1", "z1", "D", "group")
+LAYOUTS = ("rows", "columnar", "vertical")
+# Copy-on-write delta over another file's node (see VBump.Layers); never written by profiles.
+LAYERED_LAYOUT = "layered"
+LAYOUT_ATTR = "layout"
+ROWS_ATTR = "rows"
+GROUP_Z = "group_z"
+# Columns the vertical layout derives instead of storing (x1 = x0, y1 = y0).
+_VIRTUAL_SOURCES = {"x1": "x0", "y1": "y0"}
+_EXPAND_CHUNK = 1_000_000
+MMAP_ENV = "VBUMP_MMAP"
+# HDF5 file drivers that keep raw data at plain offsets in one file.
+_MMAP_DRIVERS = ("sec2", "stdio", "windows")
+ENCODINGS = ("float64", "float32", "fixed")
+ENCODING_ATTR = "encoding"
+CONSTANT_GROUP_ATTR = "constant_group"
+BBOX_ATTR = "bounding_box"
+BBOX_PADDING_ATTR = "bbox_padding"
+BBOX_PADDING = "half_diameter"
+STATS_ATTR = "stats_version"
+STATS_VERSION = 1
+D_HISTOGRAM_ATTR = "d_histogram"
+D_HISTOGRAM_EDGES_ATTR = "d_histogram_edges"
+D_VALUES_ATTR = "d_values"
+D_VALUE_COUNTS_ATTR = "d_value_counts"
+D_RANGE_ATTR = "d_range"
+Z_RANGE_ATTR = "z_range"
+# D histogram: 10 log-spaced bins per decade from 1 um to 1 m; outliers land in the end bins.
+D_HISTOGRAM_DECADES = (-3, 3)
+D_HISTOGRAM_BINS_PER_DECADE = 10
+MAX_D_VALUES = 64
+_INT16_RANGE = (-32768, 32767)
+_INT32_MAX = 2**31 - 1
+
+
+def vbump_dtype():
+    """Return the compound dtype shared by every vbump HDF5 writer."""
+    from VBump.Basic import _require_numpy
+
+    np = _require_numpy()
+    return np.dtype([
+        ("x0", np.float64),
+        ("y0", np.float64),
+        ("z0", np.float64),
+        ("x1", np.float64),
+        ("y1", np.float64),
+        ("z1", np.float64),
+        ("D", np.float64),
+        ("group", np.int32),
+    ])
+
+
+def _is_group(node) -> bool:
+    return hasattr(node, "keys") and not hasattr(node, "dtype")
+
+
+def layout_of(handle, name: str = "vbump") -> str:
+    node = handle[name]
+    if not _is_group(node):
+        return "rows"
+    layout = node.attrs.get(LAYOUT_ATTR, "columnar")
+    return layout.decode() if isinstance(layout, bytes) else str(layout)
+
+
+def _names(raw) -> list[str]:
+    return [n.decode() if isinstance(n, bytes) else str(n) for n in raw]
+
+
+class VBumpEncoding:
+    """Compact on-disk representation of the float fields of a vbump array."""
+
+    def __init__(
+        self,
+        name: str,
+        logical,
+        *,
+        fields: Sequence[str] | None = None,
+        scale: float = 1e-4,
+        offset: float = 0.0,
+        tolerance: float = 5e-4,
+        group_dtype: str = "int32",
+    ) -> None:
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        if name not in ENCODINGS[1:]:
+            raise ValueError(f"Unknown encoding '{name}'. Expected one of {', '.join(ENCODINGS)}.")
+        self.name = name
+        self.logical = logical
+        if fields is None:
+            fields = [n for n in logical.names if logical[n].kind == "f"]
+        self.fields = tuple(fields)
+        self.scale = float(scale)
+        self.offset = float(offset)
+        self.tolerance = float(tolerance)
+        value_type = np.float32 if name == "float32" else np.int32
+        self.stored = np.dtype([
+            (n, value_type if n in self.fields else (group_dtype if n == "group" else logical[n]))
+            for n in logical.names
+        ])
+
+    @classmethod
+    def from_attrs(cls, attrs, stored) -> "VBumpEncoding | None":
+        name = attrs.get(ENCODING_ATTR)
+        if name is None:
+            return None
+        name = name.decode() if isinstance(name, bytes) else str(name)
+        if name == "float64":
+            return None
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        fields = _names(attrs["encoded_fields"])
+        logical = np.dtype([
+            (n, np.float64 if n in fields else (np.int32 if n == "group" else stored[n]))
+            for n in stored.names
+        ])
+        enc = cls(
+            name,
+            logical,
+            fields=fields,
+            scale=float(attrs.get("fixed_scale", 1e-4)),
+            offset=float(attrs.get("fixed_offset", 0.0)),
+            group_dtype=stored["group"].str if "group" in stored.names else "int32",
+        )
+        enc.stored = stored
+        return enc
+
+    def write_attrs(self, attrs) -> None:
+        attrs[ENCODING_ATTR] = self.name
+        attrs["encoded_fields"] = list(self.fields)
+        attrs["tolerance"] = self.tolerance
+        if self.name == "fixed":
+            attrs["fixed_scale"] = self.scale
+            attrs["fixed_offset"] = self.offset
+
+    def encode(self, data):
+        """Return ``data`` in the stored dtype; raise ValueError when precision is lost."""
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        out = np.empty(len(data), dtype=self.stored)
+        for n in self.stored.names:
+            out[n] = self.encode_column(n, data[n])
+        return out
+
+    def encode_column(self, name: str, column):
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        if name in self.fields:
+            column = np.asarray(column, dtype=np.float64)
+            if self.name == "fixed":
+                steps = np.rint((column - self.offset) / self.scale)
+                if steps.size and np.nanmax(np.abs(steps)) > _INT32_MAX:
+                    raise ValueError(
+                        f"Field '{name}' exceeds the fixed-point range "
+                        f"(±{_INT32_MAX * self.scale:,.0f} mm at scale {self.scale} mm)."
+                    )
+                encoded = steps.astype(self.stored[name])
+            else:
+                encoded = column.astype(self.stored[name])
+            error = np.nanmax(np.abs(self.decode_column(name, encoded) - column)) if column.size else 0.0
+            if error > self.tolerance:
+                raise ValueError(
+                    f"{self.name} encoding of field '{name}' loses {error:.3g} mm "
+                    f"(tolerance {self.tolerance:.3g} mm); use a float64 storage profile."
+                )
+            return encoded
+        if name == "group" and self.stored[name].itemsize == 2 and len(column):
+            low, high = int(np.min(column)), int(np.max(column))
+            if low < _INT16_RANGE[0] or high > _INT16_RANGE[1]:
+                raise ValueError(f"Group ids {low}..{high} do not fit the int16 group column.")
+        return np.asarray(column).astype(self.stored[name], copy=False)
+
+    def decode(self, data, names: Sequence[str]):
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        out = np.empty(len(data), dtype=np.dtype([(n, self.logical[n]) for n in names]))
+        for n in names:
+            out[n] = self.decode_column(n, data[n])
+        return out
+
+    def decode_column(self, name: str, column):
+        if name in self.fields and self.name == "fixed":
+            return column * self.scale + self.offset
+        return column.astype(self.logical[name], copy=False)
+
+
+def _vertical_groups(data):
+    """Return ``{gid: (z0, z1)}`` when every row of ``data`` is vertical with per-group z, else None."""
+    from VBump.Basic import _require_numpy
+
+    np = _require_numpy()
+    if len(data) == 0:
+        return {}
+    if not (np.array_equal(data["x0"], data["x1"]) and np.array_equal(data["y0"], data["y1"])):
+        return None
+    order = np.argsort(data["group"], kind="stable")
+    gids = data["group"][order]
+    starts = np.flatnonzero(np.r_[True, gids[1:] != gids[:-1]])
+    result = {}
+    for name in ("z0", "z1"):
+        values = np.asarray(data[name], dtype=np.float64)[order]
+        low = np.minimum.reduceat(values, starts)
+        high = np.maximum.reduceat(values, starts)
+        if not np.array_equal(low, high):
+            return None
+        result[name] = low
+    return {
+        int(gid): (float(z0), float(z1))
+        for gid, z0, z1 in zip(gids[starts], result["z0"], result["z1"])
+    }
+
+
+class VBumpReader:
+    """Layout-independent, chunk-wise access to a ``vbump`` node."""
+
+    def __init__(self, handle, name: str = "vbump") -> None:
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        if name not in handle:
+            raise KeyError(f"Dataset '{name}' not found.")
+        self.node = handle[name]
+        self.attrs = self.node.attrs
+        self._group_z = None
+        self._mmap: Any = False
+        if not _is_group(self.node):
+            self.layout = "rows"
+            stored = self.node.dtype
+            allocated = int(self.node.shape[0]) if self.node.shape else 0
+            self.rows = min(int(self.node.attrs.get(ROWS_ATTR, allocated)), allocated)
+            self.fields: tuple[str, ...] = tuple(stored.names or ())
+            self.storage_dtype = stored
+        else:
+            layout = self.node.attrs.get(LAYOUT_ATTR, "columnar")
+            self.layout = layout.decode() if isinstance(layout, bytes) else str(layout)
+            stored_names = self.node.attrs.get("columns")
+            if stored_names is not None:
+                names = _names(stored_names)
+            else:
+                names = [n for n in VBUMP_FIELDS if n in self.node]
+            self.fields = tuple(names)
+            self.storage_dtype = np.dtype([(n, self.node[n].dtype) for n in names if n in self.node and n != GROUP_Z])
+            # Virtual columns of the vertical layout borrow the dtype of the column they mirror.
+            stored = np.dtype([(n, self._column_dtype(n)) for n in names])
+            first = self.storage_dtype.names[0] if self.storage_dtype.names else None
+            self.rows = int(self.node.attrs.get(ROWS_ATTR, self.node[first].shape[0] if first else 0))
+        self.encoding = VBumpEncoding.from_attrs(self.node.attrs, stored)
+        self.dtype = self.encoding.logical if self.encoding is not None else stored
+
+    def _column_dtype(self, name: str):
+        if name in self.storage_dtype.names:
+            return self.storage_dtype[name]
+        if name == "group":
+            from VBump.Basic import _require_numpy
+
+            return _require_numpy().dtype("int32")
+        return self.storage_dtype[_VIRTUAL_SOURCES.get(name, "x0")]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def shape(self) -> tuple[int]:
+        return (self.rows,)
+
+    def _z_table(self):
+        if self._group_z is None:
+            from VBump.Basic import _require_numpy
+
+            np = _require_numpy()
+            table = self.node[GROUP_Z][()] if GROUP_Z in self.node else np.empty((0, 3))
+            order = np.argsort(table[:, 0], kind="stable")
+            self._group_z = table[order]
+        return self._group_z
+
+    def _columns(self, names: Sequence[str], start: int, end: int) -> dict[str, Any]:
+        """Read and decode the requested columns of a columnar or vertical node."""
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        cache: dict[str, Any] = {}
+
+        def column(n: str):
+            if n in cache:
+                return cache[n]
+            if n in self.storage_dtype.names:
+                value = self.node[n][start:end]
+                if self.encoding is not None:
+                    value = self.encoding.decode_column(n, value)
+            elif n in _VIRTUAL_SOURCES:
+                value = column(_VIRTUAL_SOURCES[n])
+            elif n == "group" and CONSTANT_GROUP_ATTR in self.attrs:
+                value = np.full(end - start, int(self.attrs[CONSTANT_GROUP_ATTR]), dtype=np.int32)
+            else:
+                table = self._z_table()
+                gids = column("group")
+                index = np.searchsorted(table[:, 0], gids)
+                index = np.clip(index, 0, max(len(table) - 1, 0))
+                if len(gids) and (len(table) == 0 or not np.array_equal(table[index, 0], gids)):
+                    raise ValueError("Vertical vbump node is missing z values for some groups.")
+                value = table[index, 1 if n == "z0" else 2]
+            cache[n] = value
+            return value
+
+        return {n: column(n) for n in names}
+
+    def read(self, start: int = 0, end: int | None = None, fields: Sequence[str] | None = None):
+        """Return rows ``[start, end)`` as a structured array, optionally only ``fields``.
+
+        In the columnar layouts only the requested columns are read from disk. Encoded
+        files are decoded to float64 coordinates.
+        """
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        end = self.rows if end is None else min(end, self.rows)
+        names = list(fields) if fields is not None else list(self.fields)
+        if self.layout == "rows":
+            view = self.memmap()
+            if view is not None:
+                data = view[start:end] if fields is None else view[names][start:end]
+            else:
+                data = self.node[start:end] if fields is None else self.node.fields(names)[start:end]
+            if self.encoding is None:
+                return data
+            return self.encoding.decode(data, names)
+        out = np.empty(max(0, end - start), dtype=np.dtype([(n, self.dtype[n]) for n in names]))
+        if end > start:
+            for n, value in self._columns(names, start, end).items():
+                out[n] = value
+        return out
+
+    def read_column(self, field: str, start: int = 0, end: int | None = None):
+        end = self.rows if end is None else min(end, self.rows)
+        if self.layout != "rows":
+            return self._columns([field], start, end)[field]
+        view = self.memmap()
+        column = view[field][start:end] if view is not None else self.node.fields(field)[start:end]
+        if self.encoding is not None:
+            column = self.encoding.decode_column(field, column)
+        return column
+
+    def memmap(self):
+        """Return a read-only ``np.memmap`` of the rows, or None when the node cannot be mapped.
+
+        Mapping needs the ``rows`` layout stored contiguously without filters in a plain
+        single-file HDF5 driver, with allocated storage and a native-endian dtype.
+        """
+        if self._mmap is False:
+            self._mmap = self._open_memmap()
+        return self._mmap
+
+    def _open_memmap(self):
+        if self.layout != "rows" or self.rows == 0 or os.environ.get(MMAP_ENV, "1") == "0":
+            return None
+        if self.node.file.mode != "r":
+            return None
+        offset = _contiguous_offset(self.node)
+        if offset is None:
+            return None
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        return np.memmap(self.node.file.filename, dtype=self.node.dtype, mode="r", offset=offset, shape=(self.rows,))
+
+    def iter_chunks(self, chunk_size: int, fields: Sequence[str] | None = None) -> Iterator[tuple[int, int, Any]]:
+        for start in range(0, self.rows, chunk_size):
+            end = min(start + chunk_size, self.rows)
+            yield start, end, self.read(start, end, fields)
+
+    def bytes_per_row(self, fields: Iterable[str] | None = None) -> int:
+        if self.layout == "rows":
+            return int(self.storage_dtype.itemsize)
+        names = list(fields) if fields is not None else list(self.fields)
+        return int(sum(self.storage_dtype[n].itemsize for n in names if n in self.storage_dtype.names))
+
+
+class VBumpWriter:
+    """Append or write structured vbump arrays into any layout."""
+
+    def __init__(
+        self,
+        node,
+        layout: str,
+        dtype,
+        rows: int,
+        encoding: VBumpEncoding | None = None,
+        dataset_kwargs: dict[str, Any] | None = None,
+    ) -> None:
+        self.node = node
+        self.layout = layout
+        self.dtype = dtype
+        self.rows = rows
+        self.encoding = encoding
+        self.attrs = node.attrs
+        self._dataset_kwargs = dataset_kwargs or {}
+        self._group_z: dict[int, tuple[float, float]] = {}
+        self.contiguous = layout == "rows" and node.chunks is None
+        if layout == "vertical":
+            self.columns = [n for n in dtype.names if n not in _VIRTUAL_SOURCES and n not in ("z0", "z1")]
+        else:
+            self.columns = list(dtype.names)
+
+    def _resize(self, rows: int) -> None:
+        if self.layout == "rows":
+            if self.node.shape[0] < rows:
+                if self.contiguous:
+                    self._make_growable(rows)
+                self.node.resize((rows,))
+        else:
+            for n in self.columns:
+                column = self.node[n]
+                if column.shape[0] < rows:
+                    column.resize((rows,))
+            self.node.attrs[ROWS_ATTR] = max(rows, int(self.node.attrs.get(ROWS_ATTR, 0)))
+
+    def write(self, start: int, data) -> None:
+        """Write ``data`` at row ``start``, growing the node when needed."""
+        end = start + len(data)
+        if end == start:
+            return
+        if self.layout == "vertical" and not self._record_vertical(data):
+            self._expand_vertical()
+        if self.encoding is not None:
+            data = self.encoding.encode(data)
+        self._resize(end)
+        if self.layout == "rows":
+            self.node[start:end] = data
+        else:
+            for n in self.columns:
+                self.node[n][start:end] = data[n]
+        self.rows = max(self.rows, end)
+
+    def append(self, data) -> None:
+        self.write(self.rows, data)
+
+    def _make_growable(self, rows: int) -> None:
+        """Move a contiguous node that ran out of preallocated rows into a chunked dataset."""
+        parent = self.node.parent
+        name = self.node.name.rsplit("/", 1)[-1]
+        moved = f"{name}.growing"
+        dset = parent.create_dataset(
+            moved, shape=(rows,), maxshape=(None,), dtype=self.node.dtype, **self._dataset_kwargs
+        )
+        for start in range(0, self.rows, _EXPAND_CHUNK):
+            end = min(start + _EXPAND_CHUNK, self.rows)
+            dset[start:end] = self.node[start:end]
+        for key, value in self.node.attrs.items():
+            if key != ROWS_ATTR:
+                dset.attrs[key] = value
+        del parent[name]
+        parent.move(moved, name)
+        self.node = parent[name]
+        self.attrs = self.node.attrs
+        self.contiguous = False
+
+    def _record_vertical(self, data) -> bool:
+        """Merge the chunk's per-group z into the z table; False when it is not vertical."""
+        groups = _vertical_groups(data)
+        if groups is None:
+            return False
+        added = False
+        for gid, z in groups.items():
+            known = self._group_z.get(gid)
+            if known is None:
+                self._group_z[gid] = z
+                added = True
+            elif known != z:
+                return False
+        if added:
+            self._store_z_table()
+        return True
+
+    def _store_z_table(self) -> None:
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        table = np.array([(gid, z0, z1) for gid, (z0, z1) in sorted(self._group_z.items())], dtype=np.float64)
+        if GROUP_Z in self.node:
+            del self.node[GROUP_Z]
+        self.node.create_dataset(GROUP_Z, data=table.reshape(-1, 3))
+
+    def _expand_vertical(self) -> None:
+        """Materialize the virtual columns and continue as a plain columnar node."""
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        allocated = self.node["x0"].shape[0]
+        for target, source in _VIRTUAL_SOURCES.items():
+            self.node.copy(self.node[source], target)
+        table = np.array([(gid, z0, z1) for gid, (z0, z1) in sorted(self._group_z.items())], dtype=np.float64)
+        table = table.reshape(-1, 3)
+        for name, col in (("z0", 1), ("z1", 2)):
+            dtype = self.encoding.stored[name] if self.encoding is not None else self.dtype[name]
+            dset = self.node.create_dataset(
+                name, shape=(allocated,), maxshape=(None,), dtype=dtype, **self._dataset_kwargs
+            )
+            for start in range(0, self.rows, _EXPAND_CHUNK):
+                end = min(start + _EXPAND_CHUNK, self.rows)
+                gids = self.node["group"][start:end]
+                values = table[np.searchsorted(table[:, 0], gids), col]
+                if self.encoding is not None:
+                    values = self.encoding.encode_column(name, values)
+                dset[start:end] = values
+        if GROUP_Z in self.node:
+            del self.node[GROUP_Z]
+        self._group_z.clear()
+        self.node.attrs[LAYOUT_ATTR] = "columnar"
+        self.layout = "columnar"
+        self.columns = list(self.dtype.names)
+
+    def finish(self) -> None:
+        """Trim preallocated space beyond the rows actually written."""
+        if self.layout == "rows":
+            if self.contiguous:
+                if self.node.shape[0] != self.rows:
+                    self.node.attrs[ROWS_ATTR] = self.rows
+            elif self.node.shape[0] != self.rows:
+                self.node.resize((self.rows,))
+        else:
+            for n in self.columns:
+                if self.node[n].shape[0] != self.rows:
+                    self.node[n].resize((self.rows,))
+            self.node.attrs[ROWS_ATTR] = self.rows
+
+
+def _contiguous_offset(node) -> int | None:
+    """File offset of a contiguous, unfiltered, native-endian dataset in a single-file driver."""
+    if node.chunks is not None or node.compression is not None or not node.dtype.isnative:
+        return None
+    if node.file.driver not in _MMAP_DRIVERS:
+        return None
+    return node.id.get_offset()
+
+
+def _fits_int16(group_range: tuple[int, int] | None) -> bool:
+    return group_range is not None and _INT16_RANGE[0] <= group_range[0] and group_range[1] <= _INT16_RANGE[1]
+
+
+def create_vbump(
+    handle,
+    dtype,
+    profile: "StorageProfile",
+    *,
+    total: int | None = None,
+    name: str = "vbump",
+    group_range: tuple[int, int] | None = None,
+) -> VBumpWriter:
+    """Create the ``vbump`` node using ``profile``'s layout, encoding, codec and chunk shape.
+
+    ``total`` preallocates rows (and sizes chunks); without it the node starts empty and
+    grows with every append. ``group_range`` (min, max) lets compact encodings store
+    ``group`` as int16.
+    """
+    rows = int(total or 0)
+    kwargs = profile.dataset_kwargs(total)
+    encoding = None
+    stored = dtype
+    if profile.encoding != "float64":
+        encoding = VBumpEncoding(
+            profile.encoding,
+            dtype,
+            scale=profile.fixed_scale,
+            tolerance=profile.tolerance,
+            group_dtype="int16" if _fits_int16(group_range) else "int32",
+        )
+        stored = encoding.stored
+
+    if profile.layout == "rows":
+        if profile.contiguous and rows > 0:
+            node = handle.create_dataset(name, shape=(rows,), dtype=stored)
+            # Chunk shape for the dataset a writer moves to when it outgrows ``total``.
+            kwargs = profile.dataset_kwargs()
+        else:
+            node = handle.create_dataset(name, shape=(rows,), maxshape=(None,), dtype=stored, **kwargs)
+        writer = VBumpWriter(node, "rows", dtype, 0, encoding, kwargs)
+    else:
+        node = handle.create_group(name)
+        node.attrs[LAYOUT_ATTR] = profile.layout
+        node.attrs["columns"] = list(dtype.names)
+        node.attrs[ROWS_ATTR] = 0
+        if profile.compression is not None and profile.compression != "blosc":
+            # Byte-shuffle homogeneous columns before the codec; Blosc shuffles internally.
+            kwargs["shuffle"] = True
+        writer = VBumpWriter(node, profile.layout, dtype, 0, encoding, kwargs)
+        for n in writer.columns:
+            node.create_dataset(n, shape=(rows,), maxshape=(None,), dtype=stored[n], **kwargs)
+    if encoding is not None:
+        encoding.write_attrs(node.attrs)
+    return writer
+
+
+def open_vbump(handle, name: str = "vbump") -> VBumpReader:
+    if name in handle and layout_of(handle, name) == LAYERED_LAYOUT:
+        from VBump.Layers import LayeredReader
+
+        return LayeredReader(handle, name)
+    return VBumpReader(handle, name)
+
+
+def group_range_of(handle) -> tuple[int, int] | None:
+    """Return the (min, max) group id recorded in the ``groups`` hierarchy, if any."""
+    if "groups" not in handle:
+        return None
+    ids = []
+    for key in handle["groups"]:
+        try:
+            ids.append(int(key))
+        except ValueError:
+            continue
+    return (min(ids), max(ids)) if ids else None
+
+
+# ---------------------------------------------------------------------------
+# Bounding boxes and statistics
+
+
+def _chunk_extents(data, padded: bool = True):
+    """Return ``(gids, rows, mins, maxs)`` per group of one chunk, as arrays.
+
+    ``mins``/``maxs`` hold six columns each: the box extents (x, y, z), then D, z0, z1.
+    """
+    from VBump.Basic import _require_numpy
+
+    np = _require_numpy()
+    diameters = np.asarray(data["D"], dtype=np.float64)
+    half = diameters / 2.0 if padded else 0.0
+    lows = [
+        np.minimum(data["x0"], data["x1"]) - half,
+        np.minimum(data["y0"], data["y1"]) - half,
+        np.minimum(data["z0"], data["z1"]),
+        diameters,
+        np.asarray(data["z0"]),
+        np.asarray(data["z1"]),
+    ]
+    highs = [
+        np.maximum(data["x0"], data["x1"]) + half,
+        np.maximum(data["y0"], data["y1"]) + half,
+        np.maximum(data["z0"], data["z1"]),
+        diameters,
+        np.asarray(data["z0"]),
+        np.asarray(data["z1"]),
+    ]
+    groups = np.asarray(data["group"])
+    if groups[0] == groups.min() == groups.max():
+        # Single-group chunks (the common case) skip the sort.
+        return (
+            groups[:1],
+            np.array([len(groups)]),
+            [column.min(keepdims=True) for column in lows],
+            [column.max(keepdims=True) for column in highs],
+        )
+    order = np.argsort(groups, kind="stable")
+    gids = groups[order]
+    starts = np.flatnonzero(np.r_[True, gids[1:] != gids[:-1]])
+    counts = np.diff(np.r_[starts, len(gids)])
+    return (
+        gids[starts],
+        counts,
+        [np.minimum.reduceat(column[order], starts) for column in lows],
+        [np.maximum.reduceat(column[order], starts) for column in highs],
+    )
+
+
+def chunk_bboxes(data, padded: bool = True) -> dict[int, tuple[int, list[float]]]:
+    """Return ``{gid: (rows, [xmin, ymin, zmin, xmax, ymax, zmax])}`` for one chunk.
+
+    x/y extents are padded by half the diameter (see ``BBOX_PADDING``) unless
+    ``padded`` is False.
+    """
+    if len(data) == 0:
+        return {}
+    gids, counts, mins, maxs = _chunk_extents(data, padded)
+    return {
+        int(gid): (int(count), [float(mins[0][i]), float(mins[1][i]), float(mins[2][i]),
+                                float(maxs[0][i]), float(maxs[1][i]), float(maxs[2][i])])
+        for i, (gid, count) in enumerate(zip(gids, counts))
+    }
+
+
+def merge_bbox(into: list[float] | None, bbox: list[float]) -> list[float]:
+    """Union of two ``[xmin, ymin, zmin, xmax, ymax, zmax]`` boxes (``into`` may be None)."""
+    if into is None:
+        return list(bbox)
+    return [min(into[i], bbox[i]) for i in range(3)] + [max(into[i], bbox[i]) for i in range(3, 6)]
+
+
+def d_histogram_edges():
+    """Fixed, log-spaced D histogram bin edges (mm) shared by every file."""
+    from VBump.Basic import _require_numpy
+
+    np = _require_numpy()
+    low, high = D_HISTOGRAM_DECADES
+    return np.logspace(low, high, (high - low) * D_HISTOGRAM_BINS_PER_DECADE + 1)
+
+
+class BBoxAccumulator:
+    """Running bounding boxes and statistics of structured vbump chunks.
+
+    :meth:`add` consumes one structured chunk with vectorized reductions; boxes already
+    known (file attributes, a previous writer) enter through :meth:`add_boxes`. Partial
+    accumulators, e.g. one per worker process, are picklable and combine with
+    :meth:`merge`. Boxes are ``[xmin, ymin, zmin, xmax, ymax, zmax]``.
+
+    ``padded`` (the default) pads x/y by half the diameter, the convention of stored
+    metadata (``BBOX_PADDING``); ``padded=False`` tracks the centre lines only, which is
+    what wireframe outlines (:class:`VBump.ExportWDL.AABB`) draw.
+
+    Besides the boxes it keeps the statistics block: row counts, ``[Dmin, Dmax]`` and
+    ``[z0min, z1min, z0max, z1max]`` per group, a D histogram over
+    :func:`d_histogram_edges` and exact D value counts while there are at most
+    ``MAX_D_VALUES`` distinct diameters (else ``d_values`` is None).
+    ``stats_complete`` turns False once boxes without statistics were folded in.
+    """
+
+    def __init__(self, padded: bool = True) -> None:
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        self.padded = padded
+        self.rows = 0
+        self.bounding_box: list[float] | None = None
+        self.group_bounding_boxes: dict[int, list[float]] = {}
+        self.group_rows: dict[int, int] = {}
+        self.group_d_range: dict[int, list[float]] = {}
+        self.group_z_range: dict[int, list[float]] = {}
+        self.d_histogram = np.zeros(len(d_histogram_edges()) - 1, dtype=np.int64)
+        self.d_values: dict[float, int] | None = {}
+        self.stats_complete = True
+
+    @classmethod
+    def from_attrs(cls, handle, name: str = "vbump") -> "BBoxAccumulator | None":
+        """Restore an accumulator from :meth:`write_attrs` output; None without boxes.
+
+        Files with boxes but no (or an outdated) statistics block come back with
+        ``stats_complete`` False.
+        """
+        known = read_bbox_attrs(handle, name)
+        if known is None:
+            return None
+        acc = cls()
+        acc.add_boxes(*known)
+        attrs = handle[name].attrs
+        if attrs.get(STATS_ATTR) != STATS_VERSION:
+            return acc
+        groups_root = handle.get("groups", {})
+        for gid in acc.group_bounding_boxes:
+            group_attrs = groups_root[str(gid)].attrs
+            if any(key not in group_attrs for key in (ROWS_ATTR, D_RANGE_ATTR, Z_RANGE_ATTR)):
+                return acc
+        for gid in acc.group_bounding_boxes:
+            group_attrs = groups_root[str(gid)].attrs
+            z_range = group_attrs[Z_RANGE_ATTR]
+            acc.group_rows[gid] = int(group_attrs[ROWS_ATTR])
+            acc.group_d_range[gid] = [float(v) for v in group_attrs[D_RANGE_ATTR]]
+            acc.group_z_range[gid] = [float(v) for v in z_range[0]] + [float(v) for v in z_range[1]]
+        acc.rows = sum(acc.group_rows.values())
+        acc.d_histogram[:] = attrs[D_HISTOGRAM_ATTR]
+        if D_VALUES_ATTR in attrs:
+            acc.d_values = dict(zip(attrs[D_VALUES_ATTR].tolist(), attrs[D_VALUE_COUNTS_ATTR].tolist()))
+        else:
+            acc.d_values = None
+        acc.stats_complete = True
+        return acc
+
+    def add(self, data) -> None:
+        """Fold one structured chunk (fields of :func:`vbump_dtype`) into the boxes and statistics."""
+        if len(data) == 0:
+            return
+        gids, counts, mins, maxs = _chunk_extents(data, self.padded)
+        for i, gid in enumerate(gids.tolist()):
+            self._add_group(
+                gid,
+                [float(mins[0][i]), float(mins[1][i]), float(mins[2][i]),
+                 float(maxs[0][i]), float(maxs[1][i]), float(maxs[2][i])],
+                int(counts[i]),
+                [float(mins[3][i]), float(maxs[3][i])],
+                [float(mins[4][i]), float(mins[5][i]), float(maxs[4][i]), float(maxs[5][i])],
+            )
+        self.rows += len(data)
+        self._add_diameters(data["D"])
+
+    def _add_diameters(self, diameters) -> None:
+        histogram, values = self._count_diameters(diameters)
+        self.d_histogram += histogram
+        self._add_values(values)
+
+    def _count_diameters(self, diameters):
+        """Histogram counts and (up to ``MAX_D_VALUES``) exact value counts of ``diameters``."""
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        d = np.asarray(diameters, dtype=np.float64)
+        low, high = d.min(), d.max()
+        edges = d_histogram_edges()
+        last = len(self.d_histogram) - 1
+        histogram = np.zeros_like(self.d_histogram)
+        if low == high:
+            histogram[min(max(int(np.searchsorted(edges, low, side="right")) - 1, 0), last)] = len(d)
+        else:
+            bins = np.clip(np.searchsorted(edges, d, side="right") - 1, 0, last)
+            histogram += np.bincount(bins, minlength=len(self.d_histogram))
+        if self.d_values is None:
+            return histogram, None
+        if low == high:
+            return histogram, {float(low): len(d)}
+        values, counts = np.unique(d, return_counts=True)
+        if len(values) > MAX_D_VALUES:
+            return histogram, None
+        return histogram, dict(zip(values.tolist(), counts.tolist()))
+
+    def remove_diameters(self, diameters) -> None:
+        """Take rows with ``diameters`` out of the D histogram and value counts.
+
+        The counterpart of the D part of :meth:`add` for rows leaving a dataset; their
+        group boxes and row counts go with :meth:`without_groups`.
+        """
+        if len(diameters) == 0:
+            return
+        histogram, values = self._count_diameters(diameters)
+        self.d_histogram -= histogram
+        if self.d_values is None:
+            return
+        if values is None:
+            self.d_values = None
+            return
+        for value, count in values.items():
+            left = self.d_values.get(value, 0) - count
+            if left > 0:
+                self.d_values[value] = left
+            else:
+                self.d_values.pop(value, None)
+
+    def _add_values(self, values: dict[float, int] | None) -> None:
+        if self.d_values is None:
+            return
+        if values is None:
+            self.d_values = None
+            return
+        for value, count in values.items():
+            self.d_values[value] = self.d_values.get(value, 0) + count
+        if len(self.d_values) > MAX_D_VALUES:
+            self.d_values = None
+
+    def add_boxes(
+        self,
+        overall: list[float] | None,
+        group_bbox: dict[int, list[float]],
+        group_rows: dict[int, int] | None = None,
+    ) -> None:
+        """Fold precomputed boxes (same padding as this accumulator) into the running ones.
+
+        Boxes carry no statistics, so ``stats_complete`` becomes False.
+        """
+        if overall is not None:
+            self.bounding_box = merge_bbox(self.bounding_box, overall)
+        for gid, bbox in group_bbox.items():
+            rows = group_rows.get(gid, 0) if group_rows else 0
+            self._add_group(int(gid), bbox, rows, None, None)
+            self.rows += rows
+        self.stats_complete = False
+
+    def merge(self, other: "BBoxAccumulator") -> "BBoxAccumulator":
+        """Fold a partial accumulator (e.g. from a worker) into this one."""
+        if other.padded != self.padded:
+            raise ValueError("Cannot merge padded and unpadded bounding boxes.")
+        if other.bounding_box is not None:
+            self.bounding_box = merge_bbox(self.bounding_box, other.bounding_box)
+        for gid, bbox in other.group_bounding_boxes.items():
+            self._add_group(
+                gid, bbox, other.group_rows.get(gid, 0), other.group_d_range.get(gid), other.group_z_range.get(gid)
+            )
+        self.rows += other.rows
+        self.d_histogram += other.d_histogram
+        self._add_values(other.d_values)
+        self.stats_complete = self.stats_complete and other.stats_complete
+        return self
+
+    def without_groups(self, gids: Iterable[int]) -> "BBoxAccumulator":
+        """Return a copy without the boxes and row counts of ``gids``.
+
+        The D histogram is left untouched; callers remove the dropped rows' diameters
+        with :meth:`remove_diameters` (and add replacement rows with :meth:`add`).
+        """
+        dropped = {int(gid) for gid in gids}
+        acc = BBoxAccumulator(self.padded)
+        for gid, bbox in self.group_bounding_boxes.items():
+            if gid not in dropped:
+                acc._add_group(gid, bbox, self.group_rows.get(gid, 0), self.group_d_range.get(gid), self.group_z_range.get(gid))
+        acc.rows = self.rows - sum(self.group_rows.get(gid, 0) for gid in dropped)
+        acc.d_histogram += self.d_histogram
+        acc.d_values = dict(self.d_values) if self.d_values is not None else None
+        acc.stats_complete = self.stats_complete
+        return acc
+
+    def regroup(self, group: int) -> "BBoxAccumulator":
+        """Return a copy with every group folded into ``group`` (see group reassignment)."""
+        acc = BBoxAccumulator(self.padded)
+        if self.bounding_box is not None:
+            acc._add_group(group, self.bounding_box, self.rows, None, None)
+        for gid in self.group_bounding_boxes:
+            acc._add_group(group, self.bounding_box, 0, self.group_d_range.get(gid), self.group_z_range.get(gid))
+        acc.rows = self.rows
+        acc.d_histogram += self.d_histogram
+        acc.d_values = dict(self.d_values) if self.d_values is not None else None
+        acc.stats_complete = self.stats_complete
+        return acc
+
+    def write_attrs(self, handle, attrs) -> None:
+        """Record the boxes (:func:`write_bbox_attrs`) and, when complete, the statistics block.
+
+        Only padded accumulators can be stored. Incomplete statistics remove any
+        statistics attributes left over from a copied source.
+        """
+        if not self.padded:
+            raise ValueError("Only padded bounding boxes can be stored as vbump metadata.")
+        write_bbox_attrs(handle, attrs, self.bounding_box, self.group_bounding_boxes)
+        groups_root = handle["groups"]
+        for key in (STATS_ATTR, D_HISTOGRAM_ATTR, D_HISTOGRAM_EDGES_ATTR, D_VALUES_ATTR, D_VALUE_COUNTS_ATTR):
+            if key in attrs:
+                del attrs[key]
+        if not self.stats_complete:
+            for gid in self.group_bounding_boxes:
+                group_attrs = groups_root[str(gid)].attrs
+                for key in (ROWS_ATTR, D_RANGE_ATTR, Z_RANGE_ATTR):
+                    if key in group_attrs:
+                        del group_attrs[key]
+            return
+        from VBump.Basic import _require_numpy
+
+        np = _require_numpy()
+        for gid in self.group_bounding_boxes:
+            group_attrs = groups_root[str(gid)].attrs
+            z_range = self.group_z_range[gid]
+            group_attrs[ROWS_ATTR] = np.int64(self.group_rows[gid])
+            group_attrs[D_RANGE_ATTR] = np.asarray(self.group_d_range[gid], dtype=np.float64)
+            group_attrs[Z_RANGE_ATTR] = np.array([z_range[:2], z_range[2:]], dtype=np.float64)
+        attrs[D_HISTOGRAM_EDGES_ATTR] = d_histogram_edges()
+        attrs[D_HISTOGRAM_ATTR] = self.d_histogram
+        if self.d_values is not None:
+            values = sorted(self.d_values)
+            attrs[D_VALUES_ATTR] = np.asarray(values, dtype=np.float64)
+            attrs[D_VALUE_COUNTS_ATTR] = np.asarray([self.d_values[v] for v in values], dtype=np.int64)
+        attrs[STATS_ATTR] = STATS_VERSION
+
+    def _add_group(
+        self,
+        gid: int,
+        bbox: list[float],
+        rows: int,
+        d_range: list[float] | None,
+        z_range: list[float] | None,
+    ) -> None:
+        self.group_bounding_boxes[gid] = merge_bbox(self.group_bounding_boxes.get(gid), bbox)
+        self.bounding_box = merge_bbox(self.bounding_box, bbox)
+        self.group_rows[gid] = self.group_rows.get(gid, 0) + rows
+        if d_range is not None:
+            known = self.group_d_range.get(gid)
+            self.group_d_range[gid] = list(d_range) if known is None else [min(known[0], d_range[0]), max(known[1], d_range[1])]
+        if z_range is not None:
+            known = self.group_z_range.get(gid)
+            self.group_z_range[gid] = list(z_range) if known is None else [
+                min(known[0], z_range[0]), min(known[1], z_range[1]), max(known[2], z_range[2]), max(known[3], z_range[3])
+            ]
+
+
+def read_stats(handle, name: str = "vbump") -> BBoxAccumulator | None:
+    """Return the recorded statistics block of ``name`` as an accumulator, or None.
+
+    None means the file predates the block (or a writer could not vouch for it); callers
+    then fall back to scanning rows.
+    """
+    acc = BBoxAccumulator.from_attrs(handle, name)
+    return acc if acc is not None and acc.stats_complete else None
+
+
+def _bbox_pair(bbox: list[float]):
+    from VBump.Basic import _require_numpy
+
+    np = _require_numpy()
+    return np.array([bbox[:3], bbox[3:]], dtype=np.float64)
+
+
+def write_bbox_attrs(
+    handle,
+    attrs,
+    overall: list[float] | None,
+    group_bbox: dict[int, list[float]],
+) -> None:
+    """Record overall and per-group bounding boxes as complete, padded metadata.
+
+    ``attrs`` is the ``vbump`` node's attribute set (``writer.attrs``). Boxes must be
+    padded by half the diameter in x/y; the ``bbox_padding`` attribute marks them as such
+    and as covering every group, which lets :func:`read_bbox_attrs` trust them. Nodes
+    under ``groups`` whose group no longer has rows are removed.
+    """
+    if overall is not None:
+        attrs[BBOX_ATTR] = _bbox_pair(overall)
+    elif BBOX_ATTR in attrs:
+        del attrs[BBOX_ATTR]
+    attrs[BBOX_PADDING_ATTR] = BBOX_PADDING
+    groups_root = handle.require_group("groups")
+    keep = {str(gid) for gid in group_bbox}
+    for key in [key for key in groups_root if key not in keep]:
+        del groups_root[key]
+    for gid, bbox in sorted(group_bbox.items()):
+        groups_root.require_group(str(gid)).attrs[BBOX_ATTR] = _bbox_pair(bbox)
+
+
+def read_bbox_attrs(handle, name: str = "vbump") -> tuple[list[float] | None, dict[int, list[float]]] | None:
+    """Return ``(overall, {gid: bbox})`` recorded by :func:`write_bbox_attrs`, else None.
+
+    Files without the ``bbox_padding`` marker (written before it existed, or by tools
+    that store unpadded boxes) return None and must be rescanned with
+    :class:`BBoxAccumulator`.
+    """
+    if name not in handle:
+        return None
+    attrs = handle[name].attrs
+    padding = attrs.get(BBOX_PADDING_ATTR)
+    if isinstance(padding, bytes):
+        padding = padding.decode("utf-8")
+    if padding != BBOX_PADDING:
+        return None
+    raw = attrs.get(BBOX_ATTR)
+    overall = [float(v) for v in raw[0]] + [float(v) for v in raw[1]] if raw is not None else None
+    group_bbox: dict[int, list[float]] = {}
+    for key, node in handle.get("groups", {}).items():
+        box = node.attrs.get(BBOX_ATTR)
+        if box is None:
+            return None
+        try:
+            gid = int(key)
+        except ValueError:
+            return None
+        group_bbox[gid] = [float(v) for v in box[0]] + [float(v) for v in box[1]]
+    return overall, group_bbox
+
+
+def copy_with_constant_group(src_path: str, dst_path: str, group: int, name: str = "vbump") -> bool:
+    """Copy ``src_path`` to ``dst_path`` with every row's group set to ``group``, if cheap.
+
+    Without rewriting rows: a contiguous ``rows`` node is copied as a file and its
+    ``group`` field is overwritten through ``np.memmap``; a columnar node keeps its other
+    column datasets (copied chunk for chunk by HDF5) and gets a virtual constant group
+    column. Returns False, leaving ``dst_path`` untouched, when neither applies (chunked
+    ``rows`` nodes, a ``group`` storage type too narrow for ``group``, or vertical nodes
+    whose groups have different z values); callers then rewrite rows themselves.
+    Bounding box attributes are copied unchanged and must be rewritten by the caller.
+    """
+    import shutil
+
+    from VBump.Basic import _require_h5py, _require_numpy
+
+    h5py = _require_h5py()
+    np = _require_numpy()
+    with h5py.File(src_path, "r") as fin:
+        if name not in fin:
+            raise KeyError(f"Dataset '{name}' not found.")
+        reader = open_vbump(fin, name)
+        if reader.layout == LAYERED_LAYOUT:
+            return False
+        if reader.layout == "rows":
+            offset = _contiguous_offset(reader.node)
+            group_type = reader.storage_dtype["group"]
+            info = np.iinfo(group_type) if group_type.kind in "iu" else None
+            if offset is None or (info is not None and not info.min <= group <= info.max):
+                return False
+            dtype, allocated, rows = reader.node.dtype, int(reader.node.shape[0]), reader.rows
+        else:
+            z_pairs = None
+            if reader.layout == "vertical" and GROUP_Z in reader.node:
+                z_pairs = np.unique(reader.node[GROUP_Z][()][:, 1:], axis=0)
+                if len(z_pairs) > 1:
+                    return False
+            with h5py.File(dst_path, "w") as fout:
+                for key in fin:
+                    if key != name:
+                        fin.copy(key, fout)
+                node = fout.create_group(name)
+                for key, value in reader.attrs.items():
+                    node.attrs[key] = value
+                for key in reader.node:
+                    if key == GROUP_Z and z_pairs is not None:
+                        node[GROUP_Z] = np.array([[group, *pair] for pair in z_pairs], dtype=np.float64)
+                    elif key != "group":
+                        fin.copy(reader.node[key], node, name=key)
+                node.attrs[CONSTANT_GROUP_ATTR] = int(group)
+            return True
+    shutil.copyfile(src_path, dst_path)
+    if rows:
+        view = np.memmap(dst_path, dtype=dtype, mode="r+", offset=offset, shape=(allocated,))
+        view["group"][:rows] = group
+        view.flush()
+        del view
+    return True
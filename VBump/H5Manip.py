@@ -1,6 +1,10 @@
+import time
 from typing import Callable, List, Dict
 
-from VBump.Basic import VBump, _require_h5py, _require_numpy, _emit_log
+from VBump.Basic import CancelToken, VBump, _check_cancel, _require_h5py, _require_numpy, _emit_log
+from VBump.H5Layout import BBoxAccumulator, create_vbump, open_vbump, read_stats
+from VBump.Instrument import counter, span
+from VBump.Storage import DEFAULT_OUTPUT_STORAGE, StorageProfile, get_profile
 
 def make_move_func(dx, dy, dz, *,
                    new_group:int|None=None,
@@ -39,53 +43,53 @@ def modify_vbump_hdf5(
     chunk_size: int = 1_000_000,
     dataset_name: str = "vbump",
     output_name: str | None = None,
-    log_callback: Callable[[str], None] | None = None
+    storage: str | StorageProfile | None = DEFAULT_OUTPUT_STORAGE,
+    log_callback: Callable[[str], None] | None = None,
+    cancel_token: CancelToken | None = None,
 ) -> None:
     """
     Copy vbump dataset, apply modify_func to each row,
     and update each group's bounding_box accordingly.
+    ``storage`` selects the output codec and chunk shape (see VBump.Storage).
+    ``cancel_token`` is checked before every chunk.
     """
 
     h5py = _require_h5py()
     np = _require_numpy()
+    profile = get_profile(storage)
 
-    with h5py.File(src_path, 'r') as fin, h5py.File(dst_path, 'w') as fout:
+    with span("modify_vbump_hdf5", src=str(src_path), dst=str(dst_path)) as sp, \
+            h5py.File(src_path, 'r') as fin, h5py.File(dst_path, 'w') as fout:
         # === Step 1. 檢查原始 dataset ===
         if dataset_name not in fin:
             raise KeyError(f"Dataset '{dataset_name}' not found.")
-        dset_in = fin[dataset_name]
+        dset_in = open_vbump(fin, dataset_name)
         dtype = dset_in.dtype
-        total = dset_in.shape[0]
+        total = dset_in.rows
         _emit_log(log_callback, f"Source dataset loaded: {total:,} rows.")
 
         target_dataset_name = output_name or dataset_name
 
         # === Step 2. 建立輸出 dataset ===
-        dset_out = fout.create_dataset(
-                            target_dataset_name,
-                            shape=(0,),
-                            maxshape=(None,),
-                            dtype=dtype,
-                            chunks=True
-                        )
+        dset_out = create_vbump(fout, dtype, profile, total=total, name=target_dataset_name)
         _emit_log(log_callback, f"Target dataset '{target_dataset_name}' created successfully.")
 
         # === Step 3. 複製 groups 架構（但稍後會更新 bbox） ===
         if 'groups' in fin:
             fin.copy('groups', fout)
-            fout_groups = fout['groups']
-        else:
-            fout_groups = fout.create_group('groups')
 
         # === Step 4. 建立 group bbox 暫存器 ===
-        group_bbox = {}  # {gid: [xmin, ymin, zmin, xmax, ymax, zmax]}
-        overall_bbox: list[float] | None = None
+        bboxes = BBoxAccumulator()
 
         # === Step 5. 分 chunk 處理 ===
         for start in range(0, total, chunk_size):
+            _check_cancel(cancel_token)
             end = min(start + chunk_size, total)
-            arr = dset_in[start:end]
+            with sp.timed("read_s"):
+                arr = dset_in.read(start, end)
+            sp.add("bytes_read", arr.nbytes)
             new_rows = []
+            transform_started = time.perf_counter()
 
             for row in arr:
                 r = {name: row[name].item() for name in row.dtype.names}
@@ -95,71 +99,33 @@ def modify_vbump_hdf5(
                     new_row = tuple(new_r[name] for name in row.dtype.names)
                     new_rows.append(new_row)
 
-                    # 更新 bounding box
-                    gid = int(new_r['group'])
-                    x_list = [float(new_r['x0']), float(new_r['x1'])]
-                    y_list = [float(new_r['y0']), float(new_r['y1'])]
-                    z_list = [float(new_r['z0']), float(new_r['z1'])]
-
-                    x_min, x_max = min(x_list), max(x_list)
-                    y_min, y_max = min(y_list), max(y_list)
-                    z_min, z_max = min(z_list), max(z_list)
-
-                    if gid not in group_bbox:
-                        group_bbox[gid] = [x_min, y_min, z_min, x_max, y_max, z_max]
-                    else:
-                        bbox = group_bbox[gid]
-                        bbox[0] = min(bbox[0], x_min)
-                        bbox[1] = min(bbox[1], y_min)
-                        bbox[2] = min(bbox[2], z_min)
-                        bbox[3] = max(bbox[3], x_max)
-                        bbox[4] = max(bbox[4], y_max)
-                        bbox[5] = max(bbox[5], z_max)
-
-                    if overall_bbox is None:
-                        overall_bbox = [x_min, y_min, z_min, x_max, y_max, z_max]
-                    else:
-                        overall_bbox[0] = min(overall_bbox[0], x_min)
-                        overall_bbox[1] = min(overall_bbox[1], y_min)
-                        overall_bbox[2] = min(overall_bbox[2], z_min)
-                        overall_bbox[3] = max(overall_bbox[3], x_max)
-                        overall_bbox[4] = max(overall_bbox[4], y_max)
-                        overall_bbox[5] = max(overall_bbox[5], z_max)
+            arr_out = np.array(new_rows, dtype=dtype)
+            sp.add("transform_s", time.perf_counter() - transform_started)
+
+            # 更新 bounding box（x/y 含半徑）
+            with sp.timed("bbox_s"):
+                bboxes.add(arr_out)
 
             # 寫入新 chunk
-            arr_out = np.array(new_rows, dtype=dtype)
-            if start == 0:
-                dset_out.resize((len(arr_out),))
-                dset_out[:] = arr_out
-            else:
-                old_size = dset_out.shape[0]
-                new_size = old_size + len(arr_out)
-                dset_out.resize((new_size,))
-                dset_out[old_size:new_size] = arr_out
+            with sp.timed("write_s"):
+                dset_out.append(arr_out)
+            sp.add("rows", len(arr))
+            sp.add("rows_out", len(arr_out))
+            counter("rows_processed", end)
 
             _emit_log(log_callback, f"Processed chunk {start:,}-{end:,}: {len(arr_out):,} rows.")
 
             del arr
             del arr_out
 
-        # === Step 6. 寫回更新後的 bounding_box ===
-        for gid, bbox in group_bbox.items():
-            if str(gid) not in fout_groups:
-                subgroup = fout_groups.create_group(str(gid))
-            else:
-                subgroup = fout_groups[str(gid)]
-            subgroup.attrs['bounding_box'] = (
-                (bbox[0], bbox[1], bbox[2]),
-                (bbox[3], bbox[4], bbox[5])
-            )
+        dset_out.finish()
 
-        if overall_bbox is not None:
-            dset_out.attrs['bounding_box'] = (
-                (overall_bbox[0], overall_bbox[1], overall_bbox[2]),
-                (overall_bbox[3], overall_bbox[4], overall_bbox[5]),
-            )
+        # === Step 6. 寫回更新後的 bounding_box ===
+        bboxes.write_attrs(fout, dset_out.attrs)
 
-        _emit_log(log_callback, f"Updated bounding boxes for {len(group_bbox)} groups.")
+        fout.flush()
+        sp.add("bytes_written", fout.id.get_filesize())
+        _emit_log(log_callback, f"Updated bounding boxes for {len(bboxes.group_bounding_boxes)} groups.")
 
 def merge_hdf5(
     src_paths: List[str],
@@ -168,21 +134,28 @@ def merge_hdf5(
     dataset_name: str = "vbump",
     output_name: str | None = None,
     chunk_size: int = 1_000_000,
-    log_callback: Callable[[str], None] | None = None
+    storage: str | StorageProfile | None = DEFAULT_OUTPUT_STORAGE,
+    log_callback: Callable[[str], None] | None = None,
+    cancel_token: CancelToken | None = None,
 ) -> None:
     """
     Merge multiple vbump HDF5 datasets into one file.
-    Preserve 'groups' structure and recompute bounding boxes.
+    Preserve 'groups' structure and combine bounding boxes.
+    Sources with complete bbox and statistics metadata (see VBump.H5Layout.read_stats)
+    contribute their attributes, so their rows are only copied; other sources are
+    rescanned chunk by chunk. Output boxes are
+    padded by half the diameter in x/y, as written by ``to_hdf5``.
+    ``storage`` selects the output codec and chunk shape (see VBump.Storage).
+    ``cancel_token`` is checked before every chunk.
     """
     h5py = _require_h5py()
-    np = _require_numpy()
+    profile = get_profile(storage)
 
     # === Step 1. 建立輸出檔案 ===
-    with h5py.File(dst_path, 'w') as fout:
+    with span("merge_hdf5", dst=str(dst_path), sources=len(src_paths)) as sp, h5py.File(dst_path, 'w') as fout:
         target_dataset_name = output_name or dataset_name
         dset_out = None
-        group_bbox: dict[int, list[float]] = {}
-        overall_bbox: list[float] | None = None
+        bboxes = BBoxAccumulator()
 
         for path in src_paths:
             with h5py.File(path, 'r') as fin:
@@ -190,95 +163,58 @@ def merge_hdf5(
                     _emit_log(log_callback, f"Warning: Skipping '{path}', dataset '{dataset_name}' not found.")
                     continue
 
-                dset_in = fin[dataset_name]
+                dset_in = open_vbump(fin, dataset_name)
                 dtype = dset_in.dtype
-                total = dset_in.shape[0]
-                _emit_log(log_callback, f"Merging file '{path}' ({total:,} rows)...")
+                total = dset_in.rows
+                known = read_stats(fin, dataset_name)
+                if known is not None:
+                    bboxes.merge(known)
+                    _emit_log(log_callback, f"Merging file '{path}' ({total:,} rows, bounding boxes from attributes)...")
+                else:
+                    counter("bbox_rescans", 1)
+                    _emit_log(log_callback, f"Merging file '{path}' ({total:,} rows, rescanning bounding boxes)...")
 
                 # 若第一個檔案，建立輸出 dataset
                 if dset_out is None:
-                    dset_out = fout.create_dataset(
-                        target_dataset_name,
-                        shape=(0,),
-                        maxshape=(None,),
-                        dtype=dtype,
-                        chunks=True
-                    )
+                    dset_out = create_vbump(fout, dtype, profile, name=target_dataset_name)
 
                 # === Step 2. 分 chunk 讀取與寫入 ===
                 for start in range(0, total, chunk_size):
+                    _check_cancel(cancel_token)
                     end = min(start + chunk_size, total)
-                    arr = dset_in[start:end]
-
-                    # 更新 group bbox
-                    for row in arr:
-                        gid = int(row['group'])
-                        x_list = [float(row['x0']), float(row['x1'])]
-                        y_list = [float(row['y0']), float(row['y1'])]
-                        z_list = [float(row['z0']), float(row['z1'])]
-                        x_min, x_max = min(x_list), max(x_list)
-                        y_min, y_max = min(y_list), max(y_list)
-                        z_min, z_max = min(z_list), max(z_list)
-
-                        if gid not in group_bbox:
-                            group_bbox[gid] = [x_min, y_min, z_min, x_max, y_max, z_max]
-                        else:
-                            bbox = group_bbox[gid]
-                            bbox[0] = min(bbox[0], x_min)
-                            bbox[1] = min(bbox[1], y_min)
-                            bbox[2] = min(bbox[2], z_min)
-                            bbox[3] = max(bbox[3], x_max)
-                            bbox[4] = max(bbox[4], y_max)
-                            bbox[5] = max(bbox[5], z_max)
-
-                        if overall_bbox is None:
-                            overall_bbox = [x_min, y_min, z_min, x_max, y_max, z_max]
-                        else:
-                            overall_bbox[0] = min(overall_bbox[0], x_min)
-                            overall_bbox[1] = min(overall_bbox[1], y_min)
-                            overall_bbox[2] = min(overall_bbox[2], z_min)
-                            overall_bbox[3] = max(overall_bbox[3], x_max)
-                            overall_bbox[4] = max(overall_bbox[4], y_max)
-                            overall_bbox[5] = max(overall_bbox[5], z_max)
+                    with sp.timed("read_s"):
+                        arr = dset_in.read(start, end)
+                    sp.add("bytes_read", arr.nbytes)
+
+                    # 僅在來源缺少 bbox 屬性時才重新掃描
+                    if known is None:
+                        with sp.timed("bbox_s"):
+                            bboxes.add(arr)
 
                     # 寫入新 chunk
-                    old_size = dset_out.shape[0]
-                    new_size = old_size + len(arr)
-                    dset_out.resize((new_size,))
-                    dset_out[old_size:new_size] = arr
+                    with sp.timed("write_s"):
+                        dset_out.append(arr)
+                    sp.add("rows", len(arr))
+                    counter("rows_merged", dset_out.rows)
 
                     _emit_log(log_callback, f"Processed chunk {start:,}-{end:,} for '{path}'.")
 
                 # === Step 3. 合併 groups ===
                 if 'groups' in fin:
-                    if 'groups' not in fout:
-                        fout_groups = fout.create_group('groups')
-                    else:
-                        fout_groups = fout['groups']
-
-                    for gid, subgroup in fin['groups'].items():
+                    fout_groups = fout.require_group('groups')
+                    for gid in fin['groups']:
                         if gid not in fout_groups:
                             fin.copy(f'groups/{gid}', fout_groups)
 
         # === Step 4. 更新 bounding box ===
         if dset_out is not None:
-            fout_groups = fout.get('groups', fout.create_group('groups'))
-            for gid, bbox in group_bbox.items():
-                if str(gid) not in fout_groups:
-                    subgroup = fout_groups.create_group(str(gid))
-                else:
-                    subgroup = fout_groups[str(gid)]
-                subgroup.attrs['bounding_box'] = (
-                    (bbox[0], bbox[1], bbox[2]),
-                    (bbox[3], bbox[4], bbox[5])
-                )
-
-            if overall_bbox is not None:
-                dset_out.attrs['bounding_box'] = (
-                    (overall_bbox[0], overall_bbox[1], overall_bbox[2]),
-                    (overall_bbox[3], overall_bbox[4], overall_bbox[5])
-                )
-
-            _emit_log(log_callback, f"Successfully merged {len(src_paths)} files and updated {len(group_bbox)} group bounding boxes.")
+            dset_out.finish()
+            bboxes.write_attrs(fout, dset_out.attrs)
+            fout.flush()
+            sp.add("bytes_written", fout.id.get_filesize())
+            _emit_log(
+                log_callback,
+                f"Successfully merged {len(src_paths)} files and updated {len(bboxes.group_bounding_boxes)} group bounding boxes.",
+            )
         else:
-            _emit_log(log_callback, "Warning: No valid datasets were merged.")
\ No newline at end of file
+            _emit_log(log_callback, "Warning: No valid datasets were merged.")
@@ -0,0 +1,212 @@
+"""Persistent, content-addressed cache of proxy files built from CSV and DXF sources.
+
+An entry is keyed by the content hashes of the source files plus every parameter that
+shapes the proxy (importer kind, DXF ``group``/``height``/``base_z``/``unit_scale``/
+``selected_layers`` and the proxy storage profile), so renamed or copied sources still
+hit and changed sources or options miss. Hashing a large source once is far cheaper
+than parsing it, and ``fingerprints.json`` remembers each path's hash by size and
+modification time, so unchanged files are not even re-read.
+
+Entries are plain proxy HDF5 files (``<key>.h5``). :meth:`ImportCache.fetch` hard-links
+an entry into the caller's proxy directory (copying across file systems), so evicting
+it never breaks a proxy in use, and touches it for LRU order. :meth:`ImportCache.put`
+adds an entry the same way and then evicts least recently used entries until the cache
+is at most ``max_bytes``.
+
+``VBUMP_IMPORT_CACHE`` overrides the directory (default ``~/.cache/vbump/imports``,
+``%LOCALAPPDATA%\\vbump\\imports`` on Windows) or disables the cache with ``off``;
+``VBUMP_IMPORT_CACHE_SIZE`` sets the size bound (default ``10G``).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from VBump.ProxyStore import format_size, parse_size
+
+IMPORT_CACHE_ENV = "VBUMP_IMPORT_CACHE"
+IMPORT_CACHE_SIZE_ENV = "VBUMP_IMPORT_CACHE_SIZE"
+DEFAULT_MAX_BYTES = 10 << 30
+# Bump when importers change what they write for the same input.
+CACHE_VERSION = 1
+FINGERPRINTS = "fingerprints.json"
+_HASH_BLOCK = 8 << 20
+
+
+def default_cache_dir() -> Path:
+    if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+        return Path(os.environ["LOCALAPPDATA"]) / "vbump" / "imports"
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "vbump" / "imports"
+
+
+def file_digest(path: str | os.PathLike[str], check_cancel: Callable[[], None] | None = None) -> str:
+    """BLAKE2b digest of a file's content, read in 8 MiB blocks."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as stream:
+        while block := stream.read(_HASH_BLOCK):
+            if check_cancel is not None:
+                check_cancel()
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def storage_key(profile: Any) -> dict[str, Any]:
+    """The fields of a :class:`~VBump.Storage.StorageProfile` that shape the written file."""
+    fields = dataclasses.asdict(profile)
+    fields.pop("plugin", None)
+    return fields
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class ImportCache:
+    """Size-bounded LRU directory of proxy files keyed by source content and import options."""
+
+    def __init__(
+        self,
+        root: str | os.PathLike[str],
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        log_callback: Callable[[str], None] | None = None,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.log_callback = log_callback
+
+    @classmethod
+    def from_env(
+        cls,
+        *,
+        log_callback: Callable[[str], None] | None = None,
+        environ: dict[str, str] | None = None,
+    ) -> "ImportCache | None":
+        """The configured cache, or None when disabled or its directory is unusable."""
+        environ = os.environ if environ is None else environ
+        location = environ.get(IMPORT_CACHE_ENV, "").strip()
+        if location.lower() in ("0", "off", "false", "no"):
+            return None
+        max_bytes = DEFAULT_MAX_BYTES
+        try:
+            max_bytes = parse_size(environ.get(IMPORT_CACHE_SIZE_ENV)) or DEFAULT_MAX_BYTES
+        except ValueError as exc:
+            if log_callback:
+                log_callback(f"⚠️ {IMPORT_CACHE_SIZE_ENV} ignored: {exc}")
+        try:
+            return cls(location or default_cache_dir(), max_bytes=max_bytes, log_callback=log_callback)
+        except OSError as exc:
+            if log_callback:
+                log_callback(f"⚠️ Import cache disabled: {exc}")
+            return None
+
+    def _log(self, message: str) -> None:
+        if self.log_callback:
+            self.log_callback(message)
+
+    def _entry(self, key: str) -> Path:
+        return self.root / f"{key}.h5"
+
+    def fingerprint(self, path: str | os.PathLike[str], check_cancel: Callable[[], None] | None = None) -> str:
+        """Content digest of ``path``, reused while its size and modification time are unchanged."""
+        real = os.path.realpath(path)
+        stat = os.stat(real)
+        index_path = self.root / FINGERPRINTS
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            index = {}
+        known = index.get(real)
+        if known and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return known[2]
+        digest = file_digest(real, check_cancel)
+        index[real] = [stat.st_size, stat.st_mtime_ns, digest]
+        index = {p: v for p, v in index.items() if os.path.exists(p)}
+        scratch = self.root / f".{FINGERPRINTS}.{uuid.uuid4().hex}"
+        try:
+            scratch.write_text(json.dumps(index), encoding="utf-8")
+            os.replace(scratch, index_path)
+        except OSError:
+            scratch.unlink(missing_ok=True)
+        return digest
+
+    def key(
+        self,
+        kind: str,
+        sources: Iterable[str | os.PathLike[str]],
+        params: dict[str, Any],
+        check_cancel: Callable[[], None] | None = None,
+    ) -> str:
+        """Cache key for importing ``sources`` (in order) with ``kind`` and ``params``."""
+        payload = {
+            "version": CACHE_VERSION,
+            "kind": kind,
+            "sources": [self.fingerprint(source, check_cancel) for source in sources],
+            "params": params,
+        }
+        text = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=20).hexdigest()
+
+    def fetch(self, key: str, dst: str | os.PathLike[str]) -> bool:
+        """Place the entry for ``key`` at ``dst``; False on a miss."""
+        entry = self._entry(key)
+        try:
+            _link_or_copy(entry, Path(dst))
+            os.utime(entry)
+        except OSError:
+            Path(dst).unlink(missing_ok=True)
+            return False
+        return True
+
+    def put(self, key: str, src: str | os.PathLike[str]) -> None:
+        """Add ``src`` as the entry for ``key`` and evict down to ``max_bytes``."""
+        src = Path(src)
+        if src.stat().st_size > self.max_bytes:
+            return
+        scratch = self.root / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            _link_or_copy(src, scratch)
+            os.replace(scratch, self._entry(key))
+        except OSError as exc:
+            scratch.unlink(missing_ok=True)
+            self._log(f"⚠️ Could not add import to cache: {exc}")
+            return
+        self.evict()
+
+    def usage(self) -> int:
+        return sum(entry.stat().st_size for entry in self.root.glob("*.h5"))
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits ``max_bytes``; return bytes freed."""
+        entries = []
+        for entry in self.root.glob("*.h5"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        entries.sort()
+        total = sum(size for _mtime, size, _entry in entries)
+        freed = 0
+        for _mtime, size, entry in entries:
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            freed += size
+        if freed:
+            self._log(f"🧹 Import cache: evicted {format_size(freed)} (limit {format_size(self.max_bytes)})")
+        return freed
@@ -0,0 +1,412 @@
+"""Structured performance instrumentation for long running vbump operations.
+
+Operations open a :func:`span` around each stage and attach counters to it::
+
+    with span("to_hdf5", path=filepath) as sp:
+        ...
+        with sp.timed("write_s"):
+            dset[a:b] = buffer
+        sp.add("rows", written)
+
+Closed spans and :func:`counter` samples are delivered as :class:`Event` objects to every
+registered sink. With no sinks installed, ``span`` returns a shared no-op object so the
+hot paths pay only a list check. Sinks provided here:
+
+* :class:`LogSink` - one readable summary line per top-level span (GUI log, stdout).
+* :class:`JsonLinesSink` - every event as one JSON object per line.
+* :class:`ChromeTraceSink` - ``chrome://tracing`` / Perfetto compatible trace file.
+
+Standard counter names: ``rows``, ``bytes_read``, ``bytes_written``, ``write_s``
+(time spent in HDF5 writes, including compression), ``transform_s``. Every span also
+records ``peak_rss_mb`` when the platform exposes it.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Protocol
+
+_EPOCH = time.perf_counter()
+_lock = threading.Lock()
+_sinks: list["Sink"] = []
+_local = threading.local()
+_span_ids = itertools.count(1)
+
+
+@dataclass
+class Event:
+    """A closed span (``kind='span'``) or a counter sample (``kind='counter'``)."""
+
+    kind: str
+    name: str
+    start: float
+    duration: float = 0.0
+    span_id: int = 0
+    parent_id: int | None = None
+    depth: int = 0
+    thread: int = 0
+    pid: int = 0
+    counters: dict[str, float] = field(default_factory=dict)
+    fields: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {
+            "kind": self.kind,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6),
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "depth": self.depth,
+            "thread": self.thread,
+            "pid": self.pid,
+            "counters": self.counters,
+            "fields": self.fields,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class Sink(Protocol):
+    def emit(self, event: Event) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def peak_rss_mb() -> float | None:
+    """Return the process' peak resident set size in MiB, or None when unavailable."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+# ---------------------------------------------------------------------------
+# Spans
+
+
+class Span:
+    """An open timing region; counters accumulate until the span closes."""
+
+    __slots__ = ("name", "span_id", "parent_id", "depth", "start", "counters", "fields")
+
+    def __init__(self, name: str, parent: "Span | None", fields: dict[str, Any]) -> None:
+        self.name = name
+        self.span_id = next(_span_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.start = time.perf_counter() - _EPOCH
+        self.counters: dict[str, float] = {}
+        self.fields = fields
+
+    def add(self, name: str, value: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, **fields: Any) -> None:
+        self.fields.update(fields)
+
+    @contextmanager
+    def timed(self, counter_name: str) -> Iterator[None]:
+        """Add the wall time of the block to ``counter_name`` (seconds)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(counter_name, time.perf_counter() - started)
+
+
+class _NullSpan:
+    """Stand-in returned while no sink is installed."""
+
+    __slots__ = ()
+
+    def add(self, name: str, value: float = 1) -> None:
+        pass
+
+    def set(self, **fields: Any) -> None:
+        pass
+
+    @contextmanager
+    def timed(self, counter_name: str) -> Iterator[None]:
+        yield
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _stack() -> list[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def current_span() -> Span | _NullSpan:
+    stack = _stack()
+    return stack[-1] if stack else _NULL_SPAN
+
+
+@contextmanager
+def span(name: str, **fields: Any) -> Iterator[Span | _NullSpan]:
+    """Time a block as a named span nested under the current span of this thread."""
+    if not _sinks:
+        yield _NULL_SPAN
+        return
+    stack = _stack()
+    sp = Span(name, stack[-1] if stack else None, dict(fields))
+    stack.append(sp)
+    error: str | None = None
+    try:
+        yield sp
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        stack.pop()
+        duration = time.perf_counter() - _EPOCH - sp.start
+        rss = peak_rss_mb()
+        if rss is not None:
+            sp.counters["peak_rss_mb"] = rss
+        _dispatch(Event(
+            kind="span",
+            name=sp.name,
+            start=sp.start,
+            duration=duration,
+            span_id=sp.span_id,
+            parent_id=sp.parent_id,
+            depth=sp.depth,
+            thread=threading.get_ident(),
+            pid=os.getpid(),
+            counters=sp.counters,
+            fields=sp.fields,
+            error=error,
+        ))
+
+
+def counter(name: str, value: float, **fields: Any) -> None:
+    """Record an instantaneous counter sample (e.g. rows written so far)."""
+    if not _sinks:
+        return
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    _dispatch(Event(
+        kind="counter",
+        name=name,
+        start=time.perf_counter() - _EPOCH,
+        parent_id=parent.span_id if parent is not None else None,
+        depth=parent.depth + 1 if parent is not None else 0,
+        thread=threading.get_ident(),
+        pid=os.getpid(),
+        counters={name: value},
+        fields=fields,
+    ))
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+# ---------------------------------------------------------------------------
+# Sink registry
+
+
+def _dispatch(event: Event) -> None:
+    with _lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        try:
+            sink.emit(event)
+        except Exception:
+            # Instrumentation must never break the operation it observes.
+            pass
+
+
+def add_sink(sink: Sink) -> Sink:
+    with _lock:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: Sink, *, close: bool = True) -> None:
+    with _lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+    if close:
+        sink.close()
+
+
+@contextmanager
+def installed(*sinks: Sink) -> Iterator[None]:
+    """Install ``sinks`` for the duration of the block and close them afterwards."""
+    for sink in sinks:
+        add_sink(sink)
+    try:
+        yield
+    finally:
+        for sink in sinks:
+            remove_sink(sink)
+
+
+def configure_from_env(environ: dict[str, str] | None = None) -> list["Sink"]:
+    """Install file sinks requested through ``VBUMP_TRACE`` / ``VBUMP_EVENTS``.
+
+    ``VBUMP_TRACE`` names a Chrome trace file and ``VBUMP_EVENTS`` a JSON-lines file.
+    Both are closed when the interpreter exits.
+    """
+    environ = os.environ if environ is None else environ
+    installed_sinks: list[Sink] = []
+    if environ.get("VBUMP_TRACE"):
+        installed_sinks.append(add_sink(ChromeTraceSink(environ["VBUMP_TRACE"])))
+    if environ.get("VBUMP_EVENTS"):
+        installed_sinks.append(add_sink(JsonLinesSink(environ["VBUMP_EVENTS"])))
+    for sink in installed_sinks:
+        atexit.register(remove_sink, sink)
+    return installed_sinks
+
+
+# ---------------------------------------------------------------------------
+# Sinks
+
+
+def _merge_counters(into: dict[str, float], counters: dict[str, float]) -> None:
+    for key, value in counters.items():
+        if key in ("rows", "peak_rss_mb"):
+            into[key] = max(into.get(key, 0), value)
+        elif key.startswith("bytes_") or key.endswith("_s"):
+            into[key] = into.get(key, 0) + value
+
+
+def _format_counters(counters: dict[str, float], duration: float) -> str:
+    parts: list[str] = []
+    rows = counters.get("rows")
+    if rows:
+        rate = f" ({rows / duration:,.0f} rows/s)" if duration > 0 else ""
+        parts.append(f"{int(rows):,} rows{rate}")
+    for key in ("bytes_read", "bytes_written"):
+        if counters.get(key):
+            parts.append(f"{key.split('_')[1]} {counters[key] / 1e6:,.1f} MB")
+    stages = [f"{key[:-2]} {value:.2f} s" for key, value in counters.items() if key.endswith("_s")]
+    if stages:
+        parts.append("stages: " + " / ".join(stages))
+    if counters.get("peak_rss_mb"):
+        parts.append(f"peak RSS {counters['peak_rss_mb']:,.0f} MB")
+    return ", ".join(parts)
+
+
+class LogSink:
+    """Write one summary line per span up to ``max_depth`` to a log callback.
+
+    Counters of deeper spans roll up into the summarized ancestor: byte counts and
+    ``*_s`` timings are summed, ``rows`` takes the largest stage.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[str], None] | None = None,
+        *,
+        max_depth: int = 0,
+        min_duration: float = 0.0,
+    ) -> None:
+        self._callback = callback or (lambda message: print(message, flush=True))
+        self._max_depth = max_depth
+        self._min_duration = min_duration
+        self._lock = threading.Lock()
+        self._rollup: dict[int, dict[str, float]] = {}
+
+    def emit(self, event: Event) -> None:
+        if event.kind != "span":
+            return
+        with self._lock:
+            totals = self._rollup.pop(event.span_id, {})
+            _merge_counters(totals, event.counters)
+            if event.parent_id is not None:
+                _merge_counters(self._rollup.setdefault(event.parent_id, {}), totals)
+        if event.depth > self._max_depth or event.duration < self._min_duration:
+            return
+        details = _format_counters(totals, event.duration)
+        status = f" [{event.error}]" if event.error else ""
+        indent = "  " * event.depth
+        self._callback(f"⏱ {indent}{event.name}: {event.duration:.2f} s{status}" + (f" - {details}" if details else ""))
+
+    def close(self) -> None:
+        with self._lock:
+            self._rollup.clear()
+
+
+class JsonLinesSink:
+    """Append every event to ``path`` as one JSON object per line."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def emit(self, event: Event) -> None:
+        line = json.dumps(event.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class ChromeTraceSink:
+    """Collect events and write a Trace Event Format file on close.
+
+    Open the result in ``chrome://tracing`` or https://ui.perfetto.dev. Spans become
+    complete (``X``) events; counter samples become ``C`` events.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._events: list[dict[str, Any]] = []
+        self._closed = False
+
+    def emit(self, event: Event) -> None:
+        ts = event.start * 1e6
+        if event.kind == "span":
+            args: dict[str, Any] = {**event.fields, **event.counters}
+            if event.error:
+                args["error"] = event.error
+            record = {
+                "name": event.name, "ph": "X", "ts": ts, "dur": event.duration * 1e6,
+                "pid": event.pid, "tid": event.thread, "args": args,
+            }
+        else:
+            record = {
+                "name": event.name, "ph": "C", "ts": ts,
+                "pid": event.pid, "tid": event.thread, "args": event.counters,
+            }
+        with self._lock:
+            self._events.append(record)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            events = self._events
+            self._events = []
+        with open(self._path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
@@ -0,0 +1,450 @@
+"""Copy-on-write layers over the ``vbump`` node of another proxy file.
+
+A *layered* node (``layout = "layered"``) stores no rows of its own. It reads through an
+HDF5 external link (``parent``) to the ``vbump`` node of an earlier file and applies one
+delta, named by its ``layer`` attribute:
+
+``mask``
+    drops parent rows. One bit per parent row (``np.packbits``, little bit order) in
+    ``mask``, plus ``mask_offsets``: the kept rows before every ``MASK_BLOCK`` parent rows,
+    so a read seeks straight to the right block.
+``overrides``
+    sets ``D`` and/or the bump height (the length along the bump axis, keeping
+    ``x0``/``y0``/``z0``) of one group or of every row. A small table, applied in order.
+``append``
+    follows the parent rows with the rows of another vbump file (``block`` link).
+
+A layer's parent may itself be layered; the ``depth`` attribute counts the links down to
+plain nodes. :func:`VBump.H5Layout.open_vbump` hides the chain behind
+:class:`LayeredReader`, which offers the :class:`~VBump.H5Layout.VBumpReader` read
+interface. Every layer file carries its own bounding boxes, statistics block and
+``groups`` hierarchy, so metadata readers never walk the chain.
+
+Writing a layer reads the parent's ``group`` column and the rows it changes, never
+rewrites the others, and yields a file of a few bytes per row at most. Reads get slower
+with depth; :func:`VBump.Storage.copy_vbump_file` flattens a chain into a plain node.
+Files under a layer must stay unchanged while it exists; :func:`layer_files` lists them.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from VBump.Basic import _emit_progress, _require_h5py, _require_numpy
+from VBump.H5Layout import (
+    LAYERED_LAYOUT,
+    LAYOUT_ATTR,
+    ROWS_ATTR,
+    BBoxAccumulator,
+    layout_of,
+    open_vbump,
+    read_stats,
+)
+from VBump.Instrument import counter, span
+
+LAYER_ATTR = "layer"
+DEPTH_ATTR = "depth"
+PARENT = "parent"
+BLOCK = "block"
+MASK = "mask"
+MASK_OFFSETS = "mask_offsets"
+OVERRIDES = "overrides"
+LAYER_KINDS = ("mask", "overrides", "append")
+# Parent rows per ``mask_offsets`` entry (8 KiB of packed bits).
+MASK_BLOCK = 1 << 16
+# Rows per scan step when writing layers; a multiple of MASK_BLOCK.
+_SCAN_ROWS = 1 << 20
+_END_FIELDS = ("x1", "y1", "z1")
+_HEIGHT_FIELDS = ("x0", "y0", "z0", "x1", "y1", "z1")
+
+
+def override_dtype():
+    """Rows of the ``overrides`` table; NaN leaves a parameter unchanged."""
+    np = _require_numpy()
+    return np.dtype([("all_groups", np.uint8), ("group", np.int64), ("D", np.float64), ("height", np.float64)])
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _apply_overrides(data, table) -> int:
+    """Apply the ``overrides`` rows to ``data`` in place; return the rows they select.
+
+    Parameters whose fields ``data`` lacks are skipped, so readers only fetch the
+    fields a request needs.
+    """
+    np = _require_numpy()
+    names = set(data.dtype.names or ())
+    selected_rows = 0
+    for row in table:
+        selected = None if row["all_groups"] else data["group"] == row["group"]
+        selected_rows += len(data) if selected is None else int(np.count_nonzero(selected))
+        if "D" in names and not np.isnan(row["D"]):
+            if selected is None:
+                data["D"] = row["D"]
+            else:
+                data["D"][selected] = row["D"]
+        if names.issuperset(_HEIGHT_FIELDS) and not np.isnan(row["height"]):
+            _set_height(data, selected, float(row["height"]))
+    return selected_rows
+
+
+def _set_height(data, selected, height: float) -> None:
+    """Rescale the bump axis of the ``selected`` rows (all when None) to ``height``."""
+    np = _require_numpy()
+    rows = data if selected is None else data[selected]
+    deltas = [rows[f"{axis}1"] - rows[f"{axis}0"] for axis in "xyz"]
+    length = np.sqrt(deltas[0] * deltas[0] + deltas[1] * deltas[1] + deltas[2] * deltas[2])
+    # Zero-length bumps have no axis to scale and keep their end point.
+    scale = np.divide(height, length, out=np.ones_like(length), where=length != 0)
+    for axis, delta in zip("xyz", deltas):
+        end = np.where(length != 0, rows[f"{axis}0"] + scale * delta, rows[f"{axis}1"])
+        if selected is None:
+            data[f"{axis}1"] = end
+        else:
+            data[f"{axis}1"][selected] = end
+
+
+class LayeredReader:
+    """:class:`~VBump.H5Layout.VBumpReader` interface over a ``layered`` node.
+
+    ``parent`` (and ``block`` for append layers) are readers of the linked nodes, which
+    may be layered themselves. Layered nodes are never memory mapped.
+    """
+
+    layout = LAYERED_LAYOUT
+
+    def __init__(self, handle, name: str = "vbump") -> None:
+        if name not in handle:
+            raise KeyError(f"Dataset '{name}' not found.")
+        self.node = handle[name]
+        self.attrs = self.node.attrs
+        self.kind = _text(self.attrs[LAYER_ATTR])
+        if self.kind not in LAYER_KINDS:
+            raise ValueError(f"Unknown vbump layer '{self.kind}'.")
+        target = self.node[PARENT]
+        self.parent = open_vbump(target.file, target.name)
+        self.block = None
+        if self.kind == "append":
+            target = self.node[BLOCK]
+            self.block = open_vbump(target.file, target.name)
+        elif self.kind == "mask":
+            self._mask = self.node[MASK]
+            self._offsets = self.node[MASK_OFFSETS][()]
+        else:
+            self._overrides = self.node[OVERRIDES][()]
+        self.depth = int(self.attrs.get(DEPTH_ATTR, 1))
+        self.rows = int(self.attrs[ROWS_ATTR])
+        self.dtype = self.parent.dtype
+        self.fields = self.parent.fields
+        self.storage_dtype = self.parent.storage_dtype
+        self.encoding = None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def shape(self) -> tuple[int]:
+        return (self.rows,)
+
+    def _empty(self, names: Sequence[str], rows: int = 0):
+        np = _require_numpy()
+        return np.empty(rows, dtype=np.dtype([(n, self.dtype[n]) for n in names]))
+
+    def _concat(self, pieces: list, names: Sequence[str]):
+        if len(pieces) == 1:
+            return pieces[0]
+        out = self._empty(names, sum(len(p) for p in pieces))
+        pos = 0
+        for piece in pieces:
+            out[pos:pos + len(piece)] = piece
+            pos += len(piece)
+        return out
+
+    def read(self, start: int = 0, end: int | None = None, fields: Sequence[str] | None = None):
+        """Return rows ``[start, end)`` of the layered view, optionally only ``fields``."""
+        end = self.rows if end is None else min(end, self.rows)
+        names = list(fields) if fields is not None else list(self.fields)
+        if end <= start:
+            return self._empty(names)
+        if self.kind == "mask":
+            return self._read_mask(start, end, names)
+        if self.kind == "append":
+            return self._read_append(start, end, names)
+        return self._read_overrides(start, end, names)
+
+    def _read_mask(self, start: int, end: int, names: list[str]):
+        np = _require_numpy()
+        block = int(np.searchsorted(self._offsets, start, side="right")) - 1
+        skip = start - int(self._offsets[block])
+        need = end - start
+        first = block * MASK_BLOCK
+        pieces = []
+        while need > 0 and first < self.parent.rows:
+            last = min(first + _SCAN_ROWS, self.parent.rows)
+            keep = np.unpackbits(self._mask[first // 8:(last + 7) // 8], count=last - first, bitorder="little").view(bool)
+            kept = np.flatnonzero(keep)
+            if len(kept) > skip:
+                index = kept[skip:skip + need]
+                lo, hi = int(index[0]), int(index[-1]) + 1
+                data = self.parent.read(first + lo, first + hi, names)[keep[lo:hi]]
+                pieces.append(data)
+                need -= len(data)
+                skip = 0
+            else:
+                skip -= len(kept)
+            first = last
+        return self._concat(pieces, names) if pieces else self._empty(names)
+
+    def _read_append(self, start: int, end: int, names: list[str]):
+        split = self.parent.rows
+        pieces = []
+        if start < split:
+            pieces.append(self.parent.read(start, min(end, split), names))
+        if end > split:
+            pieces.append(self.block.read(max(start, split) - split, end - split, names))
+        return self._concat(pieces, names)
+
+    def _read_overrides(self, start: int, end: int, names: list[str]):
+        wanted = set(names)
+        if wanted.intersection(("D",) + _END_FIELDS):
+            wanted.add("group")
+            if wanted.intersection(_END_FIELDS):
+                wanted.update(_HEIGHT_FIELDS)
+        data = self.parent.read(start, end, [n for n in self.fields if n in wanted])
+        if not data.flags.writeable:
+            # Memory-mapped parents hand out read-only views of the file.
+            data = data.copy()
+        _apply_overrides(data, self._overrides)
+        if list(data.dtype.names) == names:
+            return data
+        out = self._empty(names, len(data))
+        for n in names:
+            out[n] = data[n]
+        return out
+
+    def read_column(self, field: str, start: int = 0, end: int | None = None):
+        return self.read(start, end, [field])[field]
+
+    def memmap(self):
+        return None
+
+    def iter_chunks(self, chunk_size: int, fields: Sequence[str] | None = None) -> Iterator[tuple[int, int, Any]]:
+        for start in range(0, self.rows, chunk_size):
+            end = min(start + chunk_size, self.rows)
+            yield start, end, self.read(start, end, fields)
+
+    def bytes_per_row(self, fields: Iterable[str] | None = None) -> int:
+        return self.parent.bytes_per_row(fields)
+
+
+def _link_target(current: str, filename: str) -> str:
+    """Where HDF5 finds an external link's file: as stored, else next to ``current``."""
+    if os.path.isabs(filename) and os.path.exists(filename):
+        return os.path.realpath(filename)
+    return os.path.realpath(os.path.join(os.path.dirname(current), os.path.basename(filename)))
+
+
+def layer_files(path: str, name: str = "vbump") -> list[str]:
+    """Real paths of ``path`` and every file its ``name`` node reads through links."""
+    h5py = _require_h5py()
+    files: list[str] = []
+    pending = [(os.path.realpath(path), name)]
+    while pending:
+        current, node_name = pending.pop()
+        if current in files:
+            continue
+        files.append(current)
+        with h5py.File(current, "r") as fin:
+            if node_name not in fin or layout_of(fin, node_name) != LAYERED_LAYOUT:
+                continue
+            for key in (PARENT, BLOCK):
+                link = fin[node_name].get(key, getlink=True)
+                if link is not None:
+                    pending.append((_link_target(current, link.filename), link.path))
+    return files
+
+
+def layer_depth(path: str, name: str = "vbump") -> int:
+    """Links from ``path``'s node down to plain nodes (0 for plain files)."""
+    h5py = _require_h5py()
+    with h5py.File(path, "r") as fin:
+        if name not in fin or layout_of(fin, name) != LAYERED_LAYOUT:
+            return 0
+        return int(fin[name].attrs.get(DEPTH_ATTR, 1))
+
+
+def _create_layer(fout, kind: str, parent_path: str, rows: int, depth: int):
+    h5py = _require_h5py()
+    node = fout.create_group("vbump")
+    node.attrs[LAYOUT_ATTR] = LAYERED_LAYOUT
+    node.attrs[LAYER_ATTR] = kind
+    node.attrs[ROWS_ATTR] = rows
+    node.attrs[DEPTH_ATTR] = depth
+    node[PARENT] = h5py.ExternalLink(os.path.abspath(parent_path), "/vbump")
+    return node
+
+
+def _scan_stats(reader, sp, check_cancel) -> BBoxAccumulator:
+    stats = BBoxAccumulator()
+    for _start, _end, data in reader.iter_chunks(_SCAN_ROWS):
+        if check_cancel is not None:
+            check_cancel()
+        with sp.timed("bbox_s"):
+            stats.add(data)
+    counter("bbox_rescans", 1)
+    return stats
+
+
+def write_mask_layer(
+    parent_path: str,
+    dst_path: str,
+    drop_groups: Iterable[int],
+    *,
+    check_cancel: Callable[[], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> int:
+    """Write a layer over ``parent_path`` without the rows of ``drop_groups``; return rows kept.
+
+    Reads the parent's ``group`` column, plus ``D`` of the dropped rows when the parent
+    has a statistics block (otherwise the kept rows are rescanned for it).
+    """
+    h5py = _require_h5py()
+    np = _require_numpy()
+    drop = np.array(sorted({int(g) for g in drop_groups}), dtype=np.int64)
+    with span("mask_layer", groups=len(drop)) as sp, \
+            h5py.File(parent_path, "r") as fin, h5py.File(dst_path, "w") as fout:
+        parent = open_vbump(fin)
+        known = read_stats(fin)
+        stats = known.without_groups(drop.tolist()) if known is not None else BBoxAccumulator()
+        total = parent.rows
+        node = _create_layer(fout, "mask", parent_path, 0, getattr(parent, "depth", 0) + 1)
+        mask = node.create_dataset(MASK, shape=((total + 7) // 8,), dtype=np.uint8)
+        counts = [np.zeros(1, dtype=np.int64)]
+        for start in range(0, total, _SCAN_ROWS):
+            if check_cancel is not None:
+                check_cancel()
+            end = min(start + _SCAN_ROWS, total)
+            with sp.timed("read_s"):
+                gids = parent.read_column("group", start, end)
+            keep = ~np.isin(gids, drop)
+            with sp.timed("write_s"):
+                mask[start // 8:(end + 7) // 8] = np.packbits(keep, bitorder="little")
+            counts.append(np.add.reduceat(keep.view(np.uint8), np.arange(0, end - start, MASK_BLOCK), dtype=np.int64))
+            if known is None:
+                with sp.timed("read_s"):
+                    data = parent.read(start, end)[keep]
+                with sp.timed("bbox_s"):
+                    stats.add(data)
+            elif not keep.all():
+                with sp.timed("read_s"):
+                    dropped = parent.read_column("D", start, end)[~keep]
+                stats.remove_diameters(dropped)
+            sp.add("rows", end - start)
+            _emit_progress(progress_callback, end, total)
+        offsets = np.cumsum(np.concatenate(counts))
+        node.create_dataset(MASK_OFFSETS, data=offsets)
+        rows = int(offsets[-1])
+        node.attrs[ROWS_ATTR] = rows
+        stats.write_attrs(fout, node.attrs)
+    return rows
+
+
+def write_override_layer(
+    parent_path: str,
+    dst_path: str,
+    *,
+    group: int | None = None,
+    D: float | None = None,
+    height: float | None = None,
+    check_cancel: Callable[[], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> int:
+    """Write a layer over ``parent_path`` setting ``D`` and/or ``height`` of ``group``.
+
+    ``group`` None changes every row. Returns the rows changed. With a parent statistics
+    block only the rows of ``group`` are read in full; their old contribution leaves the
+    statistics and the overridden rows enter them.
+    """
+    h5py = _require_h5py()
+    np = _require_numpy()
+    table = np.array(
+        [(group is None, -1 if group is None else int(group),
+          np.nan if D is None else float(D), np.nan if height is None else float(height))],
+        dtype=override_dtype(),
+    )
+    changed = 0
+    with span("override_layer", group=group) as sp, \
+            h5py.File(parent_path, "r") as fin, h5py.File(dst_path, "w") as fout:
+        parent = open_vbump(fin)
+        known = read_stats(fin)
+        total = parent.rows
+        node = _create_layer(fout, "overrides", parent_path, total, getattr(parent, "depth", 0) + 1)
+        node.create_dataset(OVERRIDES, data=table)
+        if known is not None and group is not None:
+            stats = known.without_groups([group])
+            scan = total if group in known.group_rows else 0
+            for start in range(0, scan, _SCAN_ROWS):
+                if check_cancel is not None:
+                    check_cancel()
+                end = min(start + _SCAN_ROWS, total)
+                with sp.timed("read_s"):
+                    gids = parent.read_column("group", start, end)
+                hits = np.flatnonzero(gids == group)
+                if len(hits):
+                    lo, hi = int(hits[0]), int(hits[-1]) + 1
+                    with sp.timed("read_s"):
+                        data = parent.read(start + lo, start + hi)[gids[lo:hi] == group]
+                    with sp.timed("bbox_s"):
+                        stats.remove_diameters(data["D"])
+                        changed += _apply_overrides(data, table)
+                        stats.add(data)
+                sp.add("rows", end - start)
+                _emit_progress(progress_callback, end, total)
+        else:
+            stats = BBoxAccumulator()
+            for start, end, data in parent.iter_chunks(_SCAN_ROWS):
+                if check_cancel is not None:
+                    check_cancel()
+                if not data.flags.writeable:
+                    data = data.copy()
+                with sp.timed("bbox_s"):
+                    changed += _apply_overrides(data, table)
+                    stats.add(data)
+                sp.add("rows", end - start)
+                _emit_progress(progress_callback, end, total)
+        stats.write_attrs(fout, node.attrs)
+    return changed
+
+
+def write_append_layer(
+    parent_path: str,
+    block_path: str,
+    dst_path: str,
+    *,
+    check_cancel: Callable[[], None] | None = None,
+) -> int:
+    """Write a layer reading ``parent_path``'s rows followed by ``block_path``'s; return rows.
+
+    Statistics merge from both files' blocks; a file without one is rescanned.
+    """
+    h5py = _require_h5py()
+    with span("append_layer") as sp, h5py.File(parent_path, "r") as fin, \
+            h5py.File(block_path, "r") as fblock, h5py.File(dst_path, "w") as fout:
+        parent = open_vbump(fin)
+        block = open_vbump(fblock)
+        if parent.dtype.names != block.dtype.names:
+            raise ValueError(f"Cannot append '{block_path}': its vbump fields differ from the proxy's.")
+        stats = BBoxAccumulator()
+        for handle, reader in ((fin, parent), (fblock, block)):
+            known = read_stats(handle)
+            stats.merge(known if known is not None else _scan_stats(reader, sp, check_cancel))
+        rows = parent.rows + block.rows
+        depth = max(getattr(parent, "depth", 0), getattr(block, "depth", 0)) + 1
+        node = _create_layer(fout, "append", parent_path, rows, depth)
+        node[BLOCK] = h5py.ExternalLink(os.path.abspath(block_path), "/vbump")
+        stats.write_attrs(fout, node.attrs)
+        sp.add("rows", rows)
+    return rows
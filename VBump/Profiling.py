@@ -0,0 +1,208 @@
+"""Opt-in profiling of proxy operations and exporters.
+
+Set ``VBUMP_PROFILE`` (``1``/``cprofile`` or ``pyinstrument``) or enable the GUI toggle
+to profile every :class:`ui.logic.VBumpLogic` operation. Each run writes two files to
+the profile directory (the proxy directory unless ``VBUMP_PROFILE_DIR`` is set)::
+
+    20250101-120000_move_copy_2000000rows.prof   # cProfile stats (snakeviz, pstats)
+    20250101-120000_move_copy_2000000rows.txt    # header + top functions by cumulative time
+
+The text header records the label, row counts before/after, wall time and outcome so a
+slow report can be reproduced and attributed to a function. Profiling is per thread and
+does not nest: an operation called from inside another profiled operation is covered by
+the outer profile.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import platform
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+PROFILE_ENV = "VBUMP_PROFILE"
+PROFILE_DIR_ENV = "VBUMP_PROFILE_DIR"
+PROFILE_MODES = ("cprofile", "pyinstrument")
+
+_active = threading.local()
+
+
+def _require_pyinstrument():
+    try:
+        import pyinstrument  # type: ignore
+    except ImportError as exc:
+        raise RuntimeError(
+            "pyinstrument is required for sampling profiles. Install it via 'pip install pyinstrument'."
+        ) from exc
+    return pyinstrument
+
+
+def parse_mode(value: str | None) -> str | None:
+    """Map an environment/CLI value to a profiler mode; empty, ``0`` or ``off`` disable it."""
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in ("", "0", "off", "false", "no"):
+        return None
+    if value in ("1", "on", "true", "yes"):
+        return "cprofile"
+    if value not in PROFILE_MODES:
+        raise ValueError(f"Unknown profiler '{value}'. Expected one of {', '.join(PROFILE_MODES)}.")
+    return value
+
+
+@dataclass
+class ProfileRecord:
+    label: str
+    stats_path: str
+    summary_path: str
+    seconds: float
+    rows_before: int | None
+    rows_after: int | None
+    outcome: str
+
+
+class OperationProfiler:
+    """Wrap operations in cProfile (or pyinstrument) and save the result per run."""
+
+    def __init__(
+        self,
+        output_dir: str | os.PathLike[str],
+        mode: str | None = None,
+        *,
+        top: int = 40,
+        log_callback: Callable[[str], None] | None = None,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.mode = parse_mode(mode) if mode is not None else None
+        self.top = top
+        self.log_callback = log_callback
+        self.records: list[ProfileRecord] = []
+
+    @classmethod
+    def from_env(
+        cls,
+        default_dir: str | os.PathLike[str],
+        *,
+        log_callback: Callable[[str], None] | None = None,
+        environ: dict[str, str] | None = None,
+    ) -> "OperationProfiler":
+        environ = os.environ if environ is None else environ
+        output_dir = environ.get(PROFILE_DIR_ENV) or default_dir
+        try:
+            return cls(output_dir, environ.get(PROFILE_ENV), log_callback=log_callback)
+        except ValueError as exc:
+            if log_callback:
+                log_callback(f"⚠️ {PROFILE_ENV} ignored: {exc}")
+            return cls(output_dir, None, log_callback=log_callback)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    @contextmanager
+    def profile(self, label: str, *, rows: Callable[[], int] | None = None, **fields: Any) -> Iterator[None]:
+        """Profile the block when enabled; ``rows`` is sampled before and after."""
+        if not self.enabled or getattr(_active, "busy", False):
+            yield
+            return
+        if self.mode == "pyinstrument":
+            profiler = _require_pyinstrument().Profiler()
+            start, stop = profiler.start, profiler.stop
+        else:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            start, stop = profiler.enable, profiler.disable
+        rows_before = _safe_rows(rows)
+        outcome = "ok"
+        _active.busy = True
+        started = time.perf_counter()
+        start()
+        try:
+            yield
+        except BaseException as exc:
+            outcome = type(exc).__name__
+            raise
+        finally:
+            stop()
+            seconds = time.perf_counter() - started
+            _active.busy = False
+            try:
+                record = self._save(profiler, label, seconds, rows_before, _safe_rows(rows), outcome, fields)
+            except OSError as exc:
+                self._log(f"⚠️ Could not save profile for {label}: {exc}")
+            else:
+                self.records.append(record)
+                self._log(f"🔬 Profile for {label} ({seconds:.2f} s) saved to {record.summary_path}")
+
+    def _log(self, message: str) -> None:
+        if self.log_callback:
+            self.log_callback(message)
+
+    def _save(
+        self,
+        profiler,
+        label: str,
+        seconds: float,
+        rows_before: int | None,
+        rows_after: int | None,
+        outcome: str,
+        fields: dict[str, Any],
+    ) -> ProfileRecord:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        rows_tag = max(r for r in (rows_before, rows_after, 0) if r is not None)
+        safe_label = re.sub(r"[^A-Za-z0-9_-]+", "_", label).strip("_") or "operation"
+        stem = f"{datetime.now():%Y%m%d-%H%M%S}_{safe_label}_{rows_tag}rows"
+        base = self.output_dir / stem
+        suffix = 1
+        while base.with_suffix(".txt").exists():
+            suffix += 1
+            base = self.output_dir / f"{stem}_{suffix}"
+
+        header = [
+            f"operation: {label}",
+            f"outcome: {outcome}",
+            f"wall_seconds: {seconds:.3f}",
+            f"rows_before: {rows_before}",
+            f"rows_after: {rows_after}",
+            f"profiler: {self.mode}",
+            f"python: {platform.python_version()} ({sys.platform})",
+        ]
+        header.extend(f"{key}: {value}" for key, value in fields.items())
+
+        if self.mode == "pyinstrument":
+            stats_path = base.with_suffix(".html")
+            stats_path.write_text(profiler.output_html(), encoding="utf-8")
+            body = profiler.output_text(unicode=False, color=False)
+        else:
+            import pstats
+
+            stats_path = base.with_suffix(".prof")
+            profiler.dump_stats(str(stats_path))
+            buffer = io.StringIO()
+            stats = pstats.Stats(profiler, stream=buffer)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            stats.sort_stats("tottime").print_stats(self.top)
+            body = buffer.getvalue()
+
+        summary_path = base.with_suffix(".txt")
+        summary_path.write_text("\n".join(header) + "\n\n" + body, encoding="utf-8")
+        return ProfileRecord(label, str(stats_path), str(summary_path), seconds, rows_before, rows_after, outcome)
+
+
+def _safe_rows(rows: Callable[[], int] | None) -> int | None:
+    if rows is None:
+        return None
+    try:
+        return int(rows())
+    except Exception:
+        return None
@@ -0,0 +1,314 @@
+"""On-disk home of proxy files: per-process sessions, orphan cleanup and a disk budget.
+
+Every :class:`ProxyStore` owns one *session* directory under a shared root (the GUI uses
+``.proxy_runtime`` next to ``main_ui.py``) and announces itself with a lock file next
+to it::
+
+    .proxy_runtime/
+        gui-4711-1f2e3d4c/          # proxies of process 4711
+        gui-4711-1f2e3d4c.lock      # {"pid": 4711, "host": "ws-12", "started": ...}
+        job-4802-9a8b7c6d/          # kept with ``close(keep_files=True)``
+        job-4802-9a8b7c6d.lock      # {..., "kept": true}
+
+Opening a store removes the sessions of processes that died without cleaning up (their
+lock names a PID that no longer runs on this host), lockless session directories and
+loose ``<stem>_<uuid>.h5`` proxies left by older versions, once they are
+``ORPHAN_GRACE_S`` old. Nothing else in the root is touched, and locks of other hosts
+are left alone.
+
+:meth:`ProxyStore.close` removes the session. ``close(keep_files=True)``
+(``--keep-proxies``) keeps it and marks its lock ``"kept"``; kept sessions are never
+collected automatically, so delete them by hand when done.
+
+``VBUMP_PROXY_DIR`` overrides the root; ``VBUMP_PROXY_DIR=tmpfs`` selects a RAM-backed
+directory (``/dev/shm/vbump-<user>``) for scratch proxies where one exists.
+``VBUMP_PROXY_BUDGET`` (e.g. ``20G``, ``512M``) caps the bytes a session may keep; the
+owner (:class:`ui.logic.VBumpLogic`) evicts its least recently used undo states to stay
+below it. On tmpfs the budget defaults to half the file system.
+
+Files that cannot be removed (e.g. still open on Windows) are logged and retried by
+:meth:`ProxyStore.collect` instead of being forgotten.
+"""
+
+from __future__ import annotations
+
+import getpass
+import json
+import os
+import re
+import shutil
+import socket
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable
+
+PROXY_DIR_ENV = "VBUMP_PROXY_DIR"
+PROXY_BUDGET_ENV = "VBUMP_PROXY_BUDGET"
+TMPFS = "tmpfs"
+TMPFS_ROOTS = ("/dev/shm",)
+LOCK_SUFFIX = ".lock"
+# Leave lockless sessions and loose proxies this young alone: their owner may be starting.
+ORPHAN_GRACE_S = 60.0
+_SESSION_RE = re.compile(r"-(\d+)-[0-9a-f]{8}$")
+# Proxies written straight into the root before sessions existed: ``<stem>_<uuid4 hex>.h5``.
+_LEGACY_PROXY_RE = re.compile(r"_[0-9a-f]{32}\.h5$")
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(value: str | int | None) -> int | None:
+    """Parse ``20G``, ``512M``, ``1.5T`` or a byte count; empty, ``0`` or ``off`` mean no limit."""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value or None
+    text = value.strip().upper().removesuffix("B").removesuffix("I")
+    if text in ("", "0", "OFF", "NONE"):
+        return None
+    match = re.fullmatch(r"([0-9]*\.?[0-9]+)\s*([KMGT]?)", text)
+    if match is None:
+        raise ValueError(f"Invalid size '{value}'. Expected e.g. 512M, 20G or a byte count.")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_size(size: int) -> str:
+    for unit in ("T", "G", "M", "K"):
+        if size >= _SIZE_UNITS[unit]:
+            return f"{size / _SIZE_UNITS[unit]:.1f} {unit}B"
+    return f"{size} B"
+
+
+def tmpfs_root() -> Path | None:
+    """A per-user directory on a RAM-backed file system, or None when there is none."""
+    for base in TMPFS_ROOTS:
+        if os.path.isdir(base) and os.access(base, os.W_OK):
+            return Path(base) / f"vbump-{getpass.getuser()}"
+    return None
+
+
+def is_tmpfs(path: str | os.PathLike[str]) -> bool:
+    """True when ``path`` lives on tmpfs/ramfs (Linux ``/proc/mounts``; False elsewhere)."""
+    try:
+        with open("/proc/mounts", encoding="utf-8") as mounts:
+            entries = [line.split()[1:3] for line in mounts if len(line.split()) >= 3]
+    except OSError:
+        return False
+    target = os.path.realpath(path)
+    best, fstype = "", ""
+    for mount, kind in entries:
+        if (target == mount or target.startswith(mount.rstrip("/") + "/")) and len(mount) > len(best):
+            best, fstype = mount, kind
+    return fstype in ("tmpfs", "ramfs")
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            # Access denied means the process exists but belongs to someone else.
+            return kernel32.GetLastError() == 5
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _tree_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+class ProxyStore:
+    """One process's session directory of proxy files under a shared ``root``."""
+
+    def __init__(
+        self,
+        root: str | os.PathLike[str],
+        *,
+        label: str = "session",
+        budget: int | None = None,
+        log_callback: Callable[[str], None] | None = None,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.budget = budget if budget is not None else self.default_budget(self.root)
+        self.log_callback = log_callback
+        self.host = socket.gethostname()
+        self.pending: set[Path] = set()
+        self.cleanup_orphans()
+        name = f"{label}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.session_dir = self.root / name
+        self.lock_path = self.root / f"{name}{LOCK_SUFFIX}"
+        self.session_dir.mkdir()
+        self.lock_path.write_text(
+            json.dumps({"pid": os.getpid(), "host": self.host, "started": time.time()}), encoding="utf-8"
+        )
+
+    @classmethod
+    def from_env(
+        cls,
+        default_root: str | os.PathLike[str],
+        *,
+        label: str = "session",
+        root: str | os.PathLike[str] | None = None,
+        budget: int | None = None,
+        log_callback: Callable[[str], None] | None = None,
+        environ: dict[str, str] | None = None,
+    ) -> "ProxyStore":
+        """Open a store configured by the environment; explicit ``root``/``budget`` win."""
+        environ = os.environ if environ is None else environ
+        root = cls.resolve_root(root or environ.get(PROXY_DIR_ENV) or default_root, log_callback)
+        if budget is None:
+            try:
+                budget = parse_size(environ.get(PROXY_BUDGET_ENV))
+            except ValueError as exc:
+                if log_callback:
+                    log_callback(f"⚠️ {PROXY_BUDGET_ENV} ignored: {exc}")
+        return cls(root, label=label, budget=budget, log_callback=log_callback)
+
+    @staticmethod
+    def resolve_root(
+        root: str | os.PathLike[str], log_callback: Callable[[str], None] | None = None
+    ) -> Path:
+        """Map ``tmpfs`` to :func:`tmpfs_root`; other values are directories."""
+        if str(root) != TMPFS:
+            return Path(root)
+        found = tmpfs_root()
+        if found is not None:
+            return found
+        fallback = Path(tempfile.gettempdir()) / f"vbump-{getpass.getuser()}"
+        if log_callback:
+            log_callback(f"⚠️ No tmpfs found; proxies go to {fallback}")
+        return fallback
+
+    @staticmethod
+    def default_budget(root: Path) -> int | None:
+        """Half of a RAM-backed file system; unlimited on disks."""
+        if is_tmpfs(root):
+            return shutil.disk_usage(root).total // 2
+        return None
+
+    def _log(self, message: str) -> None:
+        if self.log_callback:
+            self.log_callback(message)
+
+    def cleanup_orphans(self) -> int:
+        """Remove sessions of dead processes and stale leftovers; return the bytes freed."""
+        live: set[str] = set()
+        freed = 0
+        removed = 0
+        now = time.time()
+        for lock in self.root.glob(f"*{LOCK_SUFFIX}"):
+            session = self.root / lock.name[: -len(LOCK_SUFFIX)]
+            try:
+                info = json.loads(lock.read_text(encoding="utf-8"))
+                pid, host = int(info["pid"]), str(info["host"])
+                kept = bool(info.get("kept"))
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                pid, host, kept = -1, self.host, False
+                if now - lock.stat().st_mtime < ORPHAN_GRACE_S:
+                    live.add(session.name)
+                    continue
+            if kept:
+                live.add(session.name)
+                continue
+            if host != self.host or _pid_alive(pid):
+                live.add(session.name)
+                continue
+            freed += self._remove_orphan(session)
+            lock.unlink(missing_ok=True)
+            removed += 1
+        for entry in self.root.iterdir():
+            try:
+                stale = now - entry.stat().st_mtime >= ORPHAN_GRACE_S
+            except OSError:
+                continue
+            if not stale or entry.name in live:
+                continue
+            if (entry.is_dir() and _SESSION_RE.search(entry.name)) or (
+                entry.is_file() and _LEGACY_PROXY_RE.search(entry.name)
+            ):
+                freed += self._remove_orphan(entry)
+                removed += 1
+        if removed:
+            self._log(f"🧹 Removed {removed} orphaned proxy entries ({format_size(freed)}) from {self.root}")
+        return freed
+
+    def _remove_orphan(self, path: Path) -> int:
+        if not path.exists():
+            return 0
+        size = _tree_size(path)
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        return size if not path.exists() else 0
+
+    def new_path(self, stem: str) -> str:
+        return str((self.session_dir / f"{stem}_{uuid.uuid4().hex}.h5").resolve())
+
+    def owns(self, path: str | os.PathLike[str]) -> bool:
+        return Path(path).resolve().parent == self.session_dir
+
+    def discard(self, path: str | os.PathLike[str]) -> bool:
+        """Delete a proxy of this session; failures are logged and retried by :meth:`collect`."""
+        target = Path(path).resolve()
+        if not self.owns(target):
+            return False
+        try:
+            target.unlink(missing_ok=True)
+        except OSError as exc:
+            if target not in self.pending:
+                self._log(f"⚠️ Could not remove proxy {target.name} ({exc}); will retry")
+            self.pending.add(target)
+            return False
+        self.pending.discard(target)
+        return True
+
+    def collect(self) -> None:
+        """Retry deleting proxies whose removal failed earlier."""
+        for target in list(self.pending):
+            self.discard(target)
+
+    def usage(self) -> int:
+        """Bytes held by this session's files."""
+        return _tree_size(self.session_dir) if self.session_dir.exists() else 0
+
+    def over_budget(self) -> int:
+        """Bytes above ``budget`` (0 when within it or unlimited)."""
+        if self.budget is None:
+            return 0
+        return max(0, self.usage() - self.budget)
+
+    def close(self, *, keep_files: bool = False) -> None:
+        """Remove the session and its lock, or with ``keep_files`` mark the lock as kept."""
+        if keep_files:
+            info = {"pid": os.getpid(), "host": self.host, "started": time.time(), "kept": True}
+            self.lock_path.write_text(json.dumps(info), encoding="utf-8")
+            return
+        shutil.rmtree(self.session_dir, ignore_errors=True)
+        if self.session_dir.exists():
+            self._log(f"⚠️ Could not remove proxy directory {self.session_dir}")
+            return
+        self.lock_path.unlink(missing_ok=True)
@@ -0,0 +1,205 @@
+"""Storage profiles: compression codec and chunk shape for vbump HDF5 datasets.
+
+Every HDF5 writer (``to_hdf5``, the grid writers, ``H5Manip`` and the proxy pipeline in
+``ui.logic``) takes ``storage=`` and builds its dataset with
+:meth:`StorageProfile.dataset_kwargs`. Built-in profiles:
+
+========  ==========================  ===========  ==========================================
+name      codec                       chunk rows   use
+========  ==========================  ===========  ==========================================
+scratch   none, contiguous            -            proxies (default), memory-mapped reads
+fast      lzf + shuffle               125,000      proxies on slow or network disks      
+archive   gzip level 4 + shuffle      62,500       saved files (default for ``to_hdf5``)
+zstd      Zstandard (hdf5plugin)      62,500       smaller and faster than gzip
+blosc     Blosc/zstd + bitshuffle     62,500       fastest compressed profile (hdf5plugin)
+columnar  gzip level 4 + shuffle      62,500       one dataset per column (see VBump.H5Layout)
+compact   gzip level 4 + shuffle      62,500       int32 fixed-point coordinates, 0.1 µm steps
+vertical  gzip level 4 + shuffle      62,500       x/y/D/group per row, z per group
+========  ==========================  ===========  ==========================================
+
+Suffixes combine a codec with a layout and/or encoding: ``<name>+columnar`` stores one
+dataset per column, ``+vertical`` drops the columns vertical bumps repeat, ``+float32``
+stores coordinates and ``D`` as float32 and ``+fixed`` as int32 multiples of
+``fixed_scale`` (e.g. ``zstd+columnar+fixed``). Compact encodings
+halve the bytes per row and fail the write when a value would move by more than
+``tolerance`` (0.5 µm by default).
+
+Chunk sizes divide the 1,000,000-row write batches used throughout the package, so
+batched writes never touch a partially written chunk (a ``vbump`` row is 60 bytes, so
+125,000 rows is ~7.5 MB per chunk). ``zstd`` and ``blosc`` need the optional
+``hdf5plugin`` package at write *and* read time (``_require_h5py`` registers its filters
+when installed); files written with them cannot be opened by a plain h5py install.
+``scratch`` nodes are contiguous when the row count is known up front, so readers can
+memory-map them (see :mod:`VBump.H5Layout`); they fall back to 125,000-row chunks
+otherwise. ``VBUMP_PROXY_STORAGE`` selects the proxy profile.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, replace
+from typing import Any, Callable
+
+from VBump.H5Layout import ENCODINGS, LAYOUTS, create_vbump, group_range_of, open_vbump
+
+PROXY_STORAGE_ENV = "VBUMP_PROXY_STORAGE"
+DEFAULT_PROXY_STORAGE = "scratch"
+DEFAULT_OUTPUT_STORAGE = "archive"
+
+# Sentinel for "use the profile's codec" in writers that still accept ``compression=``.
+KEEP = object()
+
+# Attributes describing the source layout/encoding; never copied onto a re-encoded node.
+_LAYOUT_ATTRS = (
+    "layout", "columns", "rows", "encoding", "encoded_fields", "tolerance", "fixed_scale", "fixed_offset", "constant_group",
+    "layer", "depth",
+)
+
+
+def _require_hdf5plugin():
+    try:
+        import hdf5plugin  # type: ignore
+    except ImportError as exc:
+        raise RuntimeError(
+            "hdf5plugin is required for the zstd/blosc storage profiles. Install it via 'pip install hdf5plugin'."
+        ) from exc
+    return hdf5plugin
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    name: str
+    compression: str | int | None = None
+    compression_opts: Any = None
+    shuffle: bool = False
+    chunk_rows: int = 125_000
+    plugin: Callable[[], dict[str, Any]] | None = None
+    layout: str = "rows"
+    encoding: str = "float64"
+    fixed_scale: float = 1e-4
+    tolerance: float = 5e-4
+    contiguous: bool = False
+
+    def dataset_kwargs(self, total_rows: int | None = None) -> dict[str, Any]:
+        """Return ``create_dataset`` keyword arguments for a 1-D ``vbump`` dataset."""
+        rows = self.chunk_rows
+        if total_rows is not None and total_rows > 0:
+            rows = min(rows, total_rows)
+        kwargs: dict[str, Any] = {"chunks": (max(1, rows),)}
+        if self.plugin is not None:
+            kwargs.update(self.plugin())
+        elif self.compression is not None:
+            kwargs["compression"] = self.compression
+            if self.compression_opts is not None:
+                kwargs["compression_opts"] = self.compression_opts
+        if self.shuffle and self.plugin is None:
+            kwargs["shuffle"] = True
+        return kwargs
+
+
+def _zstd_kwargs() -> dict[str, Any]:
+    return dict(_require_hdf5plugin().Zstd(clevel=3))
+
+
+def _blosc_kwargs() -> dict[str, Any]:
+    plugin = _require_hdf5plugin()
+    return dict(plugin.Blosc(cname="zstd", clevel=3, shuffle=plugin.Blosc.BITSHUFFLE))
+
+
+PROFILES: dict[str, StorageProfile] = {
+    "scratch": StorageProfile("scratch", contiguous=True),
+    "fast": StorageProfile("fast", compression="lzf", shuffle=True),
+    "archive": StorageProfile("archive", compression="gzip", compression_opts=4, shuffle=True, chunk_rows=62_500),
+    "zstd": StorageProfile("zstd", compression="zstd", chunk_rows=62_500, plugin=_zstd_kwargs),
+    "blosc": StorageProfile("blosc", compression="blosc", chunk_rows=62_500, plugin=_blosc_kwargs),
+    "columnar": StorageProfile(
+        "columnar", compression="gzip", compression_opts=4, shuffle=True, chunk_rows=62_500, layout="columnar"
+    ),
+    "compact": StorageProfile(
+        "compact", compression="gzip", compression_opts=4, shuffle=True, chunk_rows=62_500, encoding="fixed"
+    ),
+    "vertical": StorageProfile(
+        "vertical", compression="gzip", compression_opts=4, shuffle=True, chunk_rows=62_500, layout="vertical"
+    ),
+}
+
+
+def get_profile(storage: str | StorageProfile | None, default: str = DEFAULT_OUTPUT_STORAGE) -> StorageProfile:
+    """Look up a profile by name; layout (``+columnar``, ``+vertical``) and encoding suffixes adjust it."""
+    if isinstance(storage, StorageProfile):
+        return storage
+    name = (storage or default).strip().lower()
+    base, *suffixes = name.split("+")
+    try:
+        profile = PROFILES[base]
+    except KeyError:
+        raise ValueError(f"Unknown storage profile '{storage}'. Expected one of {', '.join(PROFILES)}.") from None
+    for suffix in suffixes:
+        if suffix in LAYOUTS:
+            profile = replace(profile, layout=suffix)
+        elif suffix in ENCODINGS:
+            profile = replace(profile, encoding=suffix)
+        else:
+            raise ValueError(
+                f"Unknown storage suffix '{suffix}'. Expected one of {', '.join(LAYOUTS + ENCODINGS)}."
+            )
+    if suffixes:
+        profile = replace(profile, name=name)
+    return profile
+
+
+def resolve(
+    storage: str | StorageProfile | None,
+    compression: Any = KEEP,
+    *,
+    default: str = DEFAULT_OUTPUT_STORAGE,
+) -> StorageProfile:
+    """Return the profile for ``storage``; an explicit legacy ``compression`` overrides its codec."""
+    profile = get_profile(storage, default)
+    if compression is KEEP:
+        return profile
+    return replace(profile, compression=compression, compression_opts=None, shuffle=False, plugin=None)
+
+
+def proxy_profile_from_env(environ: dict[str, str] | None = None) -> StorageProfile:
+    environ = os.environ if environ is None else environ
+    return get_profile(environ.get(PROXY_STORAGE_ENV), DEFAULT_PROXY_STORAGE)
+
+
+def copy_vbump_file(
+    src_path: str,
+    dst_path: str,
+    storage: str | StorageProfile | None = DEFAULT_OUTPUT_STORAGE,
+    *,
+    chunk_size: int = 1_000_000,
+    check_cancel: Callable[[], None] | None = None,
+) -> int:
+    """Copy a vbump HDF5 file into ``dst_path`` re-encoded with ``storage``.
+
+    Copies the ``vbump`` node in ``chunk_size`` row batches (converting between layouts
+    and encodings as needed), its attributes and the ``groups`` hierarchy. Returns the
+    number of rows copied.
+    """
+    from VBump.Basic import _require_h5py
+
+    h5py = _require_h5py()
+    profile = get_profile(storage)
+    with h5py.File(src_path, "r") as fin, h5py.File(dst_path, "w") as fout:
+        reader = open_vbump(fin)
+        total = reader.rows
+        writer = create_vbump(fout, reader.dtype, profile, total=total, group_range=group_range_of(fin))
+        for start in range(0, total, chunk_size):
+            if check_cancel is not None:
+                check_cancel()
+            end = min(start + chunk_size, total)
+            writer.write(start, reader.read(start, end))
+        writer.finish()
+        for key, value in reader.attrs.items():
+            if key not in writer.attrs and key not in _LAYOUT_ATTRS:
+                writer.attrs[key] = value
+        for name in fin:
+            if name != "vbump":
+                fin.copy(name, fout)
+        for key, value in fin.attrs.items():
+            fout.attrs[key] = value
+    return total
@@ -0,0 +1,332 @@
+"""Native binary ``.vbump`` files: fixed header, little-endian column blocks, group table.
+
+Layout (all integers and floats little-endian)::
+
+    offset 0    header (HEADER_SIZE bytes)
+                  magic b"VBUMPBIN", version u16, flags u16, header_size u32,
+                  rows u64, capacity u64, groups u32, reserved u32,
+                  group_table_offset u64, bounding_box 6 x f64 (xmin, ymin, zmin, xmax, ymax, zmax)
+    header_size column blocks, ``capacity`` rows each, in COLUMNS order
+                  x0 y0 z0 x1 y1 z1 D (f64), group (i32)
+    group_table_offset
+                group table, one GROUP_RECORD per group: group i32, pad i32, rows u64, bounding box 6 x f64
+
+Every column is a plain array at a fixed offset, so :class:`VBumpFile` maps it with
+``np.memmap`` and opening even a 50M-row file only parses the header and the group
+table. Bounding boxes follow :func:`VBump.Basic.to_hdf5`: x/y extents include half the
+bump diameter. :class:`VBumpFileWriter` appends structured vbump arrays, growing the
+column blocks in place when ``capacity`` is exceeded, and writes the header and group
+table on close; a writer interrupted before :meth:`VBumpFileWriter.close` leaves a file
+to discard, like any partial proxy output.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from typing import Any, Callable
+
+from VBump.H5Layout import BBoxAccumulator
+from VBump.Instrument import counter, span
+
+MAGIC = b"VBUMPBIN"
+VERSION = 1
+HEADER_SIZE = 128
+SUFFIX = ".vbump"
+COLUMNS: tuple[tuple[str, str], ...] = (
+    ("x0", "<f8"),
+    ("y0", "<f8"),
+    ("z0", "<f8"),
+    ("x1", "<f8"),
+    ("y1", "<f8"),
+    ("z1", "<f8"),
+    ("D", "<f8"),
+    ("group", "<i4"),
+)
+_HEADER = struct.Struct("<8sHHIQQIIQ6d")
+_GROUP_RECORD = [("group", "<i4"), ("pad", "<i4"), ("rows", "<u8"), ("bbox", "<f8", (6,))]
+_COPY_ROWS = 4_000_000
+
+
+def _require_numpy():
+    from VBump.Basic import _require_numpy as require
+
+    return require()
+
+
+def is_vbump_file(path: str | os.PathLike[str]) -> bool:
+    """Return True when ``path`` starts with the native ``.vbump`` magic."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _column_offsets(capacity: int, header_size: int = HEADER_SIZE) -> dict[str, int]:
+    offsets: dict[str, int] = {}
+    position = header_size
+    for name, dtype in COLUMNS:
+        offsets[name] = position
+        position += capacity * int(dtype[-1])
+    return offsets
+
+
+def _columns_end(capacity: int, header_size: int = HEADER_SIZE) -> int:
+    return header_size + capacity * sum(int(dtype[-1]) for _, dtype in COLUMNS)
+
+
+class VBumpFile:
+    """Read-only, memory-mapped access to a native ``.vbump`` file."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        np = _require_numpy()
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as f:
+            raw = f.read(_HEADER.size)
+            if len(raw) < _HEADER.size or raw[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"'{self.path}' is not a native .vbump file.")
+            (
+                _magic, version, self.flags, self.header_size, self.rows, self.capacity,
+                groups, _reserved, table_offset, *bbox,
+            ) = _HEADER.unpack(raw)
+            if version > VERSION:
+                raise ValueError(f"'{self.path}' uses .vbump version {version}; this build reads up to {VERSION}.")
+            f.seek(table_offset)
+            table = np.frombuffer(f.read(groups * np.dtype(_GROUP_RECORD).itemsize), dtype=_GROUP_RECORD)
+        self.version = version
+        self.bounding_box = (tuple(bbox[:3]), tuple(bbox[3:])) if self.rows else None
+        self.group_rows = {int(r["group"]): int(r["rows"]) for r in table}
+        self.group_bounding_boxes = {
+            int(r["group"]): (tuple(float(v) for v in r["bbox"][:3]), tuple(float(v) for v in r["bbox"][3:]))
+            for r in table
+        }
+        self._offsets = _column_offsets(self.capacity, self.header_size)
+        self._maps: dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __enter__(self) -> "VBumpFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._maps.clear()
+
+    @property
+    def dtype(self):
+        from VBump.H5Layout import vbump_dtype
+
+        return vbump_dtype()
+
+    def column(self, name: str):
+        """Return column ``name`` as a read-only ``np.memmap`` of ``rows`` values."""
+        if name not in self._maps:
+            np = _require_numpy()
+            if self.rows == 0:
+                self._maps[name] = np.empty(0, dtype=dict(COLUMNS)[name])
+            else:
+                self._maps[name] = np.memmap(
+                    self.path, dtype=dict(COLUMNS)[name], mode="r", offset=self._offsets[name], shape=(self.rows,)
+                )
+        return self._maps[name]
+
+    def read(self, start: int = 0, end: int | None = None):
+        """Return rows ``[start, end)`` as a structured array of :func:`vbump_dtype`."""
+        np = _require_numpy()
+        end = self.rows if end is None else min(end, self.rows)
+        out = np.empty(max(0, end - start), dtype=self.dtype)
+        for name, _ in COLUMNS:
+            out[name] = self.column(name)[start:end]
+        return out
+
+
+class VBumpFileWriter:
+    """Append structured vbump arrays to a native ``.vbump`` file.
+
+    ``capacity`` preallocates rows per column; ``append=True`` continues an existing file.
+    Call :meth:`close` (or use the writer as a context manager) to publish the rows.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], *, capacity: int = 0, append: bool = False) -> None:
+        self.path = os.fspath(path)
+        self.bboxes = BBoxAccumulator()
+        if append and os.path.exists(self.path):
+            existing = VBumpFile(self.path)
+            self.rows = existing.rows
+            self.capacity = existing.capacity
+            self.bboxes.add_boxes(
+                [*existing.bounding_box[0], *existing.bounding_box[1]] if existing.bounding_box is not None else None,
+                {gid: [*low, *high] for gid, (low, high) in existing.group_bounding_boxes.items()},
+                existing.group_rows,
+            )
+            existing.close()
+            self._file = open(self.path, "r+b")
+            self._ensure_capacity(self.rows + max(0, capacity))
+        else:
+            self.rows = 0
+            self.capacity = 0
+            self._file = open(self.path, "w+b")
+            self._write_header()
+            self._ensure_capacity(max(0, capacity))
+
+    def __enter__(self) -> "VBumpFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def append(self, data) -> None:
+        np = _require_numpy()
+        count = len(data)
+        if count == 0:
+            return
+        self._ensure_capacity(self.rows + count)
+        offsets = _column_offsets(self.capacity)
+        for name, dtype in COLUMNS:
+            self._file.seek(offsets[name] + self.rows * int(dtype[-1]))
+            self._file.write(np.ascontiguousarray(data[name], dtype=dtype).tobytes())
+        self.bboxes.add(data)
+        self.rows += count
+
+    def close(self) -> None:
+        """Drop unused capacity, write the group table and publish the header."""
+        if self._file.closed:
+            return
+        self._relayout(self.rows)
+        self._write_header()
+        self._file.close()
+
+    def _ensure_capacity(self, rows: int) -> None:
+        if rows > self.capacity:
+            self._relayout(max(rows, self.capacity * 2))
+
+    def _relayout(self, capacity: int) -> None:
+        """Move the column blocks to the offsets of ``capacity`` rows per column."""
+        if capacity == self.capacity:
+            return
+        old = _column_offsets(self.capacity)
+        new = _column_offsets(capacity)
+        if capacity > self.capacity:
+            self._file.truncate(_columns_end(capacity))
+            # Columns only move towards the end: copy the last column first, back to front.
+            for name, dtype in reversed(COLUMNS[1:]):
+                self._move(old[name], new[name], self.rows * int(dtype[-1]), backwards=True)
+        else:
+            for name, dtype in COLUMNS[1:]:
+                self._move(old[name], new[name], self.rows * int(dtype[-1]), backwards=False)
+            self._file.truncate(_columns_end(capacity))
+        self.capacity = capacity
+
+    def _move(self, source: int, target: int, size: int, *, backwards: bool) -> None:
+        if source == target or size == 0:
+            return
+        step = _COPY_ROWS * 8
+        spans = [(start, min(step, size - start)) for start in range(0, size, step)]
+        for start, length in (reversed(spans) if backwards else spans):
+            self._file.seek(source + start)
+            block = self._file.read(length)
+            self._file.seek(target + start)
+            self._file.write(block)
+
+    def _write_header(self) -> None:
+        np = _require_numpy()
+        table_offset = _columns_end(self.capacity)
+        group_rows = self.bboxes.group_rows
+        table = np.zeros(len(group_rows), dtype=_GROUP_RECORD)
+        for i, gid in enumerate(sorted(group_rows)):
+            table[i]["group"] = gid
+            table[i]["rows"] = group_rows[gid]
+            table[i]["bbox"] = self.bboxes.group_bounding_boxes[gid]
+        bbox = self.bboxes.bounding_box if self.bboxes.bounding_box is not None else [float("nan")] * 6
+        self._file.seek(table_offset)
+        self._file.write(table.tobytes())
+        self._file.truncate(table_offset + table.nbytes)
+        header = _HEADER.pack(
+            MAGIC, VERSION, 0, HEADER_SIZE, self.rows, self.capacity,
+            len(table), 0, table_offset, *bbox,
+        )
+        self._file.seek(0)
+        self._file.write(header.ljust(HEADER_SIZE, b"\0"))
+        self._file.flush()
+
+
+def hdf5_to_vbump(
+    src_path: str,
+    dst_path: str,
+    *,
+    chunk_size: int = 1_000_000,
+    check_cancel: Callable[[], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> int:
+    """Stream a vbump HDF5 file (any layout/encoding) into a native ``.vbump`` file."""
+    from VBump.Basic import _require_h5py
+    from VBump.H5Layout import open_vbump
+
+    h5py = _require_h5py()
+    with span("hdf5_to_vbump", dst=str(dst_path)) as sp, h5py.File(src_path, "r") as fin:
+        reader = open_vbump(fin)
+        with VBumpFileWriter(dst_path, capacity=reader.rows) as writer:
+            for start, end, data in reader.iter_chunks(chunk_size):
+                if check_cancel is not None:
+                    check_cancel()
+                with sp.timed("write_s"):
+                    writer.append(data)
+                counter("rows_written", end)
+                if progress_callback is not None:
+                    progress_callback(end, reader.rows)
+        sp.add("rows", reader.rows)
+        sp.add("bytes_written", os.path.getsize(dst_path))
+    return reader.rows
+
+
+def vbump_to_hdf5(
+    src_path: str,
+    dst_path: str,
+    storage: Any = None,
+    *,
+    chunk_size: int = 1_000_000,
+    check_cancel: Callable[[], None] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> int:
+    """Convert a native ``.vbump`` file into a vbump HDF5 file written with ``storage``.
+
+    Bounding boxes and the statistics block (see :class:`VBump.H5Layout.BBoxAccumulator`)
+    are accumulated from the chunks while they are copied.
+    """
+    from VBump.Basic import _require_h5py
+    from VBump.H5Layout import create_vbump
+    from VBump.Storage import get_profile
+
+    h5py = _require_h5py()
+    profile = get_profile(storage)
+    with span("vbump_to_hdf5", src=str(src_path), storage=profile.name) as sp, \
+            VBumpFile(src_path) as source, h5py.File(dst_path, "w") as fout:
+        group_range = (min(source.group_rows), max(source.group_rows)) if source.group_rows else None
+        writer = create_vbump(fout, source.dtype, profile, total=source.rows, group_range=group_range)
+        bboxes = BBoxAccumulator()
+        for start in range(0, source.rows, chunk_size):
+            if check_cancel is not None:
+                check_cancel()
+            end = min(start + chunk_size, source.rows)
+            with sp.timed("read_s"):
+                data = source.read(start, end)
+            sp.add("bytes_read", data.nbytes)
+            with sp.timed("bbox_s"):
+                bboxes.add(data)
+            with sp.timed("write_s"):
+                writer.write(start, data)
+            if progress_callback is not None:
+                progress_callback(end, source.rows)
+        writer.finish()
+        bboxes.write_attrs(fout, writer.attrs)
+        fout.flush()
+        sp.add("rows", source.rows)
+        sp.add("bytes_written", fout.id.get_filesize())
+        return source.rows
@@ -1,8 +1,21 @@
-from typing import List
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List
 from VBump.Basic import VBump
 from VBump.ExportWDL import AABB
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
+
+def _require_pyplot():
+    """Import pyplot and the 3D toolkit on first use so non-plotting callers skip matplotlib."""
+    try:
+        import matplotlib.pyplot as plt  # type: ignore
+        from mpl_toolkits.mplot3d.art3d import Poly3DCollection  # type: ignore
+    except ImportError as exc:
+        raise RuntimeError("matplotlib is required for plotting. Install it via 'pip install matplotlib'.") from exc
+    return plt, Poly3DCollection
 
 
 def plot_vbumps(
@@ -14,6 +27,7 @@ def plot_vbumps(
     """Render vbumps using matplotlib as 3D lines grouped by color.
     Optionally render a translucent substrate box.
     """
+    plt, Poly3DCollection = _require_pyplot()
     has_ax = True
     group_vbumps = {}
     for vb in vbumps:
@@ -25,7 +39,7 @@ def plot_vbumps(
         ax = fig.add_subplot(111, projection='3d')
 
     group_ids = sorted(group_vbumps.keys())
-    cmap = plt.cm.get_cmap('tab10', len(group_ids))
+    cmap = plt.get_cmap('tab10', len(group_ids))
     handles = []
 
     # Draw substrate if provided
@@ -130,19 +144,16 @@ def plot_vbumps_aabb(
     """Render AABBs for each group in vbumps using matplotlib, with legend and colored lines by group.
     Optionally, render a substrate box defined by two points (p0, p1) as a translucent gray box under all vbumps.
     """
+    plt, Poly3DCollection = _require_pyplot()
     has_ax = True
-    group_aabbs = {}
-    for vb in vbumps:
-        if vb.group not in group_aabbs:
-            group_aabbs[vb.group] = AABB()
-        group_aabbs[vb.group].add(vb)
+    group_aabbs = AABB.per_group(vbumps)
 
     fig = plt.figure()
     if not ax:
         has_ax = False
         ax = fig.add_subplot(111, projection='3d')
     group_ids = sorted(group_aabbs.keys())
-    cmap = plt.cm.get_cmap('tab10', len(group_ids))
+    cmap = plt.get_cmap('tab10', len(group_ids))
     handles = []
 
     # Draw substrate box if provided
@@ -0,0 +1,5 @@
+"""Core vbump data model, file I/O and exporters.
+
+Modules here import h5py, numpy, ezdxf and matplotlib on first use (the ``_require_*``
+helpers) so headless callers only pay for the dependencies they actually touch.
+"""
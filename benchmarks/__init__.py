@@ -0,0 +1 @@
+"""Performance checks for the Py Bump generator (run from the repository root)."""
@@ -0,0 +1,521 @@
+"""Benchmark case registry covering the VBump I/O and transform paths.
+
+A case is a setup function decorated with :func:`case`. Setup receives a
+:class:`CaseContext`, prepares its inputs (not timed) and returns the callable that is
+timed; the callable returns the number of rows it processed.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from benchmarks import datasets
+
+
+def _quiet(_message: str) -> None:
+    pass
+
+
+@dataclass
+class CaseContext:
+    rows: int
+    data_dir: Path
+    work_dir: Path
+
+    def __post_init__(self) -> None:
+        self._counter = itertools.count()
+
+    def input(self, kind: str) -> str:
+        return str(datasets.dataset_path(self.data_dir, self.rows, kind))
+
+    def output(self, suffix: str) -> str:
+        """Return a fresh output path so repeated runs never append to earlier results."""
+        return str(self.work_dir / f"out_{next(self._counter)}{suffix}")
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Callable[[CaseContext], Callable[[], int]]
+    max_rows: int | None
+
+
+CASES: dict[str, Case] = {}
+
+
+def case(name: str, *, max_rows: int | None = None):
+    """Register a benchmark case. ``max_rows`` skips sizes that would not fit in memory.
+
+    Setup may raise ``ImportError`` or ``RuntimeError`` when an optional dependency is
+    missing; the runner records the case as skipped.
+    """
+
+    def decorator(setup: Callable[[CaseContext], Callable[[], int]]):
+        CASES[name] = Case(name, setup, max_rows)
+        return setup
+
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# Basic I/O
+
+
+@case("io.load_csv", max_rows=datasets.SIZES["1M"])
+def _load_csv(ctx: CaseContext):
+    from VBump.Basic import load_csv
+
+    path = ctx.input("csv")
+    return lambda: len(load_csv(path, log_callback=_quiet))
+
+
+@case("io.to_csv", max_rows=datasets.SIZES["1M"])
+def _to_csv(ctx: CaseContext):
+    from VBump.Basic import to_csv
+
+    bumps = datasets.make_vbumps(ctx.rows)
+
+    def run() -> int:
+        to_csv(ctx.output(".csv"), bumps, log_callback=_quiet)
+        return len(bumps)
+
+    return run
+
+
+@case("io.merge_csv")
+def _merge_csv(ctx: CaseContext):
+    from VBump.FileManip import merge
+
+    path = ctx.input("csv")
+    return lambda: merge([path] * 4, ctx.output(".h5"), log_callback=_quiet).rows
+
+
+@case("io.hdf5_to_csv")
+def _hdf5_to_csv(ctx: CaseContext):
+    from VBump.Basic import hdf5_to_csv
+
+    path = ctx.input("h5")
+    return lambda: hdf5_to_csv(path, ctx.output(".csv"))
+
+
+@case("io.to_hdf5", max_rows=datasets.SIZES["1M"])
+def _to_hdf5(ctx: CaseContext):
+    from VBump.Basic import to_hdf5
+
+    bumps = datasets.make_vbumps(ctx.rows)
+
+    def run() -> int:
+        to_hdf5(ctx.output(".h5"), bumps, progress=False, log_callback=_quiet)
+        return len(bumps)
+
+    return run
+
+
+@case("io.load_hdf5", max_rows=datasets.SIZES["1M"])
+def _load_hdf5(ctx: CaseContext):
+    from VBump.Basic import load_hdf5
+
+    path = ctx.input("h5")
+    return lambda: len(load_hdf5(path, only_bounding_boxes=False, log_callback=_quiet))
+
+
+@case("io.load_hdf5_markers")
+def _load_hdf5_markers(ctx: CaseContext):
+    from VBump.Basic import load_hdf5
+
+    path = ctx.input("h5")
+
+    def run() -> int:
+        return load_hdf5(path, only_bounding_boxes=True, log_callback=_quiet).source_count
+
+    return run
+
+
+@case("io.vbump_native_write")
+def _vbump_native_write(ctx: CaseContext):
+    from VBump.VBumpFile import hdf5_to_vbump
+
+    path = ctx.input("h5")
+    return lambda: hdf5_to_vbump(path, ctx.output(".vbump"))
+
+
+@case("io.vbump_native_read")
+def _vbump_native_read(ctx: CaseContext):
+    from VBump.VBumpFile import VBumpFile, hdf5_to_vbump
+
+    path = ctx.output(".vbump")
+    hdf5_to_vbump(ctx.input("h5"), path)
+
+    def run() -> int:
+        checksum = 0.0
+        with VBumpFile(path) as source:
+            for name in ("x0", "y0", "z1", "D"):
+                checksum += float(source.column(name).sum())
+            return source.rows
+
+    return run
+
+
+@case("io.parquet_write")
+def _parquet_write(ctx: CaseContext):
+    from VBump.ArrowIO import hdf5_to_parquet
+
+    path = ctx.input("h5")
+    return lambda: hdf5_to_parquet(path, ctx.output(".parquet"))
+
+
+@case("io.parquet_read")
+def _parquet_read(ctx: CaseContext):
+    from VBump.ArrowIO import arrow_to_hdf5, hdf5_to_parquet
+
+    path = ctx.output(".parquet")
+    hdf5_to_parquet(ctx.input("h5"), path)
+    return lambda: arrow_to_hdf5(path, ctx.output(".h5"), "scratch")
+
+
+# ---------------------------------------------------------------------------
+# HDF5 manipulation and proxy transforms
+
+
+@case("h5.modify_vbump_hdf5", max_rows=datasets.SIZES["1M"])
+def _modify_vbump_hdf5(ctx: CaseContext):
+    from VBump.H5Manip import make_move_func, modify_vbump_hdf5
+
+    path = ctx.input("h5")
+
+    def run() -> int:
+        modify_vbump_hdf5(path, ctx.output(".h5"), modify_func=make_move_func(1.0, 0.0, 0.0), log_callback=_quiet)
+        return ctx.rows
+
+    return run
+
+
+@case("h5.merge_hdf5", max_rows=datasets.SIZES["1M"])
+def _merge_hdf5(ctx: CaseContext):
+    from VBump.H5Manip import merge_hdf5
+
+    path = ctx.input("h5")
+
+    def run() -> int:
+        merge_hdf5([path, path], ctx.output(".h5"), log_callback=_quiet)
+        return 2 * ctx.rows
+
+    return run
+
+
+def _logic_with_proxy(ctx: CaseContext):
+    from ui.logic import VBumpLogic
+
+    logic = VBumpLogic(ctx.work_dir / "proxy", _quiet)
+    logic.proxy_h5_path = ctx.input("h5")
+    return logic
+
+
+@case("logic.transform_proxy", max_rows=datasets.SIZES["1M"])
+def _transform_proxy(ctx: CaseContext):
+    logic = _logic_with_proxy(ctx)
+
+    def transform(record: dict) -> list[dict]:
+        record["D"] = 0.03
+        return [record]
+
+    def run() -> int:
+        _path, written = logic.transform_proxy(transform, "bench_transform")
+        return written
+
+    return run
+
+
+@case("logic.merge_proxy_paths", max_rows=datasets.SIZES["1M"])
+def _merge_proxy_paths(ctx: CaseContext):
+    logic = _logic_with_proxy(ctx)
+    path = ctx.input("h5")
+
+    def run() -> int:
+        logic.merge_proxy_paths([path, path])
+        return 2 * ctx.rows
+
+    return run
+
+
+@case("logic.reassign_group")
+def _reassign_group(ctx: CaseContext):
+    logic = _logic_with_proxy(ctx)
+
+    def run() -> int:
+        logic.copy_proxy_with_single_group(logic.proxy_h5_path, 9)
+        return ctx.rows
+
+    return run
+
+
+@case("logic.duplicate_groups")
+def _duplicate_groups(ctx: CaseContext):
+    logic = _logic_with_proxy(ctx)
+    source = logic.proxy_h5_path
+
+    def run() -> int:
+        logic.proxy_h5_path = source
+        return logic.move_copy((1.0, 0.0, 0.0), keep_original=True)
+
+    return run
+
+
+@case("logic.move_copy_mmap", max_rows=datasets.SIZES["1M"])
+def _move_copy_mmap(ctx: CaseContext):
+    """Move and duplicate on a memory-mapped "scratch" proxy, whose chunks are read-only views."""
+    import h5py
+
+    from VBump.H5Layout import open_vbump
+    from VBump.Storage import copy_vbump_file
+
+    logic = _logic_with_proxy(ctx)
+    source = logic.next_proxy_path("scratch")
+    copy_vbump_file(ctx.input("h5"), source, "scratch")
+    with h5py.File(source, "r") as handle:
+        if open_vbump(handle).memmap() is None:
+            raise RuntimeError("scratch proxy is not memory-mapped (VBUMP_MMAP=0?)")
+
+    def run() -> int:
+        logic.proxy_h5_path = source
+        moved = logic.move_copy((1.0, 0.0, 0.0))
+        logic.proxy_h5_path = source
+        copied = logic.move_copy((0.0, 1.0, 0.0), keep_original=True)
+        if (moved, copied) != (ctx.rows, 2 * ctx.rows):
+            raise AssertionError(f"move_copy wrote {moved:,} / {copied:,} rows from {ctx.rows:,}")
+        return moved + copied
+
+    return run
+
+
+@case("logic.layer_edits")
+def _layer_edits(ctx: CaseContext):
+    logic = _logic_with_proxy(ctx)
+    source = logic.proxy_h5_path
+
+    def run() -> int:
+        logic.proxy_h5_path = source
+        groups = sorted(logic.get_existing_groups())
+        logic.modify_diameter(0.03, groups[0])
+        logic.delete_group(groups[-1])
+        logic.undo()
+        logic.redo()
+        return ctx.rows
+
+    return run
+
+
+@case("logic.load_csv_cached", max_rows=datasets.SIZES["1M"])
+def _load_csv_cached(ctx: CaseContext):
+    from ui.logic import VBumpLogic
+    from VBump.ImportCache import ImportCache
+
+    path = ctx.input("csv")
+    logic = VBumpLogic(ctx.work_dir / "proxy", _quiet)
+    logic.import_cache = ImportCache(ctx.work_dir / "import_cache")
+    logic.build_proxy_from_csv(path)
+
+    def run() -> int:
+        logic._discard_proxy(logic.build_proxy_from_csv(path))
+        return ctx.rows
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Grid generators
+
+
+def _grid_counts(rows: int) -> tuple[int, int]:
+    nx, ny = datasets._grid_shape(rows)
+    return nx, max(1, rows // nx)
+
+
+@case("grid.pitch_to_hdf5")
+def _grid_pitch_to_hdf5(ctx: CaseContext):
+    from VBump.CreateRectangularArea import create_rectangular_area_XY_by_pitch_to_hdf5
+
+    nx, ny = _grid_counts(ctx.rows)
+    p1 = ((nx - 1) * datasets.PITCH, (ny - 1) * datasets.PITCH)
+
+    def run() -> int:
+        return create_rectangular_area_XY_by_pitch_to_hdf5(
+            ctx.output(".h5"), (0.0, 0.0), p1, datasets.PITCH, datasets.PITCH,
+            datasets.DIAMETER, 1, 0.0, datasets.HEIGHT,
+            progress=False, log_callback=_quiet,
+        )
+
+    return run
+
+
+@case("grid.by_number", max_rows=datasets.SIZES["1M"])
+def _grid_by_number(ctx: CaseContext):
+    from VBump.CreateRectangularArea import create_rectangular_area_XY_by_number
+
+    nx, ny = _grid_counts(ctx.rows)
+    p1 = ((nx - 1) * datasets.PITCH, (ny - 1) * datasets.PITCH)
+
+    def run() -> int:
+        return len(create_rectangular_area_XY_by_number(
+            (0.0, 0.0), p1, nx, ny, datasets.DIAMETER, 1, 0.0, datasets.HEIGHT, log_callback=_quiet,
+        ))
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+
+
+@case("export.wdl_weldline", max_rows=datasets.SIZES["1M"])
+def _wdl_weldline(ctx: CaseContext):
+    from VBump.ExportWDL import vbump_2_wdl_as_weldline
+
+    bumps = datasets.make_vbumps(ctx.rows)
+
+    def run() -> int:
+        vbump_2_wdl_as_weldline(ctx.output(".wdl"), bumps, log_callback=_quiet)
+        return len(bumps)
+
+    return run
+
+
+@case("export.wdl_weldline_aabb", max_rows=datasets.SIZES["1M"])
+def _wdl_weldline_aabb(ctx: CaseContext):
+    from VBump.ExportWDL import vbump_2_wdl_as_weldline_AABB
+
+    bumps = datasets.make_vbumps(ctx.rows)
+
+    def run() -> int:
+        vbump_2_wdl_as_weldline_AABB(ctx.output(".wdl"), bumps, log_callback=_quiet)
+        return len(bumps)
+
+    return run
+
+
+@case("export.wdl_airtrap", max_rows=datasets.SIZES["1M"])
+def _wdl_airtrap(ctx: CaseContext):
+    from VBump.ExportWDL import vbump_2_wdl_as_airtrap
+
+    bumps = datasets.make_vbumps(ctx.rows)
+
+    def run() -> int:
+        vbump_2_wdl_as_airtrap(ctx.output(".wdl"), bumps, log_callback=_quiet)
+        return len(bumps)
+
+    return run
+
+
+@case("export.vtp", max_rows=datasets.SIZES["1M"])
+def _vtp(ctx: CaseContext):
+    from VBump.ExportVTP import write_vbumps_vtp
+
+    bumps = datasets.make_vbumps(ctx.rows)
+
+    def run() -> int:
+        write_vbumps_vtp(bumps, ctx.output(".vtp"))
+        return len(bumps)
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Storage profiles (codec and chunk shape only; compare output_bytes as well as time)
+
+
+def _register_storage_cases(profile_name: str) -> None:
+    @case(f"storage.write.{profile_name}")
+    def _write(ctx: CaseContext):
+        from VBump.Basic import _require_h5py
+        from VBump.H5Layout import create_vbump
+        from VBump.Storage import get_profile
+
+        h5py = _require_h5py()
+        profile = get_profile(profile_name)
+        profile.dataset_kwargs(ctx.rows)  # fails fast when hdf5plugin is missing
+        arr = datasets.make_structured(ctx.rows)
+
+        def run() -> int:
+            with h5py.File(ctx.output(".h5"), "w") as handle:
+                writer = create_vbump(handle, arr.dtype, profile, total=ctx.rows)
+                for start in range(0, ctx.rows, 1_000_000):
+                    writer.write(start, arr[start:start + 1_000_000])
+                writer.finish()
+            return ctx.rows
+
+        return run
+
+    @case(f"storage.read.{profile_name}")
+    def _read(ctx: CaseContext):
+        from VBump.Basic import _require_h5py
+        from VBump.H5Layout import open_vbump
+        from VBump.Storage import copy_vbump_file
+
+        h5py = _require_h5py()
+        path = ctx.output(".h5")
+        copy_vbump_file(ctx.input("h5"), path, profile_name)
+
+        def run() -> int:
+            rows = 0
+            checksum = 0.0
+            with h5py.File(path, "r") as handle:
+                for _start, _end, arr in open_vbump(handle).iter_chunks(1_000_000):
+                    # Touch the data so memory-mapped reads pay for their page faults.
+                    checksum += float(arr["x0"].sum()) + float(arr["z1"].sum())
+                    rows += len(arr)
+            return rows
+
+        return run
+
+    @case(f"storage.scan_group.{profile_name}")
+    def _scan_group(ctx: CaseContext):
+        """Column scan (``get_existing_groups`` without a ``groups`` hierarchy)."""
+        from VBump.Basic import _require_h5py
+        from VBump.H5Layout import open_vbump
+        from VBump.Storage import copy_vbump_file
+
+        h5py = _require_h5py()
+        path = ctx.output(".h5")
+        copy_vbump_file(ctx.input("h5"), path, profile_name)
+
+        def run() -> int:
+            groups: set[int] = set()
+            with h5py.File(path, "r") as handle:
+                reader = open_vbump(handle)
+                for start in range(0, reader.rows, 1_000_000):
+                    groups.update(reader.read_column("group", start, start + 1_000_000).tolist())
+                return reader.rows
+
+        return run
+
+
+for _profile_name in (
+    "scratch", "fast", "archive", "zstd", "blosc", "columnar", "zstd+columnar", "compact", "archive+float32",
+    "vertical", "vertical+fixed",
+):
+    _register_storage_cases(_profile_name)
+
+
+# ---------------------------------------------------------------------------
+# Importers
+
+
+@case("dxf.import_file", max_rows=datasets.SIZES["1M"])
+def _dxf_import(ctx: CaseContext):
+    from VBump.DXFImport import DXFVBumpImporter, _ensure_dxfextractor_available
+
+    _ensure_dxfextractor_available()
+    import dxf_extract  # noqa: F401  (fail fast when the submodule is missing)
+
+    path = ctx.input("dxf")
+
+    def run() -> int:
+        # A fresh importer per run so the extraction cache does not hide the parse cost.
+        importer = DXFVBumpImporter(unit_scale=0.001, log_callback=_quiet)
+        vbumps, _report = importer.import_file(path, group=1, height=datasets.HEIGHT)
+        return len(vbumps)
+
+    return run
@@ -0,0 +1,68 @@
+"""Compare two benchmark result files produced by ``benchmarks.run``.
+
+Exits with status 1 when any (case, size) pair is slower or uses more peak memory than
+the baseline by more than the threshold::
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _load(path: str) -> dict[tuple[str, int], dict]:
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {(r["case"], int(r["rows"])): r for r in payload.get("results", []) if r.get("status") == "ok"}
+
+
+def _ratio(new: float | None, old: float | None) -> float | None:
+    if new is None or old is None or old <= 0:
+        return None
+    return new / old - 1.0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown as a fraction (default 0.10).")
+    parser.add_argument("--memory-threshold", type=float, default=0.20, help="Allowed peak RSS growth (default 0.20).")
+    args = parser.parse_args(argv)
+
+    from benchmarks.datasets import size_label
+
+    old, new = _load(args.baseline), _load(args.current)
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        time_delta = _ratio(new[key].get("median_s"), old[key].get("median_s"))
+        rss_delta = _ratio(new[key].get("peak_rss_mb"), old[key].get("peak_rss_mb"))
+        flags = []
+        if time_delta is not None and time_delta > args.threshold:
+            flags.append("SLOWER")
+        if rss_delta is not None and rss_delta > args.memory_threshold:
+            flags.append("MORE MEMORY")
+        regressions += bool(flags)
+        time_text = f"{time_delta:+7.1%}" if time_delta is not None else "    n/a"
+        rss_text = f"{rss_delta:+7.1%}" if rss_delta is not None else "    n/a"
+        print(
+            f"{key[0]:<28} {size_label(key[1]):>5}  "
+            f"{old[key]['median_s']:9.3f} s -> {new[key]['median_s']:9.3f} s ({time_text})  "
+            f"rss {rss_text}  {' '.join(flags)}"
+        )
+    for key in sorted(old.keys() - new.keys()):
+        print(f"{key[0]:<28} {size_label(key[1]):>5}  missing from {args.current}")
+    for key in sorted(new.keys() - old.keys()):
+        print(f"{key[0]:<28} {size_label(key[1]):>5}  new")
+
+    if regressions:
+        print(f"{regressions} regression(s) above threshold.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
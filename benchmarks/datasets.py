@@ -0,0 +1,159 @@
+"""Synthetic vbump datasets shared by the benchmark cases.
+
+Datasets are deterministic square grids (two groups, vertical bumps) so results are
+comparable across commits. Files are generated once per size and cached in the data
+directory passed to :func:`dataset_path`.
+"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+from VBump.Basic import VBump
+
+SIZES: dict[str, int] = {
+    "10k": 10_000,
+    "1M": 1_000_000,
+    "10M": 10_000_000,
+}
+
+PITCH = 0.05
+DIAMETER = 0.02
+HEIGHT = 0.1
+H5_FORMAT = 2
+
+
+def parse_size(label: str) -> int:
+    if label in SIZES:
+        return SIZES[label]
+    return int(label.replace("_", ""))
+
+
+def size_label(rows: int) -> str:
+    for label, value in SIZES.items():
+        if value == rows:
+            return label
+    return str(rows)
+
+
+def _grid_shape(rows: int) -> tuple[int, int]:
+    nx = max(1, int(math.sqrt(rows)))
+    ny = max(1, math.ceil(rows / nx))
+    return nx, ny
+
+
+def iter_vbumps(rows: int):
+    """Yield ``rows`` vertical bumps on a regular grid; the upper half is group 2."""
+    nx, ny = _grid_shape(rows)
+    emitted = 0
+    for ix in range(nx):
+        x = ix * PITCH
+        group = 1 if ix < nx // 2 else 2
+        for iy in range(ny):
+            if emitted == rows:
+                return
+            y = iy * PITCH
+            yield VBump(x, y, 0.0, x, y, HEIGHT, DIAMETER, group)
+            emitted += 1
+
+
+def make_vbumps(rows: int) -> list[VBump]:
+    return list(iter_vbumps(rows))
+
+
+def make_structured(rows: int):
+    """Return the dataset as a NumPy structured array with the ``vbump`` dtype."""
+    import numpy as np
+
+    nx, ny = _grid_shape(rows)
+    idx = np.arange(rows)
+    ix, iy = idx // ny, idx % ny
+    arr = np.empty(rows, dtype=vbump_dtype())
+    arr["x0"] = arr["x1"] = ix * PITCH
+    arr["y0"] = arr["y1"] = iy * PITCH
+    arr["z0"] = 0.0
+    arr["z1"] = HEIGHT
+    arr["D"] = DIAMETER
+    arr["group"] = np.where(ix < nx // 2, 1, 2)
+    return arr
+
+
+def vbump_dtype():
+    import numpy as np
+
+    return np.dtype([
+        ("x0", np.float64),
+        ("y0", np.float64),
+        ("z0", np.float64),
+        ("x1", np.float64),
+        ("y1", np.float64),
+        ("z1", np.float64),
+        ("D", np.float64),
+        ("group", np.int32),
+    ])
+
+
+def dataset_path(data_dir: Path, rows: int, kind: str) -> Path:
+    """Return a cached input file of ``kind`` ('h5', 'csv' or 'dxf'), generating it on first use."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    # HDF5 inputs carry the metadata writers record; bump H5_FORMAT when that changes.
+    suffix = f"_f{H5_FORMAT}" if kind == "h5" else ""
+    path = data_dir / f"vbump_{size_label(rows)}{suffix}.{kind}"
+    if path.exists():
+        return path
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    if kind == "h5":
+        _write_h5(tmp, rows)
+    elif kind == "csv":
+        _write_csv(tmp, rows)
+    elif kind == "dxf":
+        write_dxf(tmp, rows)
+    else:
+        raise ValueError(f"Unknown dataset kind '{kind}'.")
+    tmp.replace(path)
+    return path
+
+
+def _write_h5(path: Path, rows: int, chunk_rows: int = 1_000_000) -> None:
+    import h5py
+
+    from VBump.H5Layout import BBoxAccumulator
+
+    arr = make_structured(rows)
+    with h5py.File(path, "w") as handle:
+        dset = handle.create_dataset(
+            "vbump", data=arr, maxshape=(None,), chunks=(min(chunk_rows, max(rows, 1)),), compression="gzip"
+        )
+        bboxes = BBoxAccumulator()
+        bboxes.add(arr)
+        bboxes.write_attrs(handle, dset.attrs)
+
+
+def _write_csv(path: Path, rows: int, chunk_rows: int = 1_000_000) -> None:
+    import numpy as np
+
+    arr = make_structured(rows)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("# Virtual Bump Configuration file. Unit:mm\n")
+        f.write("# x0, y0, z0, x1, y1, z1, diameter, group\n")
+        for start in range(0, rows, chunk_rows):
+            chunk = arr[start:start + chunk_rows]
+            np.savetxt(
+                f,
+                np.column_stack([chunk[name] for name in ("x0", "y0", "z0", "x1", "y1", "z1", "D")] + [chunk["group"]]),
+                fmt=["%.6g"] * 7 + ["%d"],
+                delimiter=",",
+            )
+
+
+def write_dxf(path: Path, rows: int) -> Path:
+    """Write ``rows`` circles (in micrometres) to a DXF file for the importer benchmark."""
+    import ezdxf
+
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    for bump in iter_vbumps(rows):
+        msp.add_circle((bump.x0 * 1000.0, bump.y0 * 1000.0), radius=DIAMETER * 500.0, dxfattribs={"layer": "BUMP"})
+    doc.saveas(path)
+    return path
@@ -0,0 +1,135 @@
+"""Import-time budget check based on ``python -X importtime``.
+
+Each target module is imported in a fresh interpreter. The check fails when the
+cumulative import time exceeds the module's budget or when a heavy dependency that
+should load lazily (h5py, numpy, matplotlib, PySide6, ezdxf) shows up::
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 7 --json import_time.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+@dataclass(frozen=True)
+class ImportBudget:
+    module: str
+    max_ms: float
+    forbidden: tuple[str, ...] = ()
+
+
+@dataclass
+class ImportMeasurement:
+    module: str
+    median_ms: float
+    samples_ms: list[float]
+    budget_ms: float
+    heavy_modules: list[str] = field(default_factory=list)
+    top: list[tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.median_ms <= self.budget_ms and not self.heavy_modules
+
+
+HEAVY = ("h5py", "numpy", "matplotlib", "PySide6", "ezdxf")
+
+# Headless conversion starts with ``main`` and pulls in ``ui.logic`` when the first job
+# runs; neither may touch the heavy dependencies until an operation actually needs them.
+BUDGETS: tuple[ImportBudget, ...] = (
+    ImportBudget("main", 150.0, HEAVY),
+    ImportBudget("ui.logic", 200.0, HEAVY),
+    ImportBudget("VBump.VBumpPlot", 150.0, ("matplotlib",)),
+    ImportBudget("VBump.DXFImport", 150.0, ("ezdxf", "dxf_extract", "numpy")),
+)
+
+
+def _run_importtime(module: str) -> tuple[float, dict[str, float]]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative: dict[str, float] = {}
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cum_us = int(match.group(2))
+        name = match.group(4)
+        cumulative[name] = cum_us / 1000.0
+        if len(match.group(3)) <= 1:
+            # Top-level entries (one space of indentation) add up to the import cost.
+            total_us += cum_us
+    return total_us / 1000.0, cumulative
+
+
+def measure(budget: ImportBudget, repeat: int = 5) -> ImportMeasurement:
+    samples: list[float] = []
+    modules: dict[str, float] = {}
+    for _ in range(max(1, repeat)):
+        total_ms, modules = _run_importtime(budget.module)
+        samples.append(total_ms)
+    heavy = sorted(
+        name for name in modules
+        if any(name == root or name.startswith(root + ".") for root in budget.forbidden)
+    )
+    top = sorted(
+        ((name, ms) for name, ms in modules.items() if "." not in name and name != budget.module),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:5]
+    return ImportMeasurement(
+        module=budget.module,
+        median_ms=statistics.median(samples),
+        samples_ms=samples,
+        budget_ms=budget.max_ms,
+        heavy_modules=sorted({name.split(".")[0] for name in heavy}),
+        top=top,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (median is reported).")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write machine-readable results to this file.")
+    parser.add_argument("modules", nargs="*", help="Restrict the check to these modules.")
+    args = parser.parse_args(argv)
+
+    budgets = [b for b in BUDGETS if not args.modules or b.module in args.modules]
+    results = [measure(budget, args.repeat) for budget in budgets]
+    for r in results:
+        status = "ok" if r.ok else "OVER BUDGET"
+        print(f"{r.module:<20} {r.median_ms:8.1f} ms (budget {r.budget_ms:.0f} ms)  {status}")
+        if r.heavy_modules:
+            print(f"    eagerly imported: {', '.join(r.heavy_modules)}")
+        for name, ms in r.top:
+            print(f"    {name:<28} {ms:8.1f} ms")
+
+    if args.json_path:
+        payload = [dict(asdict(r), ok=r.ok) for r in results]
+        Path(args.json_path).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""Run the benchmark suite and write machine-readable results.
+
+Every (case, size) pair runs in a fresh interpreter so peak RSS is attributable to
+that case alone::
+
+    python -m benchmarks.run                              # 10k and 1M, all cases
+    python -m benchmarks.run --sizes 10M --cases 'grid.*' 'io.load_hdf5_markers'
+    python -m benchmarks.run --output bench/$(git rev-parse --short HEAD).json
+    python -m benchmarks.compare bench/old.json bench/new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DATA_DIR = REPO_ROOT / ".bench_data"
+SCHEMA_VERSION = 1
+
+
+# ---------------------------------------------------------------------------
+# Memory probes
+
+
+def _read_status_kb(field: str) -> int | None:
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's high-water mark (Linux >= 4.0) so the peak covers only the timed runs."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float | None:
+    hwm = _read_status_kb("VmHWM")
+    if hwm is not None:
+        return hwm / 1024.0
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+# ---------------------------------------------------------------------------
+# Worker: one case, one size, in this process
+
+
+def run_case(name: str, rows: int, repeat: int, data_dir: Path) -> dict:
+    from benchmarks.cases import CASES, CaseContext
+
+    record: dict = {"case": name, "rows": rows, "status": "ok"}
+    work_dir = Path(tempfile.mkdtemp(prefix="vbump_bench_"))
+    try:
+        ctx = CaseContext(rows=rows, data_dir=data_dir, work_dir=work_dir)
+        try:
+            fn = CASES[name].setup(ctx)
+        except (ImportError, RuntimeError) as exc:
+            record.update(status="skipped", reason=f"{type(exc).__name__}: {exc}")
+            return record
+
+        baseline = _read_status_kb("VmRSS")
+        reset = _reset_peak_rss()
+        times: list[float] = []
+        processed = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            processed = fn()
+            times.append(time.perf_counter() - started)
+        median = statistics.median(times)
+        record.update(
+            processed_rows=int(processed),
+            times_s=times,
+            median_s=median,
+            min_s=min(times),
+            rows_per_s=(processed / median) if median > 0 else None,
+            peak_rss_mb=_peak_rss_mb(),
+            baseline_rss_mb=(baseline / 1024.0) if baseline is not None else None,
+            peak_rss_isolated=reset,
+            output_bytes=sum(p.stat().st_size for p in work_dir.rglob("*") if p.is_file()) // max(1, repeat),
+        )
+    except Exception as exc:
+        record.update(status="error", reason=f"{type(exc).__name__}: {exc}", traceback=traceback.format_exc())
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return record
+
+
+def _spawn_case(name: str, rows: int, repeat: int, data_dir: Path, timeout: float | None) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    cmd = [
+        sys.executable, "-m", "benchmarks.run", "--worker", name, str(rows),
+        "--repeat", str(repeat), "--data-dir", str(data_dir),
+    ]
+    try:
+        proc = subprocess.run(cmd, cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"case": name, "rows": rows, "status": "error", "reason": f"timeout after {timeout:.0f}s"}
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    return {
+        "case": name,
+        "rows": rows,
+        "status": "error",
+        "reason": f"worker exited with {proc.returncode}",
+        "stderr": proc.stderr[-4000:],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Driver
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _versions() -> dict[str, str | None]:
+    from importlib import metadata
+
+    versions: dict[str, str | None] = {}
+    for dist in ("numpy", "h5py", "ezdxf", "matplotlib", "PySide6"):
+        try:
+            versions[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            versions[dist] = None
+    return versions
+
+
+def _format_row(record: dict) -> str:
+    from benchmarks.datasets import size_label
+
+    head = f"{record['case']:<28} {size_label(record['rows']):>5}"
+    if record["status"] != "ok":
+        return f"{head}  {record['status']}: {record.get('reason', '')}"
+    rate = record.get("rows_per_s") or 0.0
+    rss = record.get("peak_rss_mb")
+    rss_text = f"{rss:8.1f} MB" if rss is not None else "       n/a"
+    return f"{head}  {record['median_s']:9.3f} s  {rate:14,.0f} rows/s  peak {rss_text}"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the VBump benchmark suite.")
+    parser.add_argument("--cases", nargs="*", default=["*"], help="Case name patterns (fnmatch).")
+    parser.add_argument("--sizes", default="10k,1M", help="Comma separated sizes: 10k, 1M, 10M or row counts.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (median is reported).")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Cache directory for synthetic inputs.")
+    parser.add_argument("--output", default=None, help="Write results JSON to this path.")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-case timeout in seconds.")
+    parser.add_argument("--force", action="store_true", help="Ignore per-case max_rows limits.")
+    parser.add_argument("--in-process", action="store_true", help="Run cases in this interpreter (RSS is shared).")
+    parser.add_argument("--import-time", action="store_true", help="Include the import-time budget check.")
+    parser.add_argument("--list", action="store_true", help="List cases and exit.")
+    parser.add_argument("--worker", nargs=2, metavar=("CASE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    data_dir = Path(args.data_dir)
+    if args.worker:
+        name, rows = args.worker
+        print(json.dumps(run_case(name, int(rows), args.repeat, data_dir)))
+        return 0
+
+    from benchmarks.cases import CASES
+    from benchmarks.datasets import parse_size
+
+    selected = [name for name in CASES if any(fnmatch.fnmatch(name, pat) for pat in args.cases)]
+    if args.list:
+        for name in CASES:
+            limit = CASES[name].max_rows
+            print(f"{name:<28} max_rows={limit if limit else '-'}")
+        return 0
+    if not selected:
+        print("No cases match.", file=sys.stderr)
+        return 2
+    sizes = [parse_size(label.strip()) for label in args.sizes.split(",") if label.strip()]
+
+    results: list[dict] = []
+    for rows in sizes:
+        for name in selected:
+            limit = CASES[name].max_rows
+            if limit is not None and rows > limit and not args.force:
+                record = {"case": name, "rows": rows, "status": "skipped", "reason": f"above max_rows={limit:,} (use --force)"}
+            elif args.in_process:
+                record = run_case(name, rows, args.repeat, data_dir)
+            else:
+                record = _spawn_case(name, rows, args.repeat, data_dir, args.timeout)
+            results.append(record)
+            print(_format_row(record), flush=True)
+
+    payload = {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "versions": _versions(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.import_time:
+        from dataclasses import asdict
+
+        from benchmarks import import_time
+
+        payload["import_time"] = [
+            dict(asdict(m), ok=m.ok) for m in (import_time.measure(b) for b in import_time.BUDGETS)
+        ]
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+    return 1 if any(r["status"] == "error" for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+"""Headless batch CLI for the Py Bump generator.
+
+Runs the same proxy pipelines as the GUI (``ui.logic.VBumpLogic``) from declarative job
+files, without importing Qt or matplotlib. A job file is JSON or YAML and holds either a
+single job or ``{"jobs": [...]}``::
+
+    jobs:
+      - name: panel_a
+        steps:
+          - load: {path: bumps.csv, new_group: 3}
+          - grid: {mode: pitch, p0: [0, 0], p1: [10, 10], x_pitch: 0.5, y_pitch: 0.5,
+                   diameter: 0.1, group: 1, z: 0, height: 0.2}
+          - move: {delta: [20, 0, 0], keep_original: true}
+          - modify_diameter: {value: 0.12, group: 1}
+          - undo: {}                                          # redo: {} steps forward again
+          - export: {format: wdl_weldline, path: out/panel_a.wdl}  # csv, h5, vbump, parquet, feather, wdl_*, vtp
+
+Relative paths resolve against the job file's directory. Independent jobs run in
+parallel worker processes with ``--jobs N``. ``--timings`` prints a per-step timing
+summary and ``--trace-dir`` writes a Chrome trace and a JSON-lines event log per job.
+``--profile-dir`` saves a cProfile report for every operation of every job.
+Each job keeps its proxies in its own session under ``--proxy-dir`` (``tmpfs`` for a
+RAM-backed directory); sessions of crashed runs are removed when the next job starts and
+``--proxy-budget`` caps a job's proxy bytes (see ``VBump.ProxyStore``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+EXPORT_FORMATS = ("csv", "h5", "vbump", "parquet", "feather", "wdl_weldline", "wdl_airtrap", "vtp")
+
+
+@dataclass
+class JobSpec:
+    name: str
+    steps: list[tuple[str, dict[str, Any]]]
+    base_dir: str
+    source: str
+
+
+@dataclass
+class JobResult:
+    name: str
+    ok: bool
+    rows: int = 0
+    seconds: float = 0.0
+    outputs: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+# ---------------------------------------------------------------------------
+# Job file parsing
+
+
+def _require_yaml():
+    try:
+        import yaml  # type: ignore
+    except ImportError as exc:
+        raise RuntimeError("PyYAML is required for YAML job files. Install it via 'pip install pyyaml'.") from exc
+    return yaml
+
+
+def _normalize_step(raw: Any, index: int) -> tuple[str, dict[str, Any]]:
+    if isinstance(raw, dict) and "op" in raw:
+        params = {key: value for key, value in raw.items() if key != "op"}
+        op = str(raw["op"])
+    elif isinstance(raw, dict) and len(raw) == 1:
+        op, params = next(iter(raw.items()))
+        params = params or {}
+    else:
+        raise ValueError(f"Step {index + 1}: expected a single-key mapping such as {{'load': {{...}}}}.")
+    if op not in STEP_HANDLERS:
+        raise ValueError(f"Step {index + 1}: unknown operation '{op}'. Expected one of {', '.join(sorted(STEP_HANDLERS))}.")
+    if not isinstance(params, dict):
+        raise ValueError(f"Step {index + 1} ({op}): parameters must be a mapping.")
+    return op, params
+
+
+def load_job_file(path: str | Path) -> list[JobSpec]:
+    """Parse a JSON/YAML job file into validated job specs."""
+    path = Path(path).resolve()
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        document = _require_yaml().safe_load(text)
+    else:
+        document = json.loads(text)
+
+    raw_jobs = document.get("jobs") if isinstance(document, dict) and "jobs" in document else [document]
+    if not isinstance(raw_jobs, list):
+        raise ValueError(f"{path}: 'jobs' must be a list.")
+
+    specs: list[JobSpec] = []
+    for idx, raw_job in enumerate(raw_jobs):
+        if not isinstance(raw_job, dict) or not isinstance(raw_job.get("steps"), list):
+            raise ValueError(f"{path}: job {idx + 1} must be a mapping with a 'steps' list.")
+        name = str(raw_job.get("name") or f"{path.stem}_{idx + 1}")
+        try:
+            steps = [_normalize_step(step, i) for i, step in enumerate(raw_job["steps"])]
+        except ValueError as exc:
+            raise ValueError(f"{path}: job '{name}': {exc}") from exc
+        specs.append(JobSpec(name=name, steps=steps, base_dir=str(path.parent), source=str(path)))
+    return specs
+
+
+# ---------------------------------------------------------------------------
+# Step handlers
+
+
+def _resolve(base_dir: str, value: str) -> str:
+    candidate = Path(value).expanduser()
+    if not candidate.is_absolute():
+        candidate = Path(base_dir) / candidate
+    return str(candidate.resolve())
+
+
+def _xyz(value: Any, name: str) -> tuple[float, float, float]:
+    values = tuple(float(v) for v in value)
+    if len(values) != 3:
+        raise ValueError(f"'{name}' must have three coordinates.")
+    return values  # type: ignore[return-value]
+
+
+def _xy(value: Any, name: str) -> tuple[float, float]:
+    values = tuple(float(v) for v in value)
+    if len(values) != 2:
+        raise ValueError(f"'{name}' must have two coordinates.")
+    return values  # type: ignore[return-value]
+
+
+def _step_load(logic, params: dict[str, Any], base_dir: str, outputs: list[str]) -> None:
+    new_group = params.get("new_group")
+    dxf_options = params.get("dxf")
+    groups = params.get("groups")
+    logic.load_file(
+        _resolve(base_dir, params["path"]),
+        new_group=int(new_group) if new_group is not None else None,
+        dxf_options=dict(dxf_options) if dxf_options else None,
+        groups=[int(g) for g in groups] if groups is not None else None,
+    )
+
+
+def _step_merge(logic, params: dict[str, Any], base_dir: str, outputs: list[str]) -> None:
+    new_group = params.get("new_group")
+    logic.load_files(
+        [_resolve(base_dir, path) for path in params["paths"]],
+        new_group=int(new_group) if new_group is not None else None,
+    )
+
+
+def _step_grid(logic, params: dict[str, Any], base_dir: str, outputs: list[str]) -> None:
+    mode = str(params.get("mode", "pitch"))
+    common = dict(
+        diameter=float(params["diameter"]),
+        group=int(params.get("group", 1)),
+        z=float(params.get("z", 0.0)),
+        height=float(params["height"]),
+    )
+    p0, p1 = _xy(params["p0"], "p0"), _xy(params["p1"], "p1")
+    if mode == "pitch":
+        logic.create_grid_by_pitch(p0, p1, float(params["x_pitch"]), float(params["y_pitch"]), **common)
+    elif mode == "count":
+        logic.create_grid_by_count(p0, p1, int(params["x_count"]), int(params["y_count"]), **common)
+    else:
+        raise ValueError(f"grid: unknown mode '{mode}' (expected 'pitch' or 'count').")
+
+
+def _step_move(logic, params: dict[str, Any], base_dir: str, outputs: list[str]) -> None:
+    if "delta" in params:
+        delta = _xyz(params["delta"], "delta")
+    else:
+        reference = _xyz(params.get("reference", (0.0, 0.0, 0.0)), "reference")
+        target = _xyz(params["target"], "target")
+        delta = tuple(t - r for t, r in zip(target, reference))
+    group = params.get("group")
+    new_group = params.get("new_group")
+    new_diameter = params.get("new_diameter")
+    logic.move_copy(
+        delta,
+        group=int(group) if group is not None else None,
+        keep_original=bool(params.get("keep_original", False)),
+        new_group=int(new_group) if new_group is not None else None,
+        new_diameter=float(new_diameter) if new_diameter is not None else None,
+    )
+
+
+def _step_modify_diameter(logic, params: dict[str, Any], base_dir: str, outputs: list[str]) -> None:
+    group = params.get("group")
+    logic.modify_diameter(float(params["value"]), int(group) if group is not None else None)
+
+
+def _step_modify_height(logic, params: dict[str, Any], base_dir: str, outputs: list[str]) -> None:
+    group = params.get("group")
+    logic.modify_height(float(params["value"]), int(group) if group is not None else None)
+
+
+def _step_delete_group(logic, params: dict[str, Any], base_dir: str, outputs: list[str]) -> None:
+    logic.delete_group(int(params["group"]))
+
+
+def _step_undo(logic, params: dict[str, Any], base_dir: str, outputs: list[str]) -> None:
+    for _ in range(int(params.get("steps", 1))):
+        if not logic.undo():
+            raise ValueError("undo: nothing left to undo.")
+
+
+def _step_redo(logic, params: dict[str, Any], base_dir: str, outputs: list[str]) -> None:
+    for _ in range(int(params.get("steps", 1))):
+        if not logic.redo():
+            raise ValueError("redo: nothing left to redo.")
+
+
+def _step_export(logic, params: dict[str, Any], base_dir: str, outputs: list[str]) -> None:
+    fmt = str(params["format"]).lower()
+    path = _resolve(base_dir, params["path"])
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        logic.save_csv(path, params.get("float_format"))
+    elif fmt == "h5":
+        logic.save_hdf5(path, params.get("storage"))
+    elif fmt == "vbump":
+        logic.save_vbump(path)
+    elif fmt in ("parquet", "feather"):
+        logic.save_arrow(path, fmt)
+    elif fmt == "wdl_weldline":
+        logic.export_weldline(path)
+    elif fmt == "wdl_airtrap":
+        logic.export_airtrap(path)
+    elif fmt == "vtp":
+        logic.export_vtp(path)
+    else:
+        raise ValueError(f"export: unknown format '{fmt}' (expected one of {', '.join(EXPORT_FORMATS)}).")
+    outputs.append(path)
+
+
+STEP_HANDLERS: dict[str, Callable[..., None]] = {
+    "load": _step_load,
+    "merge": _step_merge,
+    "grid": _step_grid,
+    "move": _step_move,
+    "modify_diameter": _step_modify_diameter,
+    "modify_height": _step_modify_height,
+    "delete_group": _step_delete_group,
+    "undo": _step_undo,
+    "redo": _step_redo,
+    "export": _step_export,
+}
+
+
+# ---------------------------------------------------------------------------
+# Execution
+
+
+def run_job(
+    spec: JobSpec,
+    proxy_root: str | None = None,
+    keep_proxies: bool = False,
+    quiet: bool = False,
+    *,
+    timings: bool = False,
+    trace_dir: str | None = None,
+    profile_dir: str | None = None,
+    proxy_storage: str | None = None,
+    proxy_budget: str | None = None,
+) -> JobResult:
+    """Execute one job in an isolated proxy session. Safe to call in a worker process."""
+    from VBump import Instrument
+    from VBump.ProxyStore import ProxyStore, parse_size
+    from VBump.Storage import get_profile
+    from ui.logic import VBumpLogic
+
+    def log(message: str) -> None:
+        if not quiet:
+            print(f"[{spec.name}] {message}", flush=True)
+
+    sinks: list[Instrument.Sink] = []
+    if timings:
+        sinks.append(Instrument.LogSink(lambda message: print(f"[{spec.name}] {message}", flush=True), max_depth=1))
+    if trace_dir:
+        Path(trace_dir).mkdir(parents=True, exist_ok=True)
+        sinks.append(Instrument.ChromeTraceSink(Path(trace_dir) / f"{spec.name}.trace.json"))
+        sinks.append(Instrument.JsonLinesSink(Path(trace_dir) / f"{spec.name}.events.jsonl"))
+
+    started = time.perf_counter()
+    store = ProxyStore.from_env(
+        Path(tempfile.gettempdir()) / "vbump-cli",
+        label=spec.name,
+        root=proxy_root,
+        budget=parse_size(proxy_budget),
+        log_callback=log,
+    )
+    result = JobResult(name=spec.name, ok=False)
+    logic = None
+    try:
+        with Instrument.installed(*sinks), Instrument.span(f"job:{spec.name}", source=spec.source):
+            logic = VBumpLogic(store.root, log, store=store)
+            if proxy_storage:
+                logic.storage = get_profile(proxy_storage)
+            if profile_dir:
+                logic.profiler.output_dir = Path(profile_dir) / spec.name
+                logic.profiler.mode = logic.profiler.mode or "cprofile"
+            for index, (op, params) in enumerate(spec.steps):
+                log(f"Step {index + 1}/{len(spec.steps)}: {op}")
+                with Instrument.span(op, step=index + 1):
+                    STEP_HANDLERS[op](logic, params, spec.base_dir, result.outputs)
+            result.rows = logic.current_source_count()
+        result.ok = True
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+        log(f"❌ {result.error}")
+        if not quiet:
+            traceback.print_exc()
+    finally:
+        if logic is not None:
+            logic.join_compaction()
+        result.seconds = time.perf_counter() - started
+        store.close(keep_files=keep_proxies)
+        if keep_proxies:
+            log(f"Proxies kept in {store.session_dir}")
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="v-bump-cli",
+        description="Run vbump proxy pipelines from JSON/YAML job files without the GUI.",
+    )
+    parser.add_argument("job_files", nargs="+", help="Job files (.json, .yaml, .yml).")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of jobs to run in parallel processes.")
+    parser.add_argument(
+        "--proxy-dir",
+        default=None,
+        help="Directory for temporary proxy files; 'tmpfs' for a RAM-backed one (default: system temp).",
+    )
+    parser.add_argument(
+        "--proxy-budget", default=None, help="Disk budget for each job's proxies, e.g. 20G; old undo states are evicted."
+    )
+    parser.add_argument("--keep-proxies", action="store_true", help="Keep each job's proxy directory after it finishes.")
+    parser.add_argument("--validate", action="store_true", help="Only parse and validate the job files.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the final summary.")
+    parser.add_argument("--timings", action="store_true", help="Print a timing summary for every step.")
+    parser.add_argument("--trace-dir", default=None, help="Write <job>.trace.json (Chrome trace) and <job>.events.jsonl here.")
+    parser.add_argument("--profile-dir", default=None, help="Save a cProfile report per operation under <dir>/<job>/.")
+    parser.add_argument(
+        "--proxy-storage",
+        default=None,
+        help="Storage profile for intermediate proxies: scratch (default), fast, archive, zstd, blosc.",
+    )
+    args = parser.parse_args(argv)
+    from VBump.Instrument import configure_from_env
+
+    configure_from_env()
+
+    specs: list[JobSpec] = []
+    try:
+        if args.proxy_storage:
+            from VBump.Storage import get_profile
+
+            get_profile(args.proxy_storage)
+        if args.proxy_budget:
+            from VBump.ProxyStore import parse_size
+
+            parse_size(args.proxy_budget)
+        for job_file in args.job_files:
+            specs.extend(load_job_file(job_file))
+    except (OSError, ValueError, RuntimeError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 2
+
+    names = [spec.name for spec in specs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        print(f"Error: duplicate job names: {', '.join(duplicates)}", file=sys.stderr)
+        return 2
+    if args.validate:
+        for spec in specs:
+            print(f"{spec.name}: {len(spec.steps)} steps ({spec.source})")
+        return 0
+    instrument = {
+        "timings": args.timings,
+        "trace_dir": args.trace_dir,
+        "profile_dir": args.profile_dir,
+        "proxy_storage": args.proxy_storage,
+        "proxy_budget": args.proxy_budget,
+    }
+    results: list[JobResult] = []
+    if args.jobs <= 1 or len(specs) == 1:
+        for spec in specs:
+            results.append(run_job(spec, args.proxy_dir, args.keep_proxies, args.quiet, **instrument))
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = [
+                pool.submit(run_job, spec, args.proxy_dir, args.keep_proxies, args.quiet, **instrument) for spec in specs
+            ]
+            for future in as_completed(futures):
+                results.append(future.result())
+
+    failed = [r for r in results if not r.ok]
+    for r in sorted(results, key=lambda r: names.index(r.name)):
+        status = "ok" if r.ok else f"FAILED ({r.error})"
+        print(f"{r.name}: {status} - {r.rows:,} rows in {r.seconds:.1f}s")
+        for out in r.outputs:
+            print(f"    -> {out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
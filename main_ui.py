@@ -7,9 +7,11 @@ import qdarktheme
 
 from ui.main_window import VBumpUI
 from ui.logic import VBumpLogic
+from VBump.Instrument import configure_from_env
 
 def main():
     app = QApplication(sys.argv)
+    configure_from_env()
     
     # Apply modern dark theme
     app.setStyleSheet(qdarktheme.load_stylesheet("dark"))
@@ -0,0 +1,106 @@
+"""Rate-limited log sink that feeds the Qt log view."""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer, Slot
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QTextEdit
+
+# "... 1000000/4000000 (25.0%)" from the HDF5 writers and the per-chunk lines of H5Manip.
+PROGRESS_LINE = re.compile(r"^(\.\.\. \d+/\d+ \(|Processed chunk )")
+
+
+class BufferedLogSink(QObject):
+    """Collect log messages from any thread and flush them to a ``QTextEdit`` on a timer.
+
+    ``write`` only appends to a locked buffer, so chunked operations never wait on the
+    widget. Every ``interval_ms`` the GUI thread drains the buffer in one batch: runs of
+    progress lines collapse into a single status line that is rewritten in place, and the
+    document is capped at ``max_blocks`` blocks.
+    """
+
+    def __init__(
+        self,
+        view: QTextEdit,
+        *,
+        interval_ms: int = 100,
+        max_blocks: int = 5_000,
+        progress_pattern: re.Pattern[str] = PROGRESS_LINE,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._view = view
+        self._progress_pattern = progress_pattern
+        self._lock = threading.Lock()
+        self._pending: deque[tuple[bool, str]] = deque(maxlen=max_blocks)
+        self._dropped = 0
+        self._status_active = False
+        view.document().setMaximumBlockCount(max_blocks)
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def write(self, text: str) -> None:
+        """Queue ``text`` for the next flush; safe to call from any thread."""
+        message = str(text)
+        is_progress = bool(self._progress_pattern.match(message))
+        with self._lock:
+            if is_progress and self._pending and self._pending[-1][0]:
+                self._pending[-1] = (True, message)
+                return
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append((is_progress, message))
+
+    @Slot()
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            entries = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+
+        if dropped:
+            entries.insert(0, (False, f"... {dropped:,} earlier log messages dropped"))
+
+        scrollbar = self._view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        cursor = QTextCursor(self._view.document())
+        cursor.beginEditBlock()
+        batch: list[str] = []
+        for is_progress, message in entries:
+            if not is_progress:
+                batch.append(message)
+                continue
+            if batch:
+                self._append(cursor, "\n".join(batch))
+                batch = []
+            if self._status_active:
+                cursor.movePosition(QTextCursor.End)
+                cursor.movePosition(QTextCursor.StartOfBlock, QTextCursor.KeepAnchor)
+                cursor.insertText(message)
+            else:
+                self._append(cursor, message)
+            self._status_active = True
+        if batch:
+            self._append(cursor, "\n".join(batch))
+        cursor.endEditBlock()
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def _append(self, cursor: QTextCursor, text: str) -> None:
+        cursor.movePosition(QTextCursor.End)
+        if not self._view.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertText(text)
+        self._status_active = False
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self.flush()
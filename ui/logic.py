@@ -1,196 +1,535 @@
 from __future__ import annotations
 
+import functools
 import shutil
-import uuid
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Callable, Tuple, Iterable
+from typing import Callable, Iterator, Tuple, Iterable
 
-import h5py
-from VBump.Basic import VBump, VBumpCollection, load_csv, load_hdf5, to_csv, to_hdf5
+from VBump.Basic import (
+    CancelToken,
+    VBump,
+    VBumpCollection,
+    hdf5_to_csv,
+    iter_vbump_arrays,
+    load_hdf5,
+    to_hdf5,
+    _require_h5py,
+    _require_numpy,
+)
 from VBump.CreateRectangularArea import (
     create_rectangular_area_XY_by_number_to_hdf5,
     create_rectangular_area_XY_by_pitch_to_hdf5,
 )
 from VBump.DXFImport import DXFVBumpImporter
+from VBump.ExportVTP import write_vbumps_vtp
+from VBump.ExportWDL import (
+    vbump_2_wdl_as_airtrap,
+    vbump_2_wdl_as_weldline,
+    vbump_2_wdl_as_weldline_AABB,
+)
+from VBump.FileManip import merge as merge_csv
+from VBump.H5Layout import (
+    BBOX_ATTR,
+    BBoxAccumulator,
+    copy_with_constant_group,
+    create_vbump,
+    open_vbump,
+    read_stats,
+)
+from VBump.ImportCache import ImportCache, storage_key
+from VBump.Instrument import counter, span
+from VBump.Layers import layer_depth, layer_files, write_append_layer, write_mask_layer, write_override_layer
+from VBump.Profiling import OperationProfiler
+from VBump.ProxyStore import ProxyStore, format_size
+from VBump.Storage import DEFAULT_OUTPUT_STORAGE, StorageProfile, copy_vbump_file, get_profile, proxy_profile_from_env
+from VBump.ArrowIO import arrow_format, arrow_to_hdf5, hdf5_to_feather, hdf5_to_parquet
+from VBump.VBumpFile import hdf5_to_vbump, is_vbump_file, vbump_to_hdf5
 
 HDF5_CHUNK_SIZE = 1_000_000
+WELDLINE_AABB_THRESHOLD = 20_000
+UNDO_LIMIT = 10
+MAX_LAYER_DEPTH = 8
+
+
+def _profiled(label: str):
+    """Run the decorated operation under ``self.profiler`` when profiling is enabled.
+
+    A background compaction that finished since the last operation is adopted first.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            self._adopt_compacted()
+            with self.profiler.profile(label, rows=self.current_source_count, proxy=self.proxy_h5_path):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
 
 class VBumpLogic:
-    def __init__(self, proxy_dir: Path, log_callback: Callable[[str], None]):
-        self.proxy_dir = proxy_dir
+    """Proxy-backed vbump operations shared by the GUI and headless callers.
+
+    Every operation reads the active proxy HDF5 in chunks and writes a fresh proxy
+    file. Between chunks it reports ``(done, total)`` rows through ``progress`` and
+    polls ``cancel_token``; a cancelled or failed operation removes the proxy files it
+    created and leaves the active proxy untouched.
+
+    Deleting a group, editing diameters or heights and appending write copy-on-write
+    layers (:mod:`VBump.Layers`) over the previous proxy instead of copying its rows.
+    The last ``undo_limit`` proxies stay on disk for :meth:`undo` / :meth:`redo`. Once
+    the active chain is deeper than ``max_layer_depth`` a background thread flattens
+    it and the next operation adopts the flat copy.
+
+    Proxies live in a per-process session of a :class:`~VBump.ProxyStore.ProxyStore`
+    under ``proxy_dir``. When the session exceeds the store's budget the least recently
+    used undo states are evicted; :meth:`close` removes the session.
+
+    Proxy files use the ``storage`` profile (``VBUMP_PROXY_STORAGE``, default
+    uncompressed "scratch"); ``save_hdf5`` re-encodes with ``output_storage``. With
+    ``VBUMP_PROFILE`` set (or ``profiler.mode`` assigned) each operation saves a
+    profile into the proxy directory.
+    """
+
+    def __init__(self, proxy_dir: Path, log_callback: Callable[[str], None], *, store: ProxyStore | None = None):
         self.log = log_callback
-        self.proxy_dir.mkdir(parents=True, exist_ok=True)
+        self.progress: Callable[[int, int], None] | None = None
+        self.cancel_token: CancelToken | None = None
+        self.store = store if store is not None else ProxyStore.from_env(proxy_dir, label="gui", log_callback=self._log)
+        self.proxy_dir = self.store.session_dir
         self.proxy_h5_path: str | None = None
         self.current_vbumps: VBumpCollection = VBumpCollection()
         self.loaded_vbumps: VBumpCollection = VBumpCollection()
-        self._dxf_importer = DXFVBumpImporter(log_callback=self.log)
+        self._stats: tuple[str, BBoxAccumulator | None] | None = None
+        self.undo_limit = UNDO_LIMIT
+        self.max_layer_depth = MAX_LAYER_DEPTH
+        self._history: list[str] = []
+        self._history_pos = -1
+        # Files each history entry reads (itself plus its layer chain).
+        self._chains: dict[str, list[str]] = {}
+        self._last_used: dict[str, float] = {}
+        self._compaction: threading.Thread | None = None
+        self._compacting: list[str] = []
+        self._compacted: tuple[str, str] | None = None
+        self._compaction_lock = threading.Lock()
+        self._dxf_importer = DXFVBumpImporter(log_callback=self._log)
+        self.import_cache: ImportCache | None = ImportCache.from_env(log_callback=self._log)
+        self.profiler = OperationProfiler.from_env(proxy_dir, log_callback=self._log)
+        self.storage: StorageProfile = proxy_profile_from_env()
+        self.output_storage: StorageProfile = get_profile(DEFAULT_OUTPUT_STORAGE)
+
+    def _log(self, message: str) -> None:
+        # Late-bound so callers may swap ``self.log`` after construction.
+        self.log(message)
+
+    def _report_progress(self, done: int, total: int) -> None:
+        if self.progress:
+            self.progress(done, total)
+
+    def _check_cancel(self) -> None:
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+
+    @contextmanager
+    def _partial_output(self, path: str) -> Iterator[str]:
+        """Remove ``path`` when the block writing it raises (including cancellation)."""
+        try:
+            yield path
+        except BaseException:
+            self._discard_proxy(path)
+            raise
+
+    def _discard_proxy(self, path: str | None) -> None:
+        if not path or path == self.proxy_h5_path or str(Path(path).resolve()) in self._referenced():
+            return
+        self.store.discard(path)
 
     def next_proxy_path(self, stem: str) -> str:
-        return str((self.proxy_dir / f"{stem}_{uuid.uuid4().hex}.h5").resolve())
+        return self.store.new_path(stem)
 
     def set_active_proxy(self, path: str) -> None:
         self.proxy_h5_path = path
+        self._last_used[path] = time.monotonic()
         proxy_markers = load_hdf5(path, only_bounding_boxes=True, log_callback=self.log)
         self.current_vbumps = proxy_markers
         self.loaded_vbumps = VBumpCollection(proxy_markers)
 
-    def build_proxy_from_csv(self, csv_path: str) -> str:
-        vbumps = load_csv(csv_path)
-        target = self.next_proxy_path("load_csv")
-        to_hdf5(target, vbumps, log_callback=self.log)
+    def _cached_import(self, stem: str, sources: list[str], params: dict, build: Callable[[str], None]) -> str:
+        """Build a proxy with ``build(target)``, or reuse the import cache's copy for these sources and options."""
+        target = self.next_proxy_path(stem)
+        cache = self.import_cache
+        key = None
+        if cache is not None:
+            key = cache.key(stem, sources, {**params, "storage": storage_key(self.storage)}, self._check_cancel)
+            if cache.fetch(key, target):
+                counter("import_cache_hits", 1)
+                self.log(f"♻️ Reused cached import of {', '.join(Path(s).name for s in sources)}")
+                return target
+        with self._partial_output(target):
+            build(target)
+        if cache is not None and key is not None:
+            cache.put(key, target)
         return target
 
+    def build_proxy_from_csv(self, csv_path: str | list[str]) -> str:
+        """Stream one or more CSV files into a new proxy (several sources parse in parallel).
+
+        The result is served from ``import_cache`` when the same files were loaded before.
+        """
+        paths = [csv_path] if isinstance(csv_path, str) else list(csv_path)
+
+        def build(target: str) -> None:
+            merge_csv(
+                paths,
+                target,
+                log_callback=self.log,
+                storage=self.storage,
+                workers=None if len(paths) > 1 else 1,
+                check_cancel=self._check_cancel,
+                progress_callback=self._report_progress,
+            )
+
+        return self._cached_import("load_csv", paths, {}, build)
+
     def get_dxf_layers(self, dxf_path: str) -> dict[str, int]:
         return self._dxf_importer.get_layer_counts(dxf_path)
 
     def build_proxy_from_dxf(self, dxf_path: str, group: int, height: float, base_z: float, unit_scale: float, selected_layers: list[str] | None = None) -> str:
-        self._dxf_importer.unit_scale = unit_scale
-        self._dxf_importer.base_z = base_z
-        vbumps, report = self._dxf_importer.import_file(dxf_path, group=group, height=height, selected_layers=selected_layers)
-        self.log(
-            f"✅ DXF parsed: {len(vbumps):,} bumps "
-            f"(geometry={report.used_geometry}, diagnostics={report.diagnostics_count})"
-        )
-        target = self.next_proxy_path("load_dxf")
-        to_hdf5(target, vbumps, log_callback=self.log)
+        """Parse a DXF into a new proxy, or reuse the cached proxy of the same file and options."""
+        importer = self._dxf_importer
+
+        def build(target: str) -> None:
+            importer.unit_scale = unit_scale
+            importer.base_z = base_z
+            vbumps, report = importer.import_file(dxf_path, group=group, height=height, selected_layers=selected_layers)
+            self.log(
+                f"✅ DXF parsed: {len(vbumps):,} bumps "
+                f"(geometry={report.used_geometry}, diagnostics={report.diagnostics_count})"
+            )
+            self._check_cancel()
+            to_hdf5(
+                target,
+                vbumps,
+                storage=self.storage,
+                log_callback=self.log,
+                progress_callback=self._report_progress,
+                cancel_token=self.cancel_token,
+            )
+
+        params = {
+            "group": group,
+            "height": height,
+            "base_z": base_z,
+            "unit_scale": unit_scale,
+            "selected_layers": list(selected_layers) if selected_layers else None,
+            "min_points": importer.min_points,
+            "max_rms": importer.max_rms,
+            "prefer_circles": importer.prefer_circles,
+        }
+        return self._cached_import("load_dxf", [dxf_path], params, build)
+
+    def build_proxy_from_vbump(self, vbump_path: str) -> str:
+        target = self.next_proxy_path("load_vbump")
+        with self._partial_output(target):
+            vbump_to_hdf5(
+                vbump_path,
+                target,
+                self.storage,
+                chunk_size=HDF5_CHUNK_SIZE,
+                check_cancel=self._check_cancel,
+                progress_callback=self._report_progress,
+            )
+        return target
+
+    def build_proxy_from_arrow(self, arrow_path: str, groups: list[int] | None = None) -> str:
+        target = self.next_proxy_path("load_arrow")
+        with self._partial_output(target):
+            arrow_to_hdf5(
+                arrow_path,
+                target,
+                self.storage,
+                groups=groups,
+                chunk_size=HDF5_CHUNK_SIZE,
+                check_cancel=self._check_cancel,
+                progress_callback=self._report_progress,
+            )
         return target
 
     def copy_hdf5_to_proxy(self, src_path: str) -> str:
         target = self.next_proxy_path("load_h5")
-        shutil.copy2(src_path, target)
+        with self._partial_output(target):
+            shutil.copy2(src_path, target)
         return target
 
     def merge_proxy_paths(self, paths: list[str]) -> str:
+        """Concatenate proxies; bounding boxes come from the sources' attributes.
+
+        Only sources without complete bbox and statistics metadata (see
+        :func:`VBump.H5Layout.read_stats`) have their rows rescanned.
+        """
+        h5py = _require_h5py()
         out_path = self.next_proxy_path("merge")
-        with h5py.File(out_path, "w") as fout:
+        total = 0
+        for path in paths:
+            with h5py.File(path, "r") as fin:
+                if "vbump" in fin:
+                    total += open_vbump(fin).rows
+        done = 0
+        with span("merge_proxy", sources=len(paths)) as sp, self._partial_output(out_path), h5py.File(out_path, "w") as fout:
             dset_out = None
-            names = None
-            overall_bbox = None
-            group_bbox: dict[int, list[float]] = {}
+            bboxes = BBoxAccumulator()
 
             for path in paths:
                 with h5py.File(path, "r") as fin:
                     if "vbump" not in fin:
                         raise KeyError(f"Dataset 'vbump' not found in {path}.")
-                    dset_in = fin["vbump"]
+                    dset_in = open_vbump(fin)
                     if dset_out is None:
-                        dset_out = fout.create_dataset(
-                            "vbump",
-                            shape=(0,),
-                            maxshape=(None,),
-                            dtype=dset_in.dtype,
-                            chunks=True,
-                            compression="gzip",
-                        )
-                        names = list(dset_in.dtype.names or [])
-                    for start in range(0, int(dset_in.shape[0]), HDF5_CHUNK_SIZE):
-                        end = min(start + HDF5_CHUNK_SIZE, int(dset_in.shape[0]))
-                        arr = dset_in[start:end]
+                        dset_out = create_vbump(fout, dset_in.dtype, self.storage, total=total)
+                    known = read_stats(fin)
+                    if known is not None:
+                        bboxes.merge(known)
+                    else:
+                        counter("bbox_rescans", 1)
+                    for start in range(0, dset_in.rows, HDF5_CHUNK_SIZE):
+                        self._check_cancel()
+                        end = min(start + HDF5_CHUNK_SIZE, dset_in.rows)
+                        with sp.timed("read_s"):
+                            arr = dset_in.read(start, end)
                         if len(arr) == 0:
                             continue
-                        old_size = int(dset_out.shape[0])
-                        dset_out.resize((old_size + len(arr),))
-                        dset_out[old_size:old_size + len(arr)] = arr
-                        for row in arr:
-                            record = {name: row[name].item() for name in names}
-                            overall_bbox = self._update_bbox_state(record, overall_bbox, group_bbox)
+                        sp.add("bytes_read", arr.nbytes)
+                        with sp.timed("write_s"):
+                            dset_out.append(arr)
+                        if known is None:
+                            with sp.timed("bbox_s"):
+                                bboxes.add(arr)
+                        done += len(arr)
+                        sp.add("rows", len(arr))
+                        counter("rows_merged", done)
+                        self._report_progress(done, total)
 
             if dset_out is None:
                 raise RuntimeError("No proxy data to merge.")
-            self._write_bbox_attrs(fout, dset_out, overall_bbox, group_bbox)
+            dset_out.finish()
+            bboxes.write_attrs(fout, dset_out.attrs)
+            fout.flush()
+            sp.add("bytes_written", fout.id.get_filesize())
         return out_path
 
-    def transform_proxy(self, transform: Callable[[dict], list[dict]], label: str) -> tuple[str, int]:
+    def transform_proxy(
+        self,
+        transform: Callable[[dict], list[dict]],
+        label: str,
+        *,
+        rows_factor: int = 1,
+    ) -> tuple[str, int]:
+        """Stream the proxy through ``transform``; ``rows_factor`` bounds output rows per input row."""
+        np = _require_numpy()
+
+        def apply(arr):
+            names = list(arr.dtype.names or [])
+            out_records = []
+            for row in arr:
+                record = {name: row[name].item() for name in names}
+                for item in transform(record):
+                    out_records.append(tuple(item[name] for name in names))
+            return np.array(out_records, dtype=arr.dtype)
+
+        return self.transform_proxy_arrays(apply, label, rows_factor=rows_factor)
+
+    def transform_proxy_arrays(
+        self,
+        transform: Callable[[object], object],
+        label: str,
+        *,
+        rows_factor: int = 1,
+    ) -> tuple[str, int]:
+        """Stream the proxy through ``transform``, one structured chunk at a time.
+
+        ``transform`` maps a chunk to the structured array of rows to write (possibly
+        empty, possibly the same array modified in place); ``rows_factor`` bounds output
+        rows per input row.
+        """
+        h5py = _require_h5py()
         if not self.proxy_h5_path:
             raise RuntimeError("No active proxy dataset.")
 
         out_path = self.next_proxy_path(label)
         written = 0
-        with h5py.File(self.proxy_h5_path, "r") as fin, h5py.File(out_path, "w") as fout:
+        with span("transform_proxy", label=label) as sp, self._partial_output(out_path), \
+                h5py.File(self.proxy_h5_path, "r") as fin, h5py.File(out_path, "w") as fout:
             if "vbump" not in fin:
                 raise KeyError("Dataset 'vbump' not found.")
-            dset_in = fin["vbump"]
-            names = list(dset_in.dtype.names or [])
-            dset_out = fout.create_dataset(
-                "vbump",
-                shape=(0,),
-                maxshape=(None,),
-                dtype=dset_in.dtype,
-                chunks=True,
-                compression="gzip",
-            )
+            dset_in = open_vbump(fin)
+            total = dset_in.rows
+            dset_out = create_vbump(fout, dset_in.dtype, self.storage, total=total * rows_factor)
 
-            overall_bbox = None
-            group_bbox: dict[int, list[float]] = {}
+            bboxes = BBoxAccumulator()
 
-            for start in range(0, int(dset_in.shape[0]), HDF5_CHUNK_SIZE):
-                end = min(start + HDF5_CHUNK_SIZE, int(dset_in.shape[0]))
-                arr = dset_in[start:end]
+            for start in range(0, total, HDF5_CHUNK_SIZE):
+                self._check_cancel()
+                end = min(start + HDF5_CHUNK_SIZE, total)
+                with sp.timed("read_s"):
+                    arr = dset_in.read(start, end)
                 if len(arr) == 0:
                     continue
-                out_records = []
-                for row in arr:
-                    record = {name: row[name].item() for name in names}
-                    transformed = transform(record)
-                    for item in transformed:
-                        out_records.append(tuple(item[name] for name in names))
-                        overall_bbox = self._update_bbox_state(item, overall_bbox, group_bbox)
-                if out_records:
-                    old_size = int(dset_out.shape[0])
-                    chunk = len(out_records)
-                    dset_out.resize((old_size + chunk,))
-                    dset_out[old_size:old_size + chunk] = out_records
-                    written += chunk
-            self._write_bbox_attrs(fout, dset_out, overall_bbox, group_bbox)
+                sp.add("bytes_read", arr.nbytes)
+                with sp.timed("transform_s"):
+                    if not arr.flags.writeable:
+                        # Memory-mapped proxies hand out read-only views.
+                        arr = arr.copy()
+                    out = transform(arr)
+                if len(out):
+                    with sp.timed("bbox_s"):
+                        bboxes.add(out)
+                    with sp.timed("write_s"):
+                        dset_out.append(out)
+                    written += len(out)
+                sp.add("rows", len(arr))
+                counter("rows_transformed", end)
+                self._report_progress(end, total)
+            dset_out.finish()
+            bboxes.write_attrs(fout, dset_out.attrs)
+            fout.flush()
+            sp.add("bytes_written", fout.id.get_filesize())
         return out_path, written
 
     def copy_proxy_with_single_group(self, src_path: str, new_group: int) -> str:
-        out_path = self.next_proxy_path("reassign_group")
-        with h5py.File(src_path, "r") as fin, h5py.File(out_path, "w") as fout:
-            if "vbump" not in fin:
-                raise KeyError("Dataset 'vbump' not found.")
-            dset_in = fin["vbump"]
-            names = list(dset_in.dtype.names or [])
-            dset_out = fout.create_dataset(
-                "vbump",
-                shape=(0,),
-                maxshape=(None,),
-                dtype=dset_in.dtype,
-                chunks=True,
-                compression="gzip",
-            )
+        """Copy a proxy with every row moved to ``new_group``.
 
-            overall_bbox = None
-            group_bbox: dict[int, list[float]] = {}
-            for start in range(0, int(dset_in.shape[0]), HDF5_CHUNK_SIZE):
-                end = min(start + HDF5_CHUNK_SIZE, int(dset_in.shape[0]))
-                arr = dset_in[start:end]
-                if len(arr) == 0:
-                    continue
-                out_records = []
-                for row in arr:
-                    record = {name: row[name].item() for name in names}
-                    record["group"] = new_group
-                    out_records.append(tuple(record[name] for name in names))
-                    overall_bbox = self._update_bbox_state(record, overall_bbox, group_bbox)
-                old_size = int(dset_out.shape[0])
-                dset_out.resize((old_size + len(out_records),))
-                dset_out[old_size:old_size + len(out_records)] = out_records
-            self._write_bbox_attrs(fout, dset_out, overall_bbox, group_bbox)
+        Contiguous and columnar proxies are reassigned without rewriting rows (see
+        :func:`VBump.H5Layout.copy_with_constant_group`); others get their ``group``
+        column overwritten chunk by chunk. The bounding box and statistics of
+        ``new_group`` fold together the source's groups, read from its attributes when
+        present.
+        """
+        h5py = _require_h5py()
+        out_path = self.next_proxy_path("reassign_group")
+        with span("reassign_group", group=new_group) as sp, self._partial_output(out_path):
+            with h5py.File(src_path, "r") as fin:
+                if "vbump" not in fin:
+                    raise KeyError("Dataset 'vbump' not found.")
+                known = read_stats(fin)
+            with sp.timed("copy_s"):
+                in_place = copy_with_constant_group(src_path, out_path, new_group)
+            sp.add("in_place", int(in_place))
+            if in_place and known is None:
+                with h5py.File(out_path, "r") as fin:
+                    known = self._scan_bboxes(open_vbump(fin), sp)
+            with h5py.File(src_path, "r") as fin, h5py.File(out_path, "r+" if in_place else "w") as fout:
+                if in_place:
+                    attrs = fout["vbump"].attrs
+                    sp.add("rows", open_vbump(fout).rows)
+                else:
+                    dset_in = open_vbump(fin)
+                    total = dset_in.rows
+                    dset_out = create_vbump(fout, dset_in.dtype, self.storage, total=total, group_range=(new_group, new_group))
+                    scanned = BBoxAccumulator()
+                    for start, end, arr in dset_in.iter_chunks(HDF5_CHUNK_SIZE):
+                        self._check_cancel()
+                        if known is None:
+                            with sp.timed("bbox_s"):
+                                scanned.add(arr)
+                        arr["group"] = new_group
+                        with sp.timed("write_s"):
+                            dset_out.append(arr)
+                        sp.add("rows", len(arr))
+                        self._report_progress(end, total)
+                    dset_out.finish()
+                    attrs = dset_out.attrs
+                    if known is None:
+                        known = scanned
+                known.regroup(new_group).write_attrs(fout, attrs)
         return out_path
 
+    def _scan_bboxes(self, reader, sp) -> BBoxAccumulator:
+        bboxes = BBoxAccumulator()
+        for _start, end, arr in reader.iter_chunks(HDF5_CHUNK_SIZE):
+            self._check_cancel()
+            with sp.timed("bbox_s"):
+                bboxes.add(arr)
+            self._report_progress(end, reader.rows)
+        return bboxes
+
     def materialize_current(self) -> VBumpCollection:
         if not self.proxy_h5_path:
             return VBumpCollection()
-        return load_hdf5(self.proxy_h5_path, only_bounding_boxes=False)
+        return load_hdf5(
+            self.proxy_h5_path,
+            only_bounding_boxes=False,
+            chunk_size=HDF5_CHUNK_SIZE,
+            log_callback=self.log,
+            progress_callback=self._report_progress,
+            cancel_token=self.cancel_token,
+        )
 
     def current_source_count(self) -> int:
         return int(getattr(self.current_vbumps, "source_count", len(self.current_vbumps)))
 
+    def dataset_stats(self) -> BBoxAccumulator | None:
+        """Statistics block of the active proxy (see :func:`VBump.H5Layout.read_stats`).
+
+        None when there is no proxy or it predates the block. Proxies are never modified
+        in place, so the result is cached per proxy path.
+        """
+        if not self.proxy_h5_path:
+            return None
+        if self._stats is None or self._stats[0] != self.proxy_h5_path:
+            h5py = _require_h5py()
+            with h5py.File(self.proxy_h5_path, "r") as fin:
+                self._stats = (self.proxy_h5_path, read_stats(fin) if "vbump" in fin else None)
+        return self._stats[1]
+
+    def group_row_counts(self) -> dict[int, int]:
+        """Rows per group of the active proxy, from the statistics block when recorded."""
+        stats = self.dataset_stats()
+        if stats is not None:
+            return dict(stats.group_rows)
+        if not self.proxy_h5_path:
+            return {}
+        h5py = _require_h5py()
+        np = _require_numpy()
+        counts: dict[int, int] = {}
+        with h5py.File(self.proxy_h5_path, "r") as fin:
+            dset = open_vbump(fin)
+            for start in range(0, dset.rows, HDF5_CHUNK_SIZE):
+                self._check_cancel()
+                end = min(start + HDF5_CHUNK_SIZE, dset.rows)
+                gids, rows = np.unique(dset.read_column("group", start, end), return_counts=True)
+                for gid, count in zip(gids.tolist(), rows.tolist()):
+                    counts[int(gid)] = counts.get(int(gid), 0) + count
+        return counts
+
+    def export_row_count(self, kind: str) -> int:
+        """Rows an export of ``kind`` (``weldline``, ``airtrap``, ``vtp``, ``csv``...) will write.
+
+        Weldline exports of ``WELDLINE_AABB_THRESHOLD`` rows or more write the 12 edges
+        of each group's box instead of the rows.
+        """
+        rows = self.current_source_count()
+        if kind == "weldline" and rows >= WELDLINE_AABB_THRESHOLD:
+            return 12 * len(self.group_row_counts())
+        return rows
+
     def get_existing_groups(self) -> set[int]:
+        """Groups with rows in the active proxy.
+
+        Answered from the statistics block, which every layer keeps in step with its
+        rows; older proxies fall back to the ``groups`` hierarchy, then to a scan.
+        """
+        h5py = _require_h5py()
         groups: set[int] = set()
         if not self.proxy_h5_path:
             return groups
+        stats = self.dataset_stats()
+        if stats is not None:
+            return {gid for gid, rows in stats.group_rows.items() if rows}
         with h5py.File(self.proxy_h5_path, "r") as fin:
             if "groups" in fin:
                 for name in fin["groups"].keys():
@@ -198,82 +537,541 @@ class VBumpLogic:
                         groups.add(int(name))
                     except ValueError:
                         continue
-            elif "vbump" in fin:
-                dset = fin["vbump"]
-                for start in range(0, int(dset.shape[0]), HDF5_CHUNK_SIZE):
-                    end = min(start + HDF5_CHUNK_SIZE, int(dset.shape[0]))
-                    arr = dset[start:end]
-                    for gid in arr["group"]:
-                        groups.add(int(gid))
-        return groups
+                return groups
+        return set(self.group_row_counts())
 
     def replace_proxy(self, new_path: str, message: str) -> None:
-        old = self.proxy_h5_path
+        """Activate ``new_path`` as the newest history entry, dropping any redo entries."""
+        dropped = self._history[self._history_pos + 1:]
+        del self._history[self._history_pos + 1:]
+        self._history.append(new_path)
+        self._chains[new_path] = layer_files(new_path)
+        while len(self._history) > self.undo_limit + 1:
+            dropped.append(self._history.pop(0))
+        self._history_pos = len(self._history) - 1
         self.set_active_proxy(new_path)
-        self.log(message)
-        if old and Path(old) != Path(new_path):
+        if message:
+            self.log(message)
+        self._release([file for path in dropped for file in self._pop_entry(path)])
+        self._enforce_budget()
+        self._start_compaction()
+
+    def append_proxy(self, incoming: str, message: str) -> None:
+        """Append ``incoming`` to the active proxy as a layer (or adopt it) and activate the result."""
+        if not self.proxy_h5_path:
+            self.replace_proxy(incoming, message)
+            return
+        out_path = self.next_proxy_path("append")
+        try:
+            with self._partial_output(out_path):
+                write_append_layer(self.proxy_h5_path, incoming, out_path, check_cancel=self._check_cancel)
+        except BaseException:
+            self._discard_proxy(incoming)
+            raise
+        self.replace_proxy(out_path, message)
+
+    def _referenced(self) -> set[str]:
+        """Files that history entries or a running compaction still read."""
+        referenced = {file for path in self._history for file in self._chains.get(path, [])}
+        referenced.update(self._compacting)
+        return referenced
+
+    def _release(self, files: Iterable[str]) -> None:
+        referenced = self._referenced()
+        for file in set(files):
+            if file not in referenced:
+                self._discard_proxy(file)
+
+    def _pop_entry(self, path: str) -> list[str]:
+        self._last_used.pop(path, None)
+        return self._chains.pop(path, [])
+
+    def _enforce_budget(self) -> None:
+        """Evict least recently used inactive history entries while the session is over budget."""
+        self.store.collect()
+        if not self.store.over_budget():
+            return
+        evicted = 0
+        active = self.proxy_h5_path
+        for path in sorted((p for p in self._history if p != active), key=lambda p: self._last_used.get(p, 0.0)):
+            index = self._history.index(path)
+            del self._history[index]
+            if index < self._history_pos:
+                self._history_pos -= 1
+            self._release(self._pop_entry(path))
+            evicted += 1
+            if not self.store.over_budget():
+                break
+        usage, budget = self.store.usage(), self.store.budget or 0
+        if evicted:
+            counter("proxy_evictions", evicted)
+            self.log(
+                f"🧹 Proxy budget: dropped {evicted} undo state(s) "
+                f"({format_size(usage)} of {format_size(budget)} used)"
+            )
+        else:
+            self.log(f"⚠️ Active proxy needs {format_size(usage)}, above the {format_size(budget)} proxy budget")
+
+    @property
+    def can_undo(self) -> bool:
+        return self._history_pos > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self._history_pos < len(self._history) - 1
+
+    def undo(self) -> bool:
+        """Reactivate the previous proxy; False when there is nothing to undo."""
+        self._adopt_compacted()
+        if not self.can_undo:
+            return False
+        self._history_pos -= 1
+        self.set_active_proxy(self._history[self._history_pos])
+        self.log(f"↩️ Undo (rows now: {self.current_source_count():,})")
+        return True
+
+    def redo(self) -> bool:
+        """Reactivate the proxy undone last; False when there is nothing to redo."""
+        self._adopt_compacted()
+        if not self.can_redo:
+            return False
+        self._history_pos += 1
+        self.set_active_proxy(self._history[self._history_pos])
+        self.log(f"↪️ Redo (rows now: {self.current_source_count():,})")
+        return True
+
+    def _start_compaction(self) -> None:
+        """Flatten the active proxy in a background thread when its layer chain is too deep."""
+        source = self.proxy_h5_path
+        if self._compaction is not None or not source or layer_depth(source) <= self.max_layer_depth:
+            return
+        target = self.next_proxy_path("compact")
+        self._compacting = list(self._chains.get(source, [source]))
+
+        def run() -> None:
+            result = None
             try:
-                if str(old).startswith(str(self.proxy_dir.resolve())):
-                    Path(old).unlink(missing_ok=True)
-            except Exception:
-                pass
+                with span("compact_proxy", depth=layer_depth(source)) as sp:
+                    sp.add("rows", copy_vbump_file(source, target, self.storage, chunk_size=HDF5_CHUNK_SIZE))
+                result = (source, target)
+            except Exception as exc:
+                Path(target).unlink(missing_ok=True)
+                self.log(f"⚠️ Proxy compaction failed: {exc}")
+            with self._compaction_lock:
+                self._compacted = result
+
+        self._compaction = threading.Thread(target=run, name="vbump-compaction", daemon=True)
+        self._compaction.start()
 
-    def _update_bbox_state(
+    def _adopt_compacted(self) -> None:
+        """Swap a finished compaction's flat copy in for the layered proxy it flattened."""
+        thread = self._compaction
+        if thread is None or thread.is_alive():
+            return
+        thread.join()
+        with self._compaction_lock:
+            result, self._compacted = self._compacted, None
+        self._compaction = None
+        released, self._compacting = self._compacting, []
+        if result is None:
+            self._release(released)
+            return
+        source, target = result
+        if source not in self._history:
+            self._release(released)
+            self._discard_proxy(target)
+            return
+        self._history = [target if path == source else path for path in self._history]
+        self._chains[target] = [str(Path(target).resolve())]
+        self._last_used[target] = self._last_used.get(source, time.monotonic())
+        released += self._pop_entry(source)
+        if self.proxy_h5_path == source:
+            # Same rows and metadata, so the loaded markers stay valid.
+            self.proxy_h5_path = target
+        self._release(released)
+        counter("proxy_compactions", 1)
+        self._enforce_budget()
+
+    def join_compaction(self) -> None:
+        """Wait for a background compaction (before removing the proxy directory)."""
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def close(self, *, keep_proxies: bool = False) -> None:
+        """Finish background work and remove this session's proxies (unless ``keep_proxies``)."""
+        self.join_compaction()
+        self.store.close(keep_files=keep_proxies)
+
+    # ------------------------------------------------------------------
+    # Operations
+
+    @_profiled("load_file")
+    def load_file(
         self,
-        record: dict,
-        overall_bbox: list[float] | None,
-        group_bbox: dict[int, list[float]],
-    ) -> list[float]:
-        x0, y0, z0 = float(record["x0"]), float(record["y0"]), float(record["z0"])
-        x1, y1, z1 = float(record["x1"]), float(record["y1"]), float(record["z1"])
-        diameter = float(record["D"])
-        gid = int(record["group"])
-        half_d = diameter / 2.0
-
-        x_min, x_max = min(x0, x1) - half_d, max(x0, x1) + half_d
-        y_min, y_max = min(y0, y1) - half_d, max(y0, y1) + half_d
-        z_min, z_max = min(z0, z1), max(z0, z1)
-
-        if overall_bbox is None:
-            overall_bbox = [x_min, y_min, z_min, x_max, y_max, z_max]
+        path: str,
+        *,
+        new_group: int | None = None,
+        dxf_options: dict | None = None,
+        groups: list[int] | None = None,
+    ) -> None:
+        """Import CSV, HDF5, native ``.vbump``, Parquet/Feather or DXF data and append it to the active proxy.
+
+        ``dxf_options`` carries ``group``, ``height``, ``base_z``, ``unit_scale`` and
+        ``selected_layers`` for DXF sources. ``new_group`` reassigns every imported row.
+        ``groups`` keeps only those groups of a Parquet/Feather source.
+        """
+        h5py = _require_h5py()
+        if path.lower().endswith(".dxf"):
+            options = dict(dxf_options or {})
+            incoming = self.build_proxy_from_dxf(
+                path,
+                options.get("group", 1),
+                options.get("height", 10.0),
+                options.get("base_z", 0.0),
+                options.get("unit_scale", 0.001),
+                selected_layers=options.get("selected_layers"),
+            )
+            layers = options.get("selected_layers") or []
+            self.log(f"✅ Loading DXF layers {', '.join(layers)} and converting to proxy hdf5")
+        elif is_vbump_file(path):
+            incoming = self.build_proxy_from_vbump(path)
+            self.log("✅ Loading native vbump format and converting to proxy hdf5")
+        elif arrow_format(path) is not None:
+            incoming = self.build_proxy_from_arrow(path, groups)
+            self.log(f"✅ Loading {arrow_format(path)} format and converting to proxy hdf5")
+        elif h5py.is_hdf5(path):
+            incoming = self.copy_hdf5_to_proxy(path)
+            self.log("✅ Loading hdf5 format (proxy copy)")
         else:
-            overall_bbox[0], overall_bbox[1], overall_bbox[2] = min(overall_bbox[0], x_min), min(overall_bbox[1], y_min), min(overall_bbox[2], z_min)
-            overall_bbox[3], overall_bbox[4], overall_bbox[5] = max(overall_bbox[3], x_max), max(overall_bbox[4], y_max), max(overall_bbox[5], z_max)
+            incoming = self.build_proxy_from_csv(path)
+            self.log("✅ Loading csv format and converting to proxy hdf5")
+        self._append_incoming(incoming, path, new_group)
+
+    @_profiled("load_files")
+    def load_files(self, paths: list[str], *, new_group: int | None = None, **options) -> None:
+        """Import several files; a list of only CSV files is merged in parallel into one proxy."""
+        h5py = _require_h5py()
+        csv_only = len(paths) > 1 and all(
+            not p.lower().endswith(".dxf") and not is_vbump_file(p) and arrow_format(p) is None and not h5py.is_hdf5(p)
+            for p in paths
+        )
+        if not csv_only:
+            for path in paths:
+                self.load_file(path, new_group=new_group, **options)
+            return
+        incoming = self.build_proxy_from_csv(paths)
+        self.log(f"✅ Merged {len(paths)} csv files into one proxy hdf5")
+        self._append_incoming(incoming, f"{len(paths)} csv files", new_group)
+
+    def _append_incoming(self, incoming: str, label: str, new_group: int | None) -> None:
+        if new_group is not None:
+            try:
+                reassigned = self.copy_proxy_with_single_group(incoming, new_group)
+            finally:
+                self._discard_proxy(incoming)
+            incoming = reassigned
+            self.log(f"🔢 Newly loaded bumps reassigned to group {new_group}.")
 
-        bbox = group_bbox.get(gid)
-        if bbox is None:
-            group_bbox[gid] = [x_min, y_min, z_min, x_max, y_max, z_max]
+        appending = bool(self.proxy_h5_path)
+        self.append_proxy(incoming, "")
+        if appending:
+            self.log(f"✅ Loaded and appended {label} (total {self.current_source_count():,} bumps)")
         else:
-            bbox[0], bbox[1], bbox[2] = min(bbox[0], x_min), min(bbox[1], y_min), min(bbox[2], z_min)
-            bbox[3], bbox[4], bbox[5] = max(bbox[3], x_max), max(bbox[4], y_max), max(bbox[5], z_max)
+            self.log(f"✅ Loaded {label} ({self.current_source_count():,} bumps)")
 
-        return overall_bbox
+    @_profiled("create_grid_by_pitch")
+    def create_grid_by_pitch(
+        self,
+        p0: Tuple[float, float],
+        p1: Tuple[float, float],
+        x_pitch: float,
+        y_pitch: float,
+        diameter: float,
+        group: int,
+        z: float,
+        height: float,
+    ) -> int:
+        out_proxy = self.next_proxy_path("create_pitch")
+        with self._partial_output(out_proxy):
+            written = create_rectangular_area_XY_by_pitch_to_hdf5(
+                out_proxy, p0, p1, x_pitch, y_pitch, diameter, group, z, height,
+                storage=self.storage,
+                log_callback=self.log,
+                progress_callback=self._report_progress,
+                cancel_token=self.cancel_token,
+            )
+        verb = "Appended" if self.proxy_h5_path else "Created"
+        self.append_proxy(out_proxy, f"📐 {verb} {written:,} bumps by pitch in proxy mode")
+        return written
 
-    def _write_bbox_attrs(self, fout, dset_out, overall_bbox, group_bbox) -> None:
-        if overall_bbox is not None:
-            dset_out.attrs["bounding_box"] = (
-                (overall_bbox[0], overall_bbox[1], overall_bbox[2]),
-                (overall_bbox[3], overall_bbox[4], overall_bbox[5]),
+    @_profiled("create_grid_by_count")
+    def create_grid_by_count(
+        self,
+        p0: Tuple[float, float],
+        p1: Tuple[float, float],
+        x_count: int,
+        y_count: int,
+        diameter: float,
+        group: int,
+        z: float,
+        height: float,
+    ) -> int:
+        out_proxy = self.next_proxy_path("create_count")
+        with self._partial_output(out_proxy):
+            written = create_rectangular_area_XY_by_number_to_hdf5(
+                out_proxy, p0, p1, x_count, y_count, diameter, group, z, height,
+                storage=self.storage,
+                log_callback=self.log,
+                progress_callback=self._report_progress,
+                cancel_token=self.cancel_token,
             )
-        groups_node = fout.create_group("groups")
-        for gid, bbox in sorted(group_bbox.items()):
-            node = groups_node.create_group(str(gid))
-            node.attrs["bounding_box"] = (
-                (bbox[0], bbox[1], bbox[2]),
-                (bbox[3], bbox[4], bbox[5]),
+        verb = "Appended" if self.proxy_h5_path else "Created"
+        self.append_proxy(out_proxy, f"📏 {verb} {written:,} bumps by count in proxy mode")
+        return written
+
+    def _override_layer(self, label: str, group: int | None, **values: float) -> str:
+        """Write an override layer (see :func:`VBump.Layers.write_override_layer`) over the active proxy."""
+        self._require_proxy()
+        out_path = self.next_proxy_path(label)
+        with self._partial_output(out_path):
+            write_override_layer(
+                self.proxy_h5_path,
+                out_path,
+                group=group,
+                check_cancel=self._check_cancel,
+                progress_callback=self._report_progress,
+                **values,
             )
+        return out_path
 
-    def compute_bounding_box(self, bumps: Iterable[VBump]) -> tuple[tuple[float, float, float], tuple[float, float, float]] | None:
-        points_x: list[float] = []
-        points_y: list[float] = []
-        points_z: list[float] = []
-        for bump in bumps:
-            points_x.extend([bump.x0, bump.x1])
-            points_y.extend([bump.y0, bump.y1])
-            points_z.extend([bump.z0, bump.z1])
-        if not points_x:
-            return None
-        return (
-            (min(points_x), min(points_y), min(points_z)),
-            (max(points_x), max(points_y), max(points_z)),
-        )
+    @_profiled("modify_diameter")
+    def modify_diameter(self, new_d: float, group: int | None = None) -> int:
+        written = self.current_source_count()
+        out_path = self._override_layer("modify_diameter", group, D=float(new_d))
+        self.replace_proxy(out_path, f"🔧 Updated diameter to {new_d} (rows now: {written:,})")
+        return written
+
+    @_profiled("modify_height")
+    def modify_height(self, new_h: float, group: int | None = None) -> int:
+        """Rescale each bump's axis to length ``new_h`` from ``(x0, y0, z0)``; zero-length bumps stay."""
+        written = self.current_source_count()
+        out_path = self._override_layer("modify_height", group, height=float(new_h))
+        self.replace_proxy(out_path, f"📐 Updated height to {new_h} (rows now: {written:,})")
+        return written
+
+    @_profiled("delete_group")
+    def delete_group(self, gid: int) -> int:
+        stats = self.dataset_stats()
+        if stats is not None and gid not in stats.group_rows:
+            self.log(f"🗑️ Group {gid} has no bumps; nothing to delete")
+            return 0
+        self._require_proxy()
+        before = self.current_source_count()
+        out_path = self.next_proxy_path("delete_group")
+        with self._partial_output(out_path):
+            written = write_mask_layer(
+                self.proxy_h5_path,
+                out_path,
+                [gid],
+                check_cancel=self._check_cancel,
+                progress_callback=self._report_progress,
+            )
+        removed = before - written
+        self.replace_proxy(out_path, f"🗑️ Deleted group {gid} ({removed:,} bumps removed)")
+        return removed
+
+    @_profiled("move_copy")
+    def move_copy(
+        self,
+        delta_u: Tuple[float, float, float],
+        *,
+        group: int | None = None,
+        keep_original: bool = False,
+        new_group: int | None = None,
+        new_diameter: float | None = None,
+    ) -> int:
+        """Translate rows by ``delta_u``; with ``keep_original`` the moved rows are copies.
+
+        Duplicating every group without an explicit ``new_group`` assigns each source group
+        a fresh id above the current maximum, in ascending order of the source ids. The
+        group list comes from the statistics block (see :meth:`get_existing_groups`),
+        which also covers layered proxies, so the duplication is a single vectorized
+        pass; each copy follows its original row.
+        """
+        np = _require_numpy()
+        auto_group_map: dict[int, int] = {}
+        if keep_original and group is None and new_group is None:
+            existing = sorted(self.get_existing_groups())
+            max_group = existing[-1] if existing else 0
+            auto_group_map = {gid: max_group + i for i, gid in enumerate(existing, start=1)}
+        # Sorted lookup table for the vectorized auto-group remap.
+        auto_from = np.array(list(auto_group_map), dtype=np.int64)
+        auto_to = np.array(list(auto_group_map.values()), dtype=np.int64)
+
+        def transform(arr):
+            selected = np.ones(len(arr), dtype=bool) if group is None else arr["group"] == group
+            moved = arr[selected]
+            for axis, delta in zip("xyz", delta_u):
+                moved[f"{axis}0"] += delta
+                moved[f"{axis}1"] += delta
+            if new_diameter is not None:
+                moved["D"] = float(new_diameter)
+            if len(auto_from):
+                index = np.clip(np.searchsorted(auto_from, moved["group"]), 0, len(auto_from) - 1)
+                known = auto_from[index] == moved["group"]
+                moved["group"] = np.where(known, auto_to[index], moved["group"])
+            elif new_group is not None:
+                moved["group"] = int(new_group)
+            if not keep_original:
+                arr[selected] = moved
+                return arr
+            out = np.repeat(arr, 1 + selected)
+            out[np.cumsum(1 + selected)[selected] - 1] = moved
+            return out
+
+        out_path, written = self.transform_proxy_arrays(transform, "move_copy", rows_factor=2 if keep_original else 1)
+        msg = f"📤 Move/Copy applied (rows now: {written:,})"
+        if auto_group_map:
+            msg = f"📤 Duplicated bumps with auto-groups {', '.join(str(v) for v in sorted(auto_group_map.values()))} (rows now: {written:,})"
+        self.replace_proxy(out_path, msg)
+        return written
+
+    @_profiled("save_hdf5")
+    def save_hdf5(self, path: str, storage: str | StorageProfile | None = None) -> None:
+        """Write the active proxy to ``path`` re-encoded with ``storage`` (default ``output_storage``).
+
+        Layered proxies are always flattened, so saved files stand alone.
+        """
+        self._require_proxy()
+        profile = get_profile(storage) if storage is not None else self.output_storage
+        if profile == self.storage and layer_depth(self.proxy_h5_path) == 0:
+            shutil.copy2(self.proxy_h5_path, path)
+        else:
+            with span("save_hdf5", storage=profile.name) as sp:
+                try:
+                    rows = copy_vbump_file(self.proxy_h5_path, path, profile, chunk_size=HDF5_CHUNK_SIZE, check_cancel=self._check_cancel)
+                except BaseException:
+                    Path(path).unlink(missing_ok=True)
+                    raise
+                sp.add("rows", rows)
+        self.log(f"💾 Saved proxy HDF5 to {path} ({profile.name} storage)")
+
+    @_profiled("save_vbump")
+    def save_vbump(self, path: str) -> None:
+        """Write the active proxy as a native ``.vbump`` file (see VBump.VBumpFile)."""
+        self._require_proxy()
+        try:
+            rows = hdf5_to_vbump(
+                self.proxy_h5_path,
+                path,
+                chunk_size=HDF5_CHUNK_SIZE,
+                check_cancel=self._check_cancel,
+                progress_callback=self._report_progress,
+            )
+        except BaseException:
+            Path(path).unlink(missing_ok=True)
+            raise
+        self.log(f"💾 Saved native vbump file to {path} ({rows:,} rows)")
+
+    @_profiled("save_arrow")
+    def save_arrow(self, path: str, fmt: str = "parquet") -> None:
+        """Write the active proxy as Parquet or Feather (see VBump.ArrowIO)."""
+        self._require_proxy()
+        writer = hdf5_to_parquet if fmt == "parquet" else hdf5_to_feather
+        try:
+            rows = writer(
+                self.proxy_h5_path,
+                path,
+                check_cancel=self._check_cancel,
+                progress_callback=self._report_progress,
+            )
+        except BaseException:
+            Path(path).unlink(missing_ok=True)
+            raise
+        self.log(f"💾 Saved {fmt} file to {path} ({rows:,} rows)")
+
+    @_profiled("save_csv")
+    def save_csv(self, path: str, float_format: str | None = None) -> None:
+        """Stream the active proxy to CSV (gzipped for ``*.gz`` paths) without materializing it."""
+        self._require_proxy()
+        try:
+            rows = hdf5_to_csv(
+                self.proxy_h5_path,
+                path,
+                float_format=float_format,
+                check_cancel=self._check_cancel,
+                progress_callback=self._report_progress,
+            )
+        except BaseException:
+            Path(path).unlink(missing_ok=True)
+            raise
+        self.log(f"💾 Saved CSV to {path} ({rows:,} rows)")
+
+    @_profiled("export_weldline")
+    def export_weldline(self, path: str) -> None:
+        self._require_proxy()
+        as_boxes = self.current_source_count() >= WELDLINE_AABB_THRESHOLD
+        self.log(f"🧵 Weldline export will write {self.export_row_count('weldline'):,} weldlines")
+        vbumps = self._materialize_for_export()
+        if not as_boxes:
+            vbump_2_wdl_as_weldline(path, vbumps, log_callback=self.log)
+        else:
+            vbump_2_wdl_as_weldline_AABB(path, vbumps, log_callback=self.log)
+        self.log(f"🧵 Weldline exported to {path} (materialized {len(vbumps):,} rows)")
+
+    @_profiled("export_airtrap")
+    def export_airtrap(self, path: str) -> None:
+        vbumps = self._materialize_for_export()
+        vbump_2_wdl_as_airtrap(path, vbumps, log_callback=self.log)
+        self.log(f"💨 Airtrap exported to {path} (materialized {len(vbumps):,} rows)")
+
+    @_profiled("export_vtp")
+    def export_vtp(self, path: str) -> None:
+        vbumps = self._materialize_for_export()
+        write_vbumps_vtp(vbumps, path)
+        self.log(f"🧪 VTP exported to {path} (materialized {len(vbumps):,} rows)")
+
+    def _require_proxy(self) -> None:
+        if not self.proxy_h5_path:
+            raise RuntimeError("No active proxy dataset.")
+
+    def _materialize_for_export(self) -> VBumpCollection:
+        self._require_proxy()
+        vbumps = self.materialize_current()
+        self._check_cancel()
+        return vbumps
+
+    def compute_bounding_box(
+        self, bumps: Iterable[VBump] | None = None
+    ) -> tuple[tuple[float, float, float], tuple[float, float, float]] | None:
+        """Return the ``(min, max)`` corners of ``bumps`` (default: the active dataset).
+
+        x/y extents always include half the bump diameter (z is unpadded), the same
+        convention as the stored ``bounding_box`` attributes. Collections that carry a
+        ``bounding_box`` (proxy markers, :func:`load_hdf5` results) and the active proxy
+        answer from that metadata without touching rows; plain bump lists are reduced in
+        bulk and padded the same way.
+        """
+        if bumps is None:
+            bumps = self.current_vbumps
+            if getattr(bumps, "bounding_box", None) is None and self.proxy_h5_path:
+                return self._proxy_bounding_box()
+        stored = getattr(bumps, "bounding_box", None)
+        if stored is not None:
+            return tuple(stored[0]), tuple(stored[1])
+        bboxes = BBoxAccumulator()
+        for data in iter_vbump_arrays(bumps if isinstance(bumps, list) else list(bumps)):
+            bboxes.add(data)
+        overall = bboxes.bounding_box
+        return (tuple(overall[:3]), tuple(overall[3:])) if overall is not None else None
+
+    def _proxy_bounding_box(self) -> tuple[tuple[float, float, float], tuple[float, float, float]] | None:
+        """Bounds of the active proxy from its attribute, scanning rows only when it is missing."""
+        h5py = _require_h5py()
+        with span("proxy_bounds") as sp, h5py.File(self.proxy_h5_path, "r") as fin:
+            reader = open_vbump(fin)
+            stored = reader.attrs.get(BBOX_ATTR)
+            if stored is not None:
+                return tuple(float(v) for v in stored[0]), tuple(float(v) for v in stored[1])
+            overall = self._scan_bboxes(reader, sp).bounding_box
+        return (tuple(overall[:3]), tuple(overall[3:])) if overall is not None else None
@@ -1,13 +1,10 @@
 from __future__ import annotations
 
-import shutil
-from pathlib import Path
 from typing import Tuple, Callable
 
-import h5py
-from PySide6.QtGui import QTextCursor
+from PySide6.QtCore import QThread, Slot
 from PySide6.QtWidgets import (
-    QApplication,
+    QCheckBox,
     QFileDialog,
     QFormLayout,
     QGroupBox,
@@ -15,25 +12,14 @@ from PySide6.QtWidgets import (
     QLabel,
     QMainWindow,
     QMessageBox,
+    QProgressBar,
     QPushButton,
     QTextEdit,
     QVBoxLayout,
     QWidget,
 )
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-
-from VBump.Basic import to_csv
-from VBump.CreateRectangularArea import (
-    create_rectangular_area_XY_by_number_to_hdf5,
-    create_rectangular_area_XY_by_pitch_to_hdf5,
-)
-from VBump.ExportVTP import write_vbumps_vtp
-from VBump.ExportWDL import (
-    vbump_2_wdl_as_airtrap,
-    vbump_2_wdl_as_weldline,
-    vbump_2_wdl_as_weldline_AABB,
-)
+from VBump.Basic import CancelToken
+from VBump.Instrument import LogSink, add_sink, remove_sink
 from VBump.VBumpPlot import plot_vbumps, plot_vbumps_aabb
 from ui.dialogs import (
     request_count_parameters,
@@ -43,10 +29,14 @@ from ui.dialogs import (
     request_substrate_box,
     request_dxf_import_parameters,
 )
+from ui.log_sink import BufferedLogSink
 from ui.logic import VBumpLogic
+from ui.streaming import ProxyTaskWorker
 
 PLOT_MATERIALIZE_FOR_DETAILS = 10_000
 PLOT_MATERIALIZE_LIMIT = 1_000_000
+LOG_FLUSH_INTERVAL_MS = 100
+LOG_MAX_BLOCKS = 5_000
 
 class VBumpUI(QMainWindow):
     def __init__(self, logic: VBumpLogic):
@@ -58,6 +48,11 @@ class VBumpUI(QMainWindow):
         self.substrate_p0: Tuple[float, float, float] | None = None
         self.substrate_p1: Tuple[float, float, float] | None = None
         self.is_dark_mode: bool = True
+        self._task_thread: QThread | None = None
+        self._task_worker: ProxyTaskWorker | None = None
+        self._task_token: CancelToken | None = None
+        self._task_label: str = ""
+        self._task_on_done: Callable[[object], None] | None = None
 
         central = QWidget()
         layout = QVBoxLayout(central)
@@ -66,6 +61,10 @@ class VBumpUI(QMainWindow):
         
         top_bar = QHBoxLayout()
         top_bar.addStretch()
+        self.chk_profile = QCheckBox("Profile operations")
+        self.chk_profile.setToolTip("Save a cProfile report next to the proxy files for every operation.")
+        self.chk_profile.setChecked(self.logic.profiler.enabled)
+        top_bar.addWidget(self.chk_profile)
         self.btn_toggle_theme = QPushButton("☀️ Toggle Theme")
         top_bar.addWidget(self.btn_toggle_theme)
         layout.addLayout(top_bar)
@@ -75,8 +74,14 @@ class VBumpUI(QMainWindow):
         flayout = QHBoxLayout(file_box)
         self.btn_load = QPushButton("Import Data")
         self.btn_save = QPushButton("Save Data")
+        self.btn_undo = QPushButton("↩️ Undo")
+        self.btn_undo.setShortcut("Ctrl+Z")
+        self.btn_redo = QPushButton("↪️ Redo")
+        self.btn_redo.setShortcut("Ctrl+Y")
         flayout.addWidget(self.btn_load)
         flayout.addWidget(self.btn_save)
+        flayout.addWidget(self.btn_undo)
+        flayout.addWidget(self.btn_redo)
         layout.addWidget(file_box)
 
         create_box = QGroupBox("📐 Pattern Generation")
@@ -110,15 +115,32 @@ class VBumpUI(QMainWindow):
         explayout.addWidget(self.btn_vtp)
         layout.addWidget(exp_box)
 
+        task_bar = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("Idle")
+        self.btn_cancel_task = QPushButton("Cancel")
+        self.btn_cancel_task.setEnabled(False)
+        task_bar.addWidget(self.progress_bar, stretch=1)
+        task_bar.addWidget(self.btn_cancel_task)
+        layout.addLayout(task_bar)
+
         layout.addWidget(QLabel("🧾 Log Output:"))
         self.log_view = QTextEdit()
         self.log_view.setReadOnly(True)
+        self._log_sink = BufferedLogSink(self.log_view, interval_ms=LOG_FLUSH_INTERVAL_MS, max_blocks=LOG_MAX_BLOCKS, parent=self)
+        # One timing summary line per background operation (rows/s, MB written, peak RSS).
+        self._timing_sink = add_sink(LogSink(self.log, max_depth=0))
 
         self.plot_box = QGroupBox("📊 Plot Preview")
-        plot_layout = QVBoxLayout(self.plot_box)
-        self.figure = Figure(figsize=(6, 4))
-        self.canvas = FigureCanvas(self.figure)
-        plot_layout.addWidget(self.canvas)
+        self._plot_layout = QVBoxLayout(self.plot_box)
+        plot_layout = self._plot_layout
+        # matplotlib and its Qt backend load on the first render (see _ensure_canvas).
+        self.figure = None
+        self.canvas = None
+        self._plot_placeholder = QLabel("Render a plot to load the 3D preview.")
+        plot_layout.addWidget(self._plot_placeholder, stretch=1)
 
         view_btn_layout = QHBoxLayout()
         self.btn_plot = QPushButton("Render 3D Plot")
@@ -134,7 +156,7 @@ class VBumpUI(QMainWindow):
         plot_layout.addLayout(view_btn_layout)
 
         def set_view(elev, azim):
-            if not self.figure.axes:
+            if self.figure is None or not self.figure.axes:
                 QMessageBox.information(self, "Info", "Please plot something first.")
                 return
             ax = self.figure.axes[0]
@@ -151,10 +173,22 @@ class VBumpUI(QMainWindow):
         bottom_split.addWidget(self.plot_box, stretch=2)
         layout.addLayout(bottom_split, stretch=1)
 
+        self._action_buttons = [
+            self.btn_load, self.btn_save, self.btn_undo, self.btn_redo,
+            self.btn_create_pitch, self.btn_create_count,
+            self.btn_modify_diam, self.btn_modify_height, self.btn_move, self.btn_delete_group,
+            self.btn_weldline, self.btn_airtrap, self.btn_vtp,
+            self.btn_plot,
+        ]
+
         # Signal connections
+        self.btn_cancel_task.clicked.connect(self.cancel_task)
         self.btn_toggle_theme.clicked.connect(self.toggle_theme)
+        self.chk_profile.toggled.connect(self.set_profiling)
         self.btn_load.clicked.connect(self.load_csv)
         self.btn_save.clicked.connect(self.save_csv)
+        self.btn_undo.clicked.connect(self.undo)
+        self.btn_redo.clicked.connect(self.redo)
         self.btn_create_pitch.clicked.connect(self.create_pitch)
         self.btn_create_count.clicked.connect(self.create_count)
         self.btn_modify_diam.clicked.connect(self.modify_diameter)
@@ -181,9 +215,17 @@ class VBumpUI(QMainWindow):
         self.log(f"🎨 Theme switched to {theme} mode.")
 
     def log(self, text):
-        self.log_view.append(text)
-        self.log_view.moveCursor(QTextCursor.End)
-        QApplication.processEvents()
+        # Safe from worker threads; the sink flushes to the widget on a GUI-thread timer.
+        self._log_sink.write(text)
+
+    @Slot(bool)
+    def set_profiling(self, enabled: bool) -> None:
+        profiler = self.logic.profiler
+        profiler.mode = (profiler.mode or "cprofile") if enabled else None
+        if enabled:
+            self.log(f"🔬 Profiling enabled ({profiler.mode}); reports are saved to {profiler.output_dir}")
+        else:
+            self.log("🔬 Profiling disabled.")
 
     def _ensure_proxy_loaded(self) -> bool:
         if not self.logic.proxy_h5_path:
@@ -191,63 +233,154 @@ class VBumpUI(QMainWindow):
             return False
         return True
 
+    # ------------------------------------------------------------------
+    # Background task plumbing
+
+    def _run_task(self, label: str, task: Callable[[], object], on_done: Callable[[object], None] | None = None) -> bool:
+        """Run ``task`` on a worker thread while the progress bar tracks it.
+
+        ``on_done`` receives the task result on the GUI thread. Only one proxy operation
+        runs at a time; the action buttons are disabled until it finishes.
+        """
+        if self._task_thread is not None:
+            QMessageBox.information(self, "Busy", "Another operation is still running.")
+            return False
+
+        token = CancelToken()
+        worker = ProxyTaskWorker(task, label)
+        thread = QThread(self)
+        worker.moveToThread(thread)
+        self.logic.cancel_token = token
+        self.logic.progress = worker.report_progress
+
+        thread.started.connect(worker.run)
+        worker.progress.connect(self._on_task_progress)
+        worker.finished.connect(self._on_task_finished)
+        worker.error.connect(self._on_task_error)
+        worker.cancelled.connect(self._on_task_cancelled)
+        for signal in (worker.finished, worker.error, worker.cancelled):
+            signal.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        self._task_thread = thread
+        self._task_worker = worker
+        self._task_token = token
+        self._task_label = label
+        self._task_on_done = on_done
+        self._set_busy(True, label)
+        thread.start()
+        return True
+
+    def _set_busy(self, busy: bool, label: str = "") -> None:
+        for button in self._action_buttons:
+            button.setEnabled(not busy)
+        self.btn_cancel_task.setEnabled(busy)
+        self.progress_bar.setRange(0, 0 if busy else 100)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat(f"{label} %p%" if busy else "Idle")
+
+    def _end_task(self) -> Callable[[object], None] | None:
+        on_done = self._task_on_done
+        self._task_thread = None
+        self._task_worker = None
+        self._task_token = None
+        self._task_on_done = None
+        self.logic.cancel_token = None
+        self.logic.progress = None
+        self._set_busy(False)
+        return on_done
+
+    @Slot()
+    def cancel_task(self):
+        if self._task_token is not None and not self._task_token.cancelled:
+            self._task_token.cancel()
+            self.btn_cancel_task.setEnabled(False)
+            self.log(f"⏹️ Cancelling {self._task_label}...")
+
+    @Slot(int, int)
+    def _on_task_progress(self, done: int, total: int):
+        if total <= 0:
+            return
+        if self.progress_bar.maximum() == 0:
+            self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(min(100, int(done * 100 / total)))
+
+    @Slot(object)
+    def _on_task_finished(self, result):
+        on_done = self._end_task()
+        if on_done is not None:
+            try:
+                on_done(result)
+            except Exception as exc:
+                QMessageBox.critical(self, "Error", str(exc))
+
+    @Slot(str)
+    def _on_task_error(self, message: str):
+        label = self._task_label
+        self._end_task()
+        self.log(f"❌ {label} failed: {message}")
+        QMessageBox.critical(self, "Error", message)
+
+    @Slot()
+    def _on_task_cancelled(self):
+        label = self._task_label
+        self._end_task()
+        self.log(f"⏹️ {label} cancelled; partial proxy files were removed.")
+
+    def _refresh_plot_if_ready(self, _result=None) -> None:
+        if self.substrate_p0 and self.substrate_p1:
+            self.plot_aabb()
+
+    # ------------------------------------------------------------------
+    # Actions
+
     def load_csv(self):
         path, _ = QFileDialog.getOpenFileName(
             self,
             "Select File",
             "",
-            "CSV/h5/DXF/VBump Files (*.csv *.CSV *.hdf5 *h5 *.vbump *.VBUMP *.dxf *.DXF);;All Files (*)",
+            "CSV/h5/DXF/VBump Files (*.csv *.CSV *.hdf5 *h5 *.vbump *.VBUMP *.dxf *.DXF);;"
+            "Parquet/Feather Files (*.parquet *.feather *.arrow);;All Files (*)",
         )
         if not path:
             return
 
-        try:
-            if path.lower().endswith(".dxf"):
-                layers = self.logic.get_dxf_layers(path)
-                dxf_params = request_dxf_import_parameters(self, layers)
-                if not dxf_params:
-                    return
-                incoming_proxy = self.logic.build_proxy_from_dxf(
-                    path,
-                    dxf_params.group,
-                    dxf_params.height,
-                    dxf_params.base_z,
-                    dxf_params.unit_scale,
-                    selected_layers=dxf_params.selected_layers
-                )
-                self.log(f"✅ Loading DXF layers {', '.join(dxf_params.selected_layers)} and converting to proxy hdf5")
-            elif h5py.is_hdf5(path):
-                incoming_proxy = self.logic.copy_hdf5_to_proxy(path)
-                self.log("✅ Loading hdf5 format (proxy copy)")
-            else:
-                incoming_proxy = self.logic.build_proxy_from_csv(path)
-                self.log("✅ Loading csv format and converting to proxy hdf5")
-
-            if path.lower().endswith(".dxf"):
-                # DXF already prompts for group ID in its specific parameter dialog
-                pass
-            else:
-                reply = QMessageBox.question(
-                    self, "Reassign Group ID",
-                    "Do you want to assign a new group ID to the newly loaded bumps?",
-                    QMessageBox.Yes | QMessageBox.No,
-                )
-                if reply == QMessageBox.Yes:
-                    from PySide6.QtWidgets import QInputDialog
-                    new_gid, ok = QInputDialog.getInt(self, "New Group ID", "Enter new group ID:", 1, 1, 9999)
-                    if ok:
-                        incoming_proxy = self.logic.copy_proxy_with_single_group(incoming_proxy, new_gid)
-                        self.log(f"🔢 Newly loaded bumps reassigned to group {new_gid}.")
-
-            if self.logic.proxy_h5_path:
-                merged = self.logic.merge_proxy_paths([self.logic.proxy_h5_path, incoming_proxy])
-                self.logic.replace_proxy(merged, "")
-                self.log(f"✅ Loaded and appended {path} (total {self.logic.current_source_count():,} bumps)")
-            else:
-                self.logic.replace_proxy(incoming_proxy, "")
-                self.log(f"✅ Loaded {path} ({self.logic.current_source_count():,} bumps)")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        if path.lower().endswith(".dxf"):
+            # Parsing the DXF for its layer table is slow; do it off the GUI thread.
+            self._run_task(
+                "Reading DXF layers",
+                lambda: self.logic.get_dxf_layers(path),
+                lambda layers: self._load_dxf_with_layers(path, layers),
+            )
+            return
+
+        new_group = None
+        reply = QMessageBox.question(
+            self, "Reassign Group ID",
+            "Do you want to assign a new group ID to the newly loaded bumps?",
+            QMessageBox.Yes | QMessageBox.No,
+        )
+        if reply == QMessageBox.Yes:
+            from PySide6.QtWidgets import QInputDialog
+            gid, ok = QInputDialog.getInt(self, "New Group ID", "Enter new group ID:", 1, 1, 9999)
+            if ok:
+                new_group = gid
+        self._run_task("Import", lambda: self.logic.load_file(path, new_group=new_group))
+
+    def _load_dxf_with_layers(self, path: str, layers: dict[str, int]) -> None:
+        # DXF prompts for the group ID in its specific parameter dialog
+        dxf_params = request_dxf_import_parameters(self, layers)
+        if not dxf_params:
+            return
+        dxf_options = {
+            "group": dxf_params.group,
+            "height": dxf_params.height,
+            "base_z": dxf_params.base_z,
+            "unit_scale": dxf_params.unit_scale,
+            "selected_layers": dxf_params.selected_layers,
+        }
+        self._run_task("DXF import", lambda: self.logic.load_file(path, dxf_options=dxf_options))
 
     def save_csv(self):
         if not self._ensure_proxy_loaded():
@@ -259,210 +392,188 @@ class VBumpUI(QMainWindow):
             QMessageBox.Yes | QMessageBox.No,
         )
         if reply == QMessageBox.Yes:
-            path, _ = QFileDialog.getSaveFileName(self, "Save HDF5", "", "HDF5 Files (*.h5 *.hdf5)")
-            if path:
-                shutil.copy2(self.logic.proxy_h5_path, path)
-                self.log(f"💾 Saved proxy HDF5 to {path}")
+            path, selected = QFileDialog.getSaveFileName(
+                self, "Save HDF5", "", "HDF5 Files (*.h5 *.hdf5);;Native VBump Files (*.vbump);;"
+                "Parquet Files (*.parquet);;Feather Files (*.feather *.arrow)",
+            )
+            if path and (path.lower().endswith(".vbump") or selected.startswith("Native")):
+                self._run_task("Save VBump", lambda: self.logic.save_vbump(path))
+            elif path and (path.lower().endswith(".parquet") or selected.startswith("Parquet")):
+                self._run_task("Save Parquet", lambda: self.logic.save_arrow(path, "parquet"))
+            elif path and (path.lower().endswith((".feather", ".arrow")) or selected.startswith("Feather")):
+                self._run_task("Save Feather", lambda: self.logic.save_arrow(path, "feather"))
+            elif path:
+                self._run_task("Save HDF5", lambda: self.logic.save_hdf5(path))
         else:
-            path, _ = QFileDialog.getSaveFileName(self, "Save CSV", "", "CSV Files (*.csv)")
+            path, selected = QFileDialog.getSaveFileName(self, "Save CSV", "", "CSV Files (*.csv);;Gzipped CSV Files (*.csv.gz)")
+            if path and selected.startswith("Gzipped") and not path.lower().endswith(".gz"):
+                path += ".gz"
             if path:
-                vbumps = self.logic.materialize_current()
-                to_csv(path, vbumps)
-                self.log(f"💾 Materialized and saved CSV to {path}")
+                self._run_task("Save CSV", lambda: self.logic.save_csv(path))
 
     def create_pitch(self):
         dialog_result = request_pitch_parameters(self)
         if not dialog_result: return
-        out_proxy = self.logic.next_proxy_path("create_pitch")
-        try:
-            written = create_rectangular_area_XY_by_pitch_to_hdf5(
-                out_proxy, dialog_result.p0, dialog_result.p1,
+        self._run_task(
+            "Grid by pitch",
+            lambda: self.logic.create_grid_by_pitch(
+                dialog_result.p0, dialog_result.p1,
                 dialog_result.x_pitch, dialog_result.y_pitch,
                 dialog_result.diameter, dialog_result.group,
                 dialog_result.z, dialog_result.h,
-                log_callback=self.log,
-            )
-            if self.logic.proxy_h5_path:
-                merged = self.logic.merge_proxy_paths([self.logic.proxy_h5_path, out_proxy])
-                self.logic.replace_proxy(merged, f"📐 Appended {written:,} bumps by pitch in proxy mode")
-            else:
-                self.logic.replace_proxy(out_proxy, f"📐 Created {written:,} bumps by pitch in proxy mode")
-            if self.substrate_p0 and self.substrate_p1: self.plot_aabb()
-        except Exception as exc:
-            QMessageBox.critical(self, "Error", str(exc))
+            ),
+            self._refresh_plot_if_ready,
+        )
 
     def create_count(self):
         dialog_result = request_count_parameters(self)
         if not dialog_result: return
-        out_proxy = self.logic.next_proxy_path("create_count")
-        try:
-            written = create_rectangular_area_XY_by_number_to_hdf5(
-                out_proxy, dialog_result.p0, dialog_result.p1,
+        self._run_task(
+            "Grid by count",
+            lambda: self.logic.create_grid_by_count(
+                dialog_result.p0, dialog_result.p1,
                 dialog_result.x_count, dialog_result.y_count,
                 dialog_result.diameter, dialog_result.group,
                 dialog_result.z, dialog_result.h,
-                log_callback=self.log,
-            )
-            if self.logic.proxy_h5_path:
-                merged = self.logic.merge_proxy_paths([self.logic.proxy_h5_path, out_proxy])
-                self.logic.replace_proxy(merged, f"📏 Appended {written:,} bumps by count in proxy mode")
-            else:
-                self.logic.replace_proxy(out_proxy, f"📏 Created {written:,} bumps by count in proxy mode")
-            if self.substrate_p0 and self.substrate_p1: self.plot_aabb()
-        except Exception as exc:
-            QMessageBox.critical(self, "Error", str(exc))
+            ),
+            self._refresh_plot_if_ready,
+        )
 
     def modify_diameter(self):
         if not self._ensure_proxy_loaded(): return
         dialog_result = request_modify_value(self, "Modify Diameter", "New Diameter:")
         if not dialog_result: return
-        gid = dialog_result.group_filter
-        new_d = dialog_result.new_value
-        def transform(record: dict) -> list[dict]:
-            if gid is not None and int(record["group"]) != gid: return [record]
-            record["D"] = float(new_d)
-            return [record]
-        try:
-            out_path, written = self.logic.transform_proxy(transform, "modify_diameter")
-            self.logic.replace_proxy(out_path, f"🔧 Updated diameter to {new_d} (rows now: {written:,})")
-        except Exception as exc: QMessageBox.critical(self, "Error", str(exc))
+        self._run_task(
+            "Edit diameter",
+            lambda: self.logic.modify_diameter(dialog_result.new_value, dialog_result.group_filter),
+        )
 
     def modify_height(self):
         if not self._ensure_proxy_loaded(): return
         dialog_result = request_modify_value(self, "Modify Height", "New Height:")
         if not dialog_result: return
-        gid = dialog_result.group_filter
-        new_h = dialog_result.new_value
-        def transform(record: dict) -> list[dict]:
-            if gid is not None and int(record["group"]) != gid: return [record]
-            x0, y0, z0 = float(record["x0"]), float(record["y0"]), float(record["z0"])
-            x1, y1, z1 = float(record["x1"]), float(record["y1"]), float(record["z1"])
-            dx, dy, dz = x1 - x0, y1 - y0, z1 - z0
-            length = (dx * dx + dy * dy + dz * dz) ** 0.5
-            if length == 0: return [record]
-            scale = float(new_h) / length
-            record["x1"], record["y1"], record["z1"] = x0 + scale * dx, y0 + scale * dy, z0 + scale * dz
-            return [record]
-        try:
-            out_path, written = self.logic.transform_proxy(transform, "modify_height")
-            self.logic.replace_proxy(out_path, f"📐 Updated height to {new_h} (rows now: {written:,})")
-            if self.substrate_p0 and self.substrate_p1: self.plot_aabb()
-        except Exception as exc: QMessageBox.critical(self, "Error", str(exc))
+        self._run_task(
+            "Edit height",
+            lambda: self.logic.modify_height(dialog_result.new_value, dialog_result.group_filter),
+            self._refresh_plot_if_ready,
+        )
+
+    def undo(self):
+        if not self.logic.can_undo:
+            self.log("↩️ Nothing to undo.")
+            return
+        self._run_task("Undo", self.logic.undo, self._refresh_plot_if_ready)
+
+    def redo(self):
+        if not self.logic.can_redo:
+            self.log("↪️ Nothing to redo.")
+            return
+        self._run_task("Redo", self.logic.redo, self._refresh_plot_if_ready)
 
     def delete_group(self):
         if not self._ensure_proxy_loaded(): return
         from PySide6.QtWidgets import QInputDialog
         gid, ok = QInputDialog.getInt(self, "Delete Group", "Enter group ID to delete:", 0, 1, 9999)
         if not ok: return
-        before = self.logic.current_source_count()
-        def transform(record: dict) -> list[dict]:
-            if int(record["group"]) == gid: return []
-            return [record]
-        try:
-            out_path, written = self.logic.transform_proxy(transform, "delete_group")
-            self.logic.replace_proxy(out_path, f"🗑️ Deleted group {gid} ({before - written:,} bumps removed)")
-            if self.substrate_p0 and self.substrate_p1: self.plot_aabb()
-        except Exception as exc: QMessageBox.critical(self, "Error", str(exc))
+        self._run_task("Delete group", lambda: self.logic.delete_group(gid), self._refresh_plot_if_ready)
 
     def move_bumps(self):
         if not self._ensure_proxy_loaded(): return
         dialog_result = request_move_parameters(self)
         if not dialog_result: return
-        gid, keep, new_g, new_d = dialog_result.group_filter, dialog_result.keep_original, dialog_result.new_group, dialog_result.new_diameter
         delta_u = tuple(t - r for t, r in zip(dialog_result.target, dialog_result.reference))
-        auto_group_map = {}
-        if keep and gid is None and new_g is None:
-            existing = self.logic.get_existing_groups()
-            max_group = max(existing) if existing else 0
-            with h5py.File(self.logic.proxy_h5_path, "r") as fin:
-                dset = fin["vbump"]
-                seen = set()
-                for start in range(0, int(dset.shape[0]), 1_000_000):
-                    end = min(start + 1_000_000, int(dset.shape[0]))
-                    for g in dset[start:end]["group"]:
-                        gv = int(g)
-                        if gv not in seen:
-                            seen.add(gv)
-                            max_group += 1
-                            auto_group_map[gv] = max_group
-        def transform(record: dict) -> list[dict]:
-            current_gid = int(record["group"])
-            if gid is not None and current_gid != gid: return [record]
-            moved = dict(record)
-            moved["x0"], moved["y0"], moved["z0"] = float(moved["x0"]) + delta_u[0], float(moved["y0"]) + delta_u[1], float(moved["z0"]) + delta_u[2]
-            moved["x1"], moved["y1"], moved["z1"] = float(moved["x1"]) + delta_u[0], float(moved["y1"]) + delta_u[1], float(moved["z1"]) + delta_u[2]
-            if new_d is not None: moved["D"] = float(new_d)
-            if auto_group_map and current_gid in auto_group_map: moved["group"] = int(auto_group_map[current_gid])
-            elif new_g is not None: moved["group"] = int(new_g)
-            return [record, moved] if keep else [moved]
-        try:
-            out_path, written = self.logic.transform_proxy(transform, "move_copy")
-            msg = f"📤 Move/Copy applied (rows now: {written:,})"
-            if auto_group_map: msg = f"📤 Duplicated bumps with auto-groups {', '.join(str(v) for v in sorted(auto_group_map.values()))} (rows now: {written:,})"
-            self.logic.replace_proxy(out_path, msg)
-            if self.substrate_p0 and self.substrate_p1: self.plot_aabb()
-        except Exception as exc: QMessageBox.critical(self, "Error", str(exc))
+        self._run_task(
+            "Move/Duplicate",
+            lambda: self.logic.move_copy(
+                delta_u,
+                group=dialog_result.group_filter,
+                keep_original=dialog_result.keep_original,
+                new_group=dialog_result.new_group,
+                new_diameter=dialog_result.new_diameter,
+            ),
+            self._refresh_plot_if_ready,
+        )
 
     def export_weldline(self):
         if not self._ensure_proxy_loaded(): return
         path, _ = QFileDialog.getSaveFileName(self, "Save WDL (weldline)", "", "WDL Files (*.wdl)")
         if not path: return
-        vbumps = self.logic.materialize_current()
-        if len(vbumps) < 20000: vbump_2_wdl_as_weldline(path, vbumps)
-        else: vbump_2_wdl_as_weldline_AABB(path, vbumps)
-        self.log(f"🧵 Weldline exported to {path} (materialized {len(vbumps):,} rows)")
+        self._run_task("Export weldline", lambda: self.logic.export_weldline(path))
 
     def export_airtrap(self):
         if not self._ensure_proxy_loaded(): return
         path, _ = QFileDialog.getSaveFileName(self, "Save WDL (airtrap)", "", "WDL Files (*.wdl)")
         if not path: return
-        vbumps = self.logic.materialize_current()
-        vbump_2_wdl_as_airtrap(path, vbumps)
-        self.log(f"💨 Airtrap exported to {path} (materialized {len(vbumps):,} rows)")
+        self._run_task("Export airtrap", lambda: self.logic.export_airtrap(path))
 
     def export_vtp(self):
         if not self._ensure_proxy_loaded(): return
         path, _ = QFileDialog.getSaveFileName(self, "Save VTP", "", "VTP Files (*.vtp)")
         if not path: return
-        vbumps = self.logic.materialize_current()
-        write_vbumps_vtp(vbumps, path)
-        self.log(f"🧪 VTP exported to {path} (materialized {len(vbumps):,} rows)")
+        self._run_task("Export VTP", lambda: self.logic.export_vtp(path))
 
     def plot_aabb(self):
         if not self._ensure_proxy_loaded(): return
         if not self.set_substrate_box(): return
 
-        self.figure.clear()
-        ax = self.figure.add_subplot(111, projection="3d")
         source_count = self.logic.current_source_count()
-        
         is_proxy = getattr(self.logic.current_vbumps, "is_bounding_box_only", False)
-        
+
         if source_count <= PLOT_MATERIALIZE_FOR_DETAILS:
-            vbumps = self.logic.materialize_current()
-            plot_vbumps(vbumps, self.substrate_p0, self.substrate_p1, ax=ax)
-            self.log(f"📊 Plot rendered with detailed materialized data ({len(vbumps):,} rows).")
+            self._run_task(
+                "Plot",
+                self.logic.materialize_current,
+                lambda vbumps: self._draw_plot(
+                    plot_vbumps, vbumps,
+                    f"📊 Plot rendered with detailed materialized data ({len(vbumps):,} rows).",
+                ),
+            )
         elif is_proxy:
             # We already have markers, use them for AABB plotting without materializing full data
-            plot_vbumps_aabb(self.logic.current_vbumps, self.substrate_p0, self.substrate_p1, ax=ax)
-            self.log(f"📊 Plot rendered from proxy markers (source {source_count:,} rows).")
+            self._draw_plot(
+                plot_vbumps_aabb, self.logic.current_vbumps,
+                f"📊 Plot rendered from proxy markers (source {source_count:,} rows).",
+            )
         elif source_count <= PLOT_MATERIALIZE_LIMIT:
-            vbumps = self.logic.materialize_current()
-            plot_vbumps_aabb(vbumps, self.substrate_p0, self.substrate_p1, ax=ax)
-            self.log(f"📊 Plot rendered with AABB materialized data ({len(vbumps):,} rows).")
+            self._run_task(
+                "Plot",
+                self.logic.materialize_current,
+                lambda vbumps: self._draw_plot(
+                    plot_vbumps_aabb, vbumps,
+                    f"📊 Plot rendered with AABB materialized data ({len(vbumps):,} rows).",
+                ),
+            )
         else:
-            plot_vbumps_aabb(self.logic.current_vbumps, self.substrate_p0, self.substrate_p1, ax=ax)
-            self.log(f"📊 Plot rendered from existing markers (source {source_count:,} rows).")
-            
+            self._draw_plot(
+                plot_vbumps_aabb, self.logic.current_vbumps,
+                f"📊 Plot rendered from existing markers (source {source_count:,} rows).",
+            )
+
+    def _ensure_canvas(self) -> None:
+        if self.canvas is not None:
+            return
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=(6, 4))
+        self.canvas = FigureCanvas(self.figure)
+        self._plot_layout.replaceWidget(self._plot_placeholder, self.canvas)
+        self._plot_placeholder.deleteLater()
+
+    def _draw_plot(self, plot_func, vbumps, message: str) -> None:
+        self._ensure_canvas()
+        self.figure.clear()
+        ax = self.figure.add_subplot(111, projection="3d")
+        plot_func(vbumps, self.substrate_p0, self.substrate_p1, ax=ax)
+        self.log(message)
         self.canvas.draw()
 
     def set_substrate_box(self):
         auto_bounds = None
-        if self.logic.current_vbumps:
-            bounds = self.logic.compute_bounding_box(self.logic.current_vbumps)
-            if bounds:
-                min_pt, max_pt = bounds
-                auto_bounds = (min_pt, (max_pt[0], max_pt[1], max_pt[2] * -1))
+        bounds = self.logic.compute_bounding_box()
+        if bounds:
+            min_pt, max_pt = bounds
+            auto_bounds = (min_pt, (max_pt[0], max_pt[1], max_pt[2] * -1))
         initial = (self.substrate_p0, self.substrate_p1) if self.substrate_p0 and self.substrate_p1 else None
         res = request_substrate_box(self, initial=initial, auto_bounds=auto_bounds)
         if res:
@@ -472,6 +583,13 @@ class VBumpUI(QMainWindow):
         return False
 
     def closeEvent(self, event):
+        if self._task_thread is not None:
+            self._task_token.cancel()
+            self._task_thread.quit()
+            self._task_thread.wait()
+        self.logic.close()
+        remove_sink(self._timing_sink)
+        self._log_sink.stop()
         if hasattr(self, "canvas") and self.canvas:
             self.canvas.setParent(None)
             del self.canvas
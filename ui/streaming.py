@@ -4,6 +4,9 @@ from __future__ import annotations
 
 from PySide6.QtCore import QObject, Signal, Slot
 
+from VBump.Basic import OperationCancelled
+from VBump.Instrument import span
+
 
 class HDF5StreamWorker(QObject):
     """Run long running HDF5 streaming tasks without blocking the UI."""
@@ -23,3 +26,38 @@ class HDF5StreamWorker(QObject):
             self.finished.emit(written, path, markers)
         except Exception as exc:  # pragma: no cover - UI feedback path
             self.error.emit(str(exc))
+
+
+class ProxyTaskWorker(QObject):
+    """Run a single proxy operation on a worker thread.
+
+    ``task`` is a zero-argument callable; its return value is delivered through
+    ``finished``. The task runs inside an instrumentation span named ``label``.
+    Operations poll a :class:`VBump.Basic.CancelToken` between chunks and
+    raise :class:`VBump.Basic.OperationCancelled`, which is reported via ``cancelled``.
+    """
+
+    progress = Signal(int, int)
+    finished = Signal(object)
+    error = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, task, label: str = "task", parent=None):
+        super().__init__(parent)
+        self._task = task
+        self._label = label
+
+    def report_progress(self, done: int, total: int) -> None:
+        self.progress.emit(int(done), int(total))
+
+    @Slot()
+    def run(self):
+        try:
+            with span(self._label):
+                result = self._task()
+        except OperationCancelled:
+            self.cancelled.emit()
+        except Exception as exc:  # pragma: no cover - UI feedback path
+            self.error.emit(str(exc))
+        else:
+            self.finished.emit(result)